@@ -0,0 +1,269 @@
+"""End-to-end benchmark scenarios, run by `plugin-admin bench-e2e`.
+
+This script is executed in a separate, QGIS-enabled python process with the
+built plugin on the python path and a throwaway QGIS profile. It reads its
+configuration as JSON from the `OACS_BENCH_CONFIG` environment variable, runs
+each scenario against the mock server and prints a JSON list with one result
+per scenario as its last line of output.
+"""
+
+import json
+import os
+import resource
+import time
+import tracemalloc
+import typing
+import urllib.request
+import uuid
+
+from qgis.core import (
+    QgsApplication,
+    QgsSettings,
+)
+from qgis.PyQt import QtCore
+
+# how long to wait for a single scenario before giving up
+_SCENARIO_TIMEOUT_MS = 30 * 60 * 1000
+# resources shown by each tab of the data source widget, in order
+_SEARCH_PAGE_RESOURCES = ("systems", "deployments", "samplingFeatures", "procedures", "datastreams")
+
+
+class Stopwatch:
+    """Record the elapsed time of named milestones, only the first one counts."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.milestones: dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        self.milestones.setdefault(name, (time.perf_counter() - self.start) * 1000)
+
+
+def wait_until(condition: typing.Callable[[], bool], timeout_ms: int = _SCENARIO_TIMEOUT_MS) -> bool:
+    """Spin the Qt event loop until `condition` holds or the timeout expires."""
+    deadline = time.perf_counter() + timeout_ms / 1000
+    loop = QtCore.QEventLoop()
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        loop.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 50)
+    return True
+
+
+def get_server_request_count(server_url: str) -> int:
+    with urllib.request.urlopen(f"{server_url}/__stats") as response:
+        return json.load(response)["requests"]
+
+
+def get_max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(
+        scenario: typing.Callable[[Stopwatch], int],
+        name: str,
+        server_url: str,
+        trace_memory: bool,
+) -> dict:
+    """Run a scenario, which returns the number of items it handled."""
+    requests_before = get_server_request_count(server_url)
+    if trace_memory:
+        tracemalloc.start()
+    stopwatch = Stopwatch()
+    num_items = scenario(stopwatch)
+    total_ms = (time.perf_counter() - stopwatch.start) * 1000
+    result = {
+        "scenario": name,
+        "items": num_items,
+        "time_to_first_result_ms": stopwatch.milestones.get("first_result", total_ms),
+        "total_ms": total_ms,
+        **{f"{k}_ms": v for k, v in stopwatch.milestones.items() if k != "first_result"},
+        "requests": get_server_request_count(server_url) - requests_before,
+        "max_rss_mb": get_max_rss_mb(),
+    }
+    if trace_memory:
+        result["python_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result
+
+
+def run_client_scenario(resource_name: str, connection, stopwatch: Stopwatch) -> int:
+    from qgis_oacs.client import oacs_client
+
+    initiators = {
+        "systems": oacs_client.initiate_system_list_search,
+        "deployments": oacs_client.initiate_deployment_list_search,
+        "samplingFeatures": oacs_client.initiate_sampling_feature_list_search,
+        "procedures": oacs_client.initiate_procedure_list_search,
+        "datastreams": oacs_client.initiate_datastream_list_search,
+    }
+    outcome = {}
+
+    def handle_response(payload, request_metadata):
+        if request_metadata.request_id == request.request_id:
+            stopwatch.mark("first_result")
+            outcome["items"] = payload.items
+
+    def handle_failure(request_metadata, error_message):
+        if request_metadata.request_id == request.request_id:
+            outcome["error"] = error_message
+
+    oacs_client.response_fetched.connect(handle_response)
+    oacs_client.request_failed.connect(handle_failure)
+    try:
+        request = initiators[resource_name](connection)
+        if not wait_until(lambda: len(outcome) > 0):
+            raise RuntimeError(f"Timed out waiting for {resource_name}")
+    finally:
+        oacs_client.response_fetched.disconnect(handle_response)
+        oacs_client.request_failed.disconnect(handle_failure)
+    if "error" in outcome:
+        raise RuntimeError(f"Could not fetch {resource_name}: {outcome['error']}")
+    items = outcome["items"]
+    if resource_name != "datastreams":
+        from qgis_oacs import layers
+
+        layers.build_oacs_feature_list_layers(items, name_prefix=resource_name)
+        stopwatch.mark("layers_built")
+    return len(items)
+
+
+def run_streaming_client_scenario(resource_name: str, connection, stopwatch: Stopwatch) -> int:
+    """Stream the response through the client, keeping only the number of items."""
+    from qgis_oacs import models
+    from qgis_oacs.client import (
+        RequestType,
+        oacs_client,
+    )
+
+    request_types = {
+        "systems": RequestType.SYSTEM_LIST,
+        "deployments": RequestType.DEPLOYMENT_LIST,
+        "samplingFeatures": RequestType.SAMPLING_FEATURE_LIST,
+        "procedures": RequestType.PROCEDURE_LIST,
+        "datastreams": RequestType.DATASTREAM_LIST,
+    }
+    outcome = {"items": 0}
+
+    def handle_batch(payload, request_metadata):
+        if request_metadata.request_id == request.request_id:
+            stopwatch.mark("first_result")
+            outcome["items"] += len(payload.items)
+
+    def handle_failure(request_metadata, error_message):
+        if request_metadata.request_id == request.request_id:
+            outcome["error"] = error_message
+
+    def handle_end(request_metadata):
+        if request_metadata.request_id == request.request_id:
+            outcome["ended"] = True
+
+    oacs_client.response_batch_fetched.connect(handle_batch)
+    oacs_client.request_failed.connect(handle_failure)
+    oacs_client.request_ended.connect(handle_end)
+    try:
+        request = oacs_client.initiate_streaming_search(
+            request_types[resource_name],
+            models.ClientSearchParams(f"/{resource_name}", headers={"Accept": "application/json"}),
+            connection
+        )
+        if not wait_until(lambda: "ended" in outcome):
+            raise RuntimeError(f"Timed out waiting for {resource_name}")
+    finally:
+        oacs_client.response_batch_fetched.disconnect(handle_batch)
+        oacs_client.request_failed.disconnect(handle_failure)
+        oacs_client.request_ended.disconnect(handle_end)
+    if "error" in outcome:
+        raise RuntimeError(f"Could not stream {resource_name}: {outcome['error']}")
+    return outcome["items"]
+
+
+def run_widget_scenario(page_index: int, stopwatch: Stopwatch) -> int:
+    from qgis_oacs.client import oacs_client
+    from qgis_oacs.gui import data_source_widget as data_source_widget_module
+
+    data_source_widget = data_source_widget_module.OacsDataSourceWidget()
+    data_source_widget.resource_types_tw.setCurrentIndex(page_index)
+    page_name = data_source_widget_module._SEARCH_PAGES[page_index][0]
+    page = data_source_widget.resource_type_pages[page_name]
+    outcome = {}
+
+    def handle_failure(request_metadata, error_message):
+        outcome["error"] = error_message
+
+    page.search_results_filler.progress.connect(
+        lambda num_added, total: stopwatch.mark("first_result") if num_added > 0 else None)
+    page.search_results_filler.finished.connect(lambda: outcome.setdefault("finished", True))
+    oacs_client.request_failed.connect(handle_failure)
+    # leave out the creation of the widget, which is measured by bench-startup
+    stopwatch.start = time.perf_counter()
+    try:
+        page.initiate_search()
+        if not wait_until(lambda: len(outcome) > 0):
+            raise RuntimeError(f"Timed out waiting for the {page_name} search results")
+    finally:
+        oacs_client.request_failed.disconnect(handle_failure)
+    if "error" in outcome:
+        raise RuntimeError(f"Could not search {page_name}: {outcome['error']}")
+    num_items = page.search_results_model.rowCount()
+    data_source_widget.deleteLater()
+    return num_items
+
+
+def main():
+    config = json.loads(os.environ["OACS_BENCH_CONFIG"])
+    qgis_app = QgsApplication([], True)
+    qgis_app.initQgis()
+    # large responses take longer than the default network timeout
+    QgsSettings().setValue("qgis/networkAndProxy/networkTimeout", _SCENARIO_TIMEOUT_MS)
+
+    from qgis_oacs.settings import (
+        DataSourceConnectionSettings,
+        settings_manager,
+    )
+
+    connection = DataSourceConnectionSettings(
+        id=uuid.uuid4(),
+        name="benchmark",
+        base_url=config["server_url"],
+        network_requests_timeout=_SCENARIO_TIMEOUT_MS,
+    )
+    settings_manager.save_data_source_connection(connection)
+    settings_manager.set_current_data_source_connection(connection.id)
+    trace_memory = config.get("trace_memory", True)
+    results = []
+    for resource_name in config["resources"]:
+        results.append(
+            measure(
+                lambda stopwatch: run_client_scenario(resource_name, connection, stopwatch),
+                f"client:{resource_name}",
+                config["server_url"],
+                trace_memory,
+            )
+        )
+    for resource_name in config["resources"]:
+        results.append(
+            measure(
+                lambda stopwatch: run_streaming_client_scenario(resource_name, connection, stopwatch),
+                f"client-stream:{resource_name}",
+                config["server_url"],
+                trace_memory,
+            )
+        )
+    for page_index, resource_name in enumerate(_SEARCH_PAGE_RESOURCES):
+        if resource_name in config["resources"]:
+            results.append(
+                measure(
+                    lambda stopwatch: run_widget_scenario(page_index, stopwatch),
+                    f"widget:{resource_name}",
+                    config["server_url"],
+                    trace_memory,
+                )
+            )
+    print(json.dumps(results))
+    qgis_app.exitQgis()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""A local stub OGC API - Connected Systems server serving synthetic data.
+
+Items are generated on the fly from their index and collection responses
+are streamed as the items are generated, so the server can expose millions
+of them without holding them, or their JSON, in memory. It is used by the
+`bench-e2e` command of plugin-admin and can also be started on its own with
+`plugin-admin mock-server`, which is handy for trying the plugin out.
+"""
+
+import dataclasses
+import itertools
+import json
+import logging
+import math
+import random
+import threading
+import time
+import typing
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from urllib.parse import (
+    parse_qs,
+    urlencode,
+    urlparse,
+)
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_NAMES = ("systems", "deployments", "samplingFeatures", "procedures", "datastreams")
+_VALID_TIME = ["2020-01-01T00:00:00Z", "now"]
+# number of serialized items that are written to the socket at once
+_WRITE_BATCH_SIZE = 1_000
+
+
+@dataclasses.dataclass
+class MockServerConfig:
+    # number of items of each resource
+    counts: dict[str, int] = dataclasses.field(
+        default_factory=lambda: {name: 10 for name in RESOURCE_NAMES})
+    observations_per_datastream: int = 100
+    # 0 means point geometries, otherwise polygons with this number of vertices
+    polygon_vertices: int = 0
+    links_per_item: int = 3
+    # artificial delay added to every response
+    latency_ms: int = 0
+    # number of items in a page when the request has no `limit` - 0 means all
+    default_page_size: int = 0
+    seed: int = 0
+
+
+def _make_geometry(index: int, config: MockServerConfig) -> dict:
+    rng = random.Random(config.seed * 1_000_003 + index)
+    lon = rng.uniform(-180, 180)
+    lat = rng.uniform(-85, 85)
+    if config.polygon_vertices < 3:
+        return {"type": "Point", "coordinates": [lon, lat]}
+    radius = rng.uniform(0.01, 0.5)
+    ring = [
+        [
+            lon + radius * math.cos(2 * math.pi * i / config.polygon_vertices),
+            lat + radius * math.sin(2 * math.pi * i / config.polygon_vertices),
+        ]
+        for i in range(config.polygon_vertices)
+    ]
+    ring.append(ring[0])
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+def _make_links(resource: str, item_id: str, config: MockServerConfig) -> list[dict]:
+    rels = ("datastreams", "samplingFeatures", "deployments", "subsystems", "procedures")
+    return [
+        {
+            "href": f"/{resource}/{item_id}/{rels[i % len(rels)]}",
+            "rel": f"ogc-rel:{rels[i % len(rels)]}",
+            "type": "application/geo+json",
+            "title": f"Related {rels[i % len(rels)]}",
+        }
+        for i in range(config.links_per_item)
+    ]
+
+
+def make_system(index: int, config: MockServerConfig) -> dict:
+    system_types = ("Sensor", "Actuator", "Platform", "Sampler", "System")
+    asset_types = ("Equipment", "Human", "LivingThing", "Simulation", "Process", "Group", "Other")
+    item_id = f"sys-{index}"
+    return {
+        "type": "Feature",
+        "id": item_id,
+        "geometry": _make_geometry(index, config),
+        "properties": {
+            "uid": f"urn:x-bench:system:{index}",
+            "name": f"Benchmark system {index}",
+            "description": f"Synthetic system number {index}",
+            "featureType": f"http://www.w3.org/ns/sosa/{system_types[index % len(system_types)]}",
+            "assetType": asset_types[index % len(asset_types)],
+            "validTime": _VALID_TIME,
+        },
+        "links": _make_links("systems", item_id, config),
+    }
+
+
+def make_deployment(index: int, config: MockServerConfig) -> dict:
+    item_id = f"dep-{index}"
+    return {
+        "type": "Feature",
+        "id": item_id,
+        "geometry": _make_geometry(index, config),
+        "properties": {
+            "uid": f"urn:x-bench:deployment:{index}",
+            "name": f"Benchmark deployment {index}",
+            "featureType": "http://www.w3.org/ns/sosa/Deployment",
+            "validTime": _VALID_TIME,
+            "deployedSystems@link": [{"href": f"/systems/sys-{index}", "title": f"System {index}"}],
+        },
+        "links": _make_links("deployments", item_id, config),
+    }
+
+
+def make_sampling_feature(index: int, config: MockServerConfig) -> dict:
+    item_id = f"sf-{index}"
+    return {
+        "type": "Feature",
+        "id": item_id,
+        "geometry": _make_geometry(index, config),
+        "properties": {
+            "uid": f"urn:x-bench:sampling-feature:{index}",
+            "name": f"Benchmark sampling feature {index}",
+            "featureType": "http://www.w3.org/ns/sosa/Sample",
+            "validTime": _VALID_TIME,
+            "sampledFeature@link": {"href": f"https://example.org/features/{index}"},
+        },
+        "links": _make_links("samplingFeatures", item_id, config),
+    }
+
+
+def make_procedure(index: int, config: MockServerConfig) -> dict:
+    item_id = f"proc-{index}"
+    return {
+        "type": "Feature",
+        "id": item_id,
+        "geometry": None,
+        "properties": {
+            "uid": f"urn:x-bench:procedure:{index}",
+            "name": f"Benchmark procedure {index}",
+            "featureType": "http://www.w3.org/ns/sosa/ObservingProcedure",
+            "validTime": _VALID_TIME,
+        },
+        "links": _make_links("procedures", item_id, config),
+    }
+
+
+def make_datastream(index: int, config: MockServerConfig) -> dict:
+    return {
+        "id": f"ds-{index}",
+        "name": f"Benchmark datastream {index}",
+        "description": f"Synthetic datastream number {index}",
+        "formats": ["application/json", "application/om+json"],
+        "system@link": {"href": f"/systems/sys-{index}", "title": f"System {index}"},
+        "outputName": "temperature",
+        "phenomenonTime": _VALID_TIME,
+        "resultTime": _VALID_TIME,
+        "resultType": "measure",
+        "type": "observation",
+        "live": index % 2 == 0,
+        "observedProperties": [
+            {"definition": "http://qudt.org/vocab/quantitykind/Temperature", "label": "Temperature"}
+        ],
+    }
+
+
+def make_observation(datastream_index: int, index: int, config: MockServerConfig) -> dict:
+    rng = random.Random(config.seed * 1_000_003 + datastream_index * 7919 + index)
+    timestamp = 1_577_836_800 + index * 60
+    iso_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+    return {
+        "id": f"obs-{datastream_index}-{index}",
+        "datastream@id": f"ds-{datastream_index}",
+        "phenomenonTime": iso_time,
+        "resultTime": iso_time,
+        "result": round(rng.uniform(-20, 40), 2),
+    }
+
+
+ITEM_FACTORIES: dict[str, typing.Callable[[int, MockServerConfig], dict]] = {
+    "systems": make_system,
+    "deployments": make_deployment,
+    "samplingFeatures": make_sampling_feature,
+    "procedures": make_procedure,
+    "datastreams": make_datastream,
+}
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: "MockOacsServer"
+
+    def log_message(self, format: str, *args: typing.Any) -> None:
+        logger.debug(format, *args)
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        parts = [part for part in parsed.path.split("/") if part]
+        if parts == ["__stats"]:
+            # not counted, so that the benchmark can check the number of requests
+            return self._send_json(200, {"requests": self.server.request_count})
+        self.server.record_request()
+        if self.server.config.latency_ms > 0:
+            time.sleep(self.server.config.latency_ms / 1000)
+        if len(parts) == 0:
+            payload = self._get_landing_page()
+        elif parts == ["conformance"]:
+            payload = {"conformsTo": ["http://www.opengis.net/spec/ogcapi-connectedsystems-1/1.0/conf/core"]}
+        elif len(parts) == 1 and parts[0] in ITEM_FACTORIES:
+            return self._send_collection(parts[0], query)
+        elif len(parts) == 2 and parts[0] in ITEM_FACTORIES:
+            payload = self._get_item(parts[0], parts[1])
+        elif len(parts) == 3 and parts[0] == "datastreams" and parts[2] == "observations":
+            if self._send_observations(parts[1], query):
+                return None
+            payload = None
+        else:
+            payload = None
+        if payload is None:
+            self._send_json(404, {"code": "NotFound", "description": self.path})
+        else:
+            self._send_json(200, payload)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _get_landing_page(self) -> dict:
+        return {
+            "title": "Benchmark OACS server",
+            "links": [
+                {"href": f"{self.server.url}/conformance", "rel": "conformance"},
+                {"href": f"{self.server.url}/api", "rel": "service-desc"},
+                *(
+                    {"href": f"{self.server.url}/{name}", "rel": name}
+                    for name in RESOURCE_NAMES
+                ),
+            ],
+        }
+
+    def _get_page_bounds(self, query: dict[str, str]) -> tuple[int, int | None]:
+        offset = max(int(query.get("offset", 0)), 0)
+        limit = int(query.get("limit", self.server.config.default_page_size))
+        return offset, (limit if limit > 0 else None)
+
+    def _send_page(
+            self,
+            resource_path: str,
+            make_item: typing.Callable[[int], dict],
+            num_items: int,
+            query: dict[str, str],
+            items_key: str,
+            item_filter: typing.Callable[[dict], bool] | None = None,
+    ) -> None:
+        """Send a page of a collection, writing its items as they are generated.
+
+        Without a filter only the items of the page are generated, straight
+        from their indexes. The body has no Content-Length, as its size is
+        not known up front - it ends when the connection is closed, which
+        HTTP/1.0 does after every response.
+        """
+        offset, limit = self._get_page_bounds(query)
+        if item_filter is None:
+            end = num_items if limit is None else min(offset + limit, num_items)
+            page_items = (make_item(i) for i in range(offset, end))
+            remaining_items = iter(range(end, num_items))
+        else:
+            remaining_items = itertools.islice(
+                (item for item in map(make_item, range(num_items)) if item_filter(item)),
+                offset, None
+            )
+            page_items = remaining_items if limit is None else itertools.islice(remaining_items, limit)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        head = '"type": "FeatureCollection", ' if items_key == "features" else ""
+        self.wfile.write(f'{{{head}"{items_key}": ['.encode())
+        separator = ""
+        for batch in itertools.batched(page_items, _WRITE_BATCH_SIZE):
+            self.wfile.write(f"{separator}{', '.join(map(json.dumps, batch))}".encode())
+            separator = ", "
+        links = []
+        # the page has been consumed, so this is the first item of the next one
+        if limit is not None and next(remaining_items, None) is not None:
+            next_query = urlencode({**query, "offset": offset + limit, "limit": limit})
+            links.append({"href": f"{self.server.url}{resource_path}?{next_query}", "rel": "next"})
+        self.wfile.write(f"], \"links\": {json.dumps(links)}}}".encode())
+
+    def _send_collection(self, resource: str, query: dict[str, str]) -> None:
+        factory = ITEM_FACTORIES[resource]
+        config = self.server.config
+        item_filter = None
+        if (text := query.get("q")):
+            item_filter = lambda item: text.lower() in _get_item_name(item).lower()
+        self._send_page(
+            f"/{resource}",
+            lambda index: factory(index, config),
+            config.counts.get(resource, 0),
+            query,
+            "items" if resource == "datastreams" else "features",
+            item_filter=item_filter,
+        )
+
+    def _get_item(self, resource: str, item_id: str) -> dict | None:
+        index = _parse_index(item_id)
+        if index is None or not 0 <= index < self.server.config.counts.get(resource, 0):
+            return None
+        return ITEM_FACTORIES[resource](index, self.server.config)
+
+    def _send_observations(self, datastream_id: str, query: dict[str, str]) -> bool:
+        """Send the observations of a datastream, returning False if there is no such datastream."""
+        datastream_index = _parse_index(datastream_id)
+        config = self.server.config
+        if datastream_index is None or not 0 <= datastream_index < config.counts.get("datastreams", 0):
+            return False
+        self._send_page(
+            f"/datastreams/{datastream_id}/observations",
+            lambda index: make_observation(datastream_index, index, config),
+            config.observations_per_datastream,
+            query,
+            "items",
+        )
+        return True
+
+
+def _get_item_name(item: dict) -> str:
+    return item.get("name") or item.get("properties", {}).get("name", "")
+
+
+def _parse_index(item_id: str) -> int | None:
+    try:
+        return int(item_id.rpartition("-")[-1])
+    except ValueError:
+        return None
+
+
+class MockOacsServer(ThreadingHTTPServer):
+    """Stub server, run in a background thread with `start()`."""
+
+    daemon_threads = True
+    config: MockServerConfig
+    request_count: int
+
+    def __init__(self, config: MockServerConfig, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _RequestHandler)
+        self.config = config
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.request_count += 1
+
+    def start(self) -> "MockOacsServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock OACS server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,126 @@
+"""Parser microbenchmarks, run by `plugin-admin bench-parse`.
+
+This script is executed in a separate, QGIS-enabled python process with the
+built plugin on the python path. It reads its configuration as JSON from the
+`OACS_BENCH_CONFIG` environment variable and replays every response of the
+corpus through the `from_api_response` parsers of the plugin's models. It
+prints a JSON list with one result per corpus file and parser as its last
+line of output.
+
+Corpus files are named `<resource>--<label>.json`, where `resource` is one of
+`systems`, `deployments`, `samplingFeatures`, `procedures` or `datastreams`.
+"""
+
+import gc
+import json
+import os
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+from qgis.core import QgsApplication
+
+
+def get_parsers() -> dict[str, tuple[typing.Type, str]]:
+    """Return the list parser and the name of the member holding the items, per resource."""
+    from qgis_oacs import models
+
+    return {
+        "systems": (models.SystemList, "features"),
+        "deployments": (models.DeploymentList, "features"),
+        "samplingFeatures": (models.SamplingFeatureList, "features"),
+        "procedures": (models.ProcedureList, "features"),
+        "datastreams": (models.DataStreamList, "items"),
+    }
+
+
+def time_best_of(function: typing.Callable[[], typing.Any], repeat: int) -> float:
+    """Return the fastest of `repeat` runs, in seconds, with the GC kept out of the way."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def measure_allocations(function: typing.Callable[[], typing.Any]) -> tuple[int, int, int]:
+    """Return the peak traced bytes, the bytes and the memory blocks still held by the result."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function()
+        current, peak = tracemalloc.get_traced_memory()
+        live_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, current, live_blocks
+
+
+def benchmark_file(corpus_path: Path, repeat: int) -> list[dict]:
+    resource_name, _, label = corpus_path.stem.partition("--")
+    if (parser_details := get_parsers().get(resource_name)) is None:
+        return []
+    from qgis_oacs import utils
+
+    list_type, items_key = parser_details
+    raw_payload = corpus_path.read_bytes()
+    payload = json.loads(raw_payload)
+    raw_items = payload.get(items_key, [])
+    num_items = len(raw_items)
+    if num_items == 0:
+        return []
+    parsers = {
+        # decoding the response body, which the client does before the models get to parse it
+        f"parse_json[{'orjson' if utils.orjson is not None else 'json'}]": (
+            lambda: utils.parse_json(raw_payload)),
+        # fully parsed items, which is what layer loading needs
+        f"{list_type.__name__}.from_api_response": (
+            lambda: list_type.from_api_response(payload, lazy=False)),
+        # items that only parse their eager fields, which is what search results get
+        f"{list_type.__name__}.from_api_response[lazy]": (
+            lambda: list_type.from_api_response(payload)),
+        f"{list_type.item_type.__name__}.from_api_response": lambda: [
+            list_type.item_type.from_api_response(raw_item) for raw_item in raw_items
+        ],
+    }
+    results = []
+    for parser_name, parse in parsers.items():
+        elapsed = time_best_of(parse, repeat)
+        peak_bytes, retained_bytes, live_blocks = measure_allocations(parse)
+        results.append({
+            "corpus": corpus_path.name,
+            "resource": resource_name,
+            "label": label,
+            "parser": parser_name,
+            "items": num_items,
+            "best_seconds": elapsed,
+            "features_per_second": num_items / elapsed if elapsed > 0 else float("inf"),
+            "peak_bytes_per_feature": peak_bytes / num_items,
+            "retained_bytes_per_feature": retained_bytes / num_items,
+            "live_blocks_per_feature": live_blocks / num_items,
+        })
+    return results
+
+
+def main():
+    config = json.loads(os.environ["OACS_BENCH_CONFIG"])
+    qgis_app = QgsApplication([], False)
+    qgis_app.initQgis()
+    results = []
+    for corpus_dir in config["corpus_dirs"]:
+        for corpus_path in sorted(Path(corpus_dir).glob("*--*.json")):
+            results.extend(benchmark_file(corpus_path, config["repeat"]))
+    print(json.dumps(results))
+    qgis_app.exitQgis()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
+import compileall
 import configparser
 import datetime as dt
 import json
 import logging
 import os
+import re
 import shlex
 import shutil
+import statistics
 import subprocess
 import sys
+import tempfile
 import tomllib
 import typing
 import zipfile
@@ -20,12 +24,52 @@ from rich import (
     print,
 )
 
+from . import mockserver
+
 logger = logging.getLogger(__name__)
 LOCAL_ROOT_DIR = Path(__file__).parents[2].resolve()
 SRC_NAME = "qgis_oacs"
 RESOURCE_DIR_NAME = "qt-resources"
+# must match `COMPILED_UI_PACKAGE_NAME` in the plugin's utils module
+COMPILED_UI_PACKAGE_NAME = "ui_compiled"
 app = typer.Typer()
 
+# Run by `bench-startup` in a separate QGIS-enabled python process, with the
+# built plugin on the python path. Prints a JSON object with timings in ms
+_STARTUP_BENCH_SCRIPT = """
+import json
+import time
+
+timings = dict()
+start = time.perf_counter()
+from qgis.core import QgsApplication
+from qgis.testing.mocked import get_iface
+qgis_app = QgsApplication([], True)
+qgis_app.initQgis()
+iface = get_iface()
+timings["qgis_startup"] = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+import {package_name}
+plugin = {package_name}.classFactory(iface)
+timings["plugin_init"] = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+plugin.initGui()
+timings["init_gui"] = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+widget = plugin.source_select_provider.createDataSourceWidget()
+timings["create_data_source_widget"] = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+widget.resource_types_tw.setCurrentIndex(1)
+timings["first_search_tab_creation"] = (time.perf_counter() - start) * 1000
+
+plugin.unload()
+print(json.dumps(timings))
+"""
+
 
 @dataclass
 class GithubRelease:
@@ -94,8 +138,10 @@ def build(
     if icon_path is None:
         logger.warning("Could not copy icon")
     compile_resources(output_dir)
+    compile_ui_files(output_dir)
     generate_metadata(context, output_dir)
     copy_license(output_dir)
+    byte_compile(output_dir)
     return output_dir
 
 
@@ -125,8 +171,14 @@ def copy_source_files(
     for child in (LOCAL_ROOT_DIR / "src" / SRC_NAME).iterdir():
         if child.name != "__pycache__":
             target_path = output_dir / child.name
-            handler = shutil.copytree if child.is_dir() else shutil.copy
-            handler(str(child.resolve()), str(target_path))
+            if child.is_dir():
+                shutil.copytree(
+                    str(child.resolve()),
+                    str(target_path),
+                    ignore=shutil.ignore_patterns("__pycache__")
+                )
+            else:
+                shutil.copy(str(child.resolve()), str(target_path))
 
 
 def copy_license(output_dir: Path):
@@ -148,6 +200,55 @@ def compile_resources(
     subprocess.run(shlex.split(f"pyrcc5 -o {target_path} {resources_path}"))
 
 
+@app.command()
+def compile_ui_files(
+    output_dir: typing.Optional[Path] = LOCAL_ROOT_DIR / "build/temp",
+):
+    """Generate python modules from the Qt Designer files found in the built plugin.
+
+    This spares QGIS from parsing the .ui files every time a dialog is created.
+    """
+    ui_dir = output_dir / "ui"
+    target_dir = output_dir / COMPILED_UI_PACKAGE_NAME
+    target_dir.mkdir(parents=True, exist_ok=True)
+    (target_dir / "__init__.py").touch()
+    for ui_path in sorted(ui_dir.glob("*.ui")):
+        target_path = target_dir / f"{ui_path.stem}.py"
+        logger.info(f"compile_ui_files target_path: {target_path}")
+        subprocess.run(shlex.split(f"pyuic5 -o {target_path} {ui_path}"), check=True)
+        _fix_compiled_ui_imports(target_path)
+
+
+@app.command()
+def byte_compile(
+    output_dir: typing.Optional[Path] = LOCAL_ROOT_DIR / "build/temp",
+):
+    """Byte-compile the python modules of the built plugin"""
+    if not compileall.compile_dir(str(output_dir), quiet=1):
+        raise RuntimeError(f"Could not byte-compile {output_dir}")
+
+
+def _fix_compiled_ui_imports(module_path: Path):
+    """Make modules generated by pyuic5 import Qt and QGIS classes the way QGIS expects.
+
+    pyuic5 imports custom widgets from a module named after their C++ header
+    (e.g. `from qgsfilewidget import QgsFileWidget`), which does not exist in
+    PyQGIS - they are all available from `qgis.gui` instead.
+    """
+    contents = module_path.read_text(encoding="utf-8")
+    contents = contents.replace(
+        "from PyQt5 import QtCore, QtGui, QtWidgets",
+        "from qgis.PyQt import QtCore, QtGui, QtWidgets",
+    )
+    contents = re.sub(
+        r"^from qgs\w+ import (Qgs\w+)$",
+        r"from qgis.gui import \1",
+        contents,
+        flags=re.MULTILINE
+    )
+    module_path.write_text(contents, encoding="utf-8")
+
+
 @app.command()
 def generate_metadata(
     context: typer.Context,
@@ -234,6 +335,334 @@ def install_qgis_into_venv(
     print(final_message)
 
 
+@app.command()
+def bench_startup(
+    context: typer.Context,
+    baseline_path: Path = LOCAL_ROOT_DIR / "bench" / "startup-baseline.json",
+    runs: int = 5,
+    threshold: float = 0.2,
+    min_regression_ms: float = 5.0,
+    save_baseline: bool = False,
+):
+    """Measure the startup cost of the plugin in a headless QGIS.
+
+    Times plugin initialization, `initGui`, the creation of the data source
+    widget and of the first search tab that is not shown by default, along with
+    the import time of each plugin module. The median of several runs is
+    compared against the saved baseline and the command fails if any
+    measurement is slower by more than `threshold` (a fraction) and by more
+    than `min_regression_ms`, which keeps noise in small numbers from failing it.
+    """
+    built_dir = build(
+        context, output_dir=Path(tempfile.mkdtemp(prefix="oacs-bench-")) / SRC_NAME)
+    env = {
+        **os.environ,
+        "QT_QPA_PLATFORM": "offscreen",
+        "PYTHONPATH": os.pathsep.join(
+            p for p in (str(built_dir.parent), os.getenv("PYTHONPATH")) if p),
+    }
+    all_runs: list[dict[str, float]] = []
+    for run_index in range(runs):
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-X", "importtime",
+                "-c", _STARTUP_BENCH_SCRIPT.format(package_name=SRC_NAME),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            print(completed.stderr)
+            raise typer.Exit(code=completed.returncode)
+        run_timings = json.loads(completed.stdout.strip().splitlines()[-1])
+        run_timings.update(_parse_import_times(completed.stderr, SRC_NAME))
+        all_runs.append(run_timings)
+        logger.info(f"run {run_index + 1}/{runs}: {run_timings}")
+    timings = {
+        name: statistics.median(run.get(name, 0.0) for run in all_runs)
+        for name in all_runs[0]
+    }
+    for name, value in sorted(timings.items()):
+        print(f"{name}: {value:.1f} ms")
+    shutil.rmtree(built_dir.parent, ignore_errors=True)
+    if save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(timings, indent=2, sort_keys=True))
+        print(f"Saved baseline to {str(baseline_path)!r}")
+        return
+    if not baseline_path.is_file():
+        print(f"No baseline found at {str(baseline_path)!r}, use --save-baseline to create one")
+        return
+    baseline = json.loads(baseline_path.read_text())
+    regressions = []
+    for name, baseline_value in baseline.items():
+        if (current_value := timings.get(name)) is None:
+            continue
+        if (
+                current_value > baseline_value * (1 + threshold)
+                and current_value - baseline_value > min_regression_ms
+        ):
+            regressions.append(f"{name}: {baseline_value:.1f} ms -> {current_value:.1f} ms")
+    if len(regressions) > 0:
+        print("[red]Startup regressions found:[/red]")
+        for regression in regressions:
+            print(f"- {regression}")
+        raise typer.Exit(code=1)
+    print("[green]No startup regressions found[/green]")
+
+
+def _parse_import_times(importtime_output: str, package_name: str) -> dict[str, float]:
+    """Extract the cumulative import time of the plugin's modules, in ms.
+
+    Parses the stderr of `python -X importtime`, whose lines look like:
+    `import time:       350 |       1200 |   qgis_oacs.models`
+    """
+    result = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module_name = (part.strip() for part in line[12:].split("|"))
+        if not cumulative.isdigit():
+            continue  # the header line
+        if module_name == package_name or module_name.startswith(f"{package_name}."):
+            result[f"import:{module_name}"] = int(cumulative) / 1000
+    return result
+
+
+@app.command()
+def bench_e2e(
+    context: typer.Context,
+    count: list[int] = typer.Option([10, 10_000, 1_000_000]),
+    resource: list[str] = typer.Option(list(mockserver.RESOURCE_NAMES)),
+    polygon_vertices: int = 0,
+    latency_ms: int = 0,
+    trace_memory: bool = True,
+    output_path: typing.Optional[Path] = None,
+):
+    """Measure end-to-end search performance against a local mock OACS server.
+
+    For each item count, a mock server is started with that many items of each
+    requested resource and a headless QGIS runs two scenarios per resource:
+    fetching and parsing the items through the client and building layers with
+    them, and searching through the search widget until all rows are shown.
+    Reported are the time to the first result, the total time, peak memory and
+    the number of requests the server received.
+
+    Memory tracing slows python code down noticeably, use `--no-trace-memory`
+    for more accurate timings.
+    """
+    built_dir = build(
+        context, output_dir=Path(tempfile.mkdtemp(prefix="oacs-bench-")) / SRC_NAME)
+    runner_path = Path(__file__).parent / "e2e_bench_runner.py"
+    all_results = []
+    for item_count in count:
+        server_config = mockserver.MockServerConfig(
+            counts={name: item_count for name in resource},
+            polygon_vertices=polygon_vertices,
+            latency_ms=latency_ms,
+        )
+        server = mockserver.MockOacsServer(server_config).start()
+        profile_dir = tempfile.mkdtemp(prefix="oacs-bench-profile-")
+        try:
+            completed = subprocess.run(
+                [sys.executable, str(runner_path)],
+                env={
+                    **os.environ,
+                    "QT_QPA_PLATFORM": "offscreen",
+                    "QGIS_CUSTOM_CONFIG_PATH": profile_dir,
+                    "PYTHONPATH": os.pathsep.join(
+                        p for p in (str(built_dir.parent), os.getenv("PYTHONPATH")) if p),
+                    "OACS_BENCH_CONFIG": json.dumps({
+                        "server_url": server.url,
+                        "resources": resource,
+                        "trace_memory": trace_memory,
+                    }),
+                },
+                capture_output=True,
+                text=True,
+            )
+        finally:
+            server.stop()
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        if completed.returncode != 0:
+            print(completed.stderr)
+            raise typer.Exit(code=completed.returncode)
+        for result in json.loads(completed.stdout.strip().splitlines()[-1]):
+            result.update(
+                count=item_count, polygon_vertices=polygon_vertices, latency_ms=latency_ms)
+            all_results.append(result)
+            print(
+                f"{item_count:>9} {result['scenario']:<28} "
+                f"first result: {result['time_to_first_result_ms']:10.1f} ms  "
+                f"total: {result['total_ms']:10.1f} ms  "
+                f"peak: {result.get('python_peak_mb', result['max_rss_mb']):8.1f} MB  "
+                f"requests: {result['requests']}"
+            )
+    shutil.rmtree(built_dir.parent, ignore_errors=True)
+    if output_path is not None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(all_results, indent=2))
+        print(f"Saved results to {str(output_path)!r}")
+
+
+@app.command()
+def bench_parse(
+    context: typer.Context,
+    corpus_dir: Path = LOCAL_ROOT_DIR / "bench" / "corpus",
+    baseline_path: Path = LOCAL_ROOT_DIR / "bench" / "parse-baseline.json",
+    huge_count: int = 100_000,
+    repeat: int = 5,
+    threshold: float = 0.2,
+    synthetic: bool = True,
+    save_baseline: bool = False,
+):
+    """Measure the throughput and allocations of the models' response parsers.
+
+    Every response of the corpus is replayed through the list parser of its
+    resource (e.g. `SystemList.from_api_response`) and through the item parser
+    called on each of its items. The corpus is made of the responses recorded
+    with `record-corpus` into `corpus_dir` plus, unless disabled, synthetic
+    small, medium and huge responses of each resource and medium ones with
+    polygon geometries and with many links.
+
+    Reported are features per second (best of `repeat` runs), peak traced
+    memory and the memory and number of blocks that the parsed result holds,
+    per feature. The command fails when the features per second of any
+    benchmark dropped by more than `threshold` (a fraction) of the baseline.
+    """
+    built_dir = build(
+        context, output_dir=Path(tempfile.mkdtemp(prefix="oacs-bench-")) / SRC_NAME)
+    corpus_dirs = [corpus_dir] if corpus_dir.is_dir() else []
+    if synthetic:
+        synthetic_dir = built_dir.parent / "synthetic-corpus"
+        _write_synthetic_corpus(synthetic_dir, huge_count)
+        corpus_dirs.append(synthetic_dir)
+    completed = subprocess.run(
+        [sys.executable, str(Path(__file__).parent / "parse_bench_runner.py")],
+        env={
+            **os.environ,
+            "QT_QPA_PLATFORM": "offscreen",
+            "PYTHONPATH": os.pathsep.join(
+                p for p in (str(built_dir.parent), os.getenv("PYTHONPATH")) if p),
+            "OACS_BENCH_CONFIG": json.dumps({
+                "corpus_dirs": [str(d) for d in corpus_dirs],
+                "repeat": repeat,
+            }),
+        },
+        capture_output=True,
+        text=True,
+    )
+    shutil.rmtree(built_dir.parent, ignore_errors=True)
+    if completed.returncode != 0:
+        print(completed.stderr)
+        raise typer.Exit(code=completed.returncode)
+    results = json.loads(completed.stdout.strip().splitlines()[-1])
+    throughput = {}
+    for result in results:
+        name = f"{result['corpus']}:{result['parser']}"
+        throughput[name] = result["features_per_second"]
+        print(
+            f"{name:<70} {result['features_per_second']:>12,.0f} features/s  "
+            f"{result['peak_bytes_per_feature']:>9,.0f} B peak/feature  "
+            f"{result['live_blocks_per_feature']:>7.1f} blocks/feature"
+        )
+    if save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(throughput, indent=2, sort_keys=True))
+        print(f"Saved baseline to {str(baseline_path)!r}")
+        return
+    if not baseline_path.is_file():
+        print(f"No baseline found at {str(baseline_path)!r}, use --save-baseline to create one")
+        return
+    baseline = json.loads(baseline_path.read_text())
+    regressions = [
+        f"{name}: {baseline_value:,.0f} -> {throughput[name]:,.0f} features/s"
+        for name, baseline_value in baseline.items()
+        if name in throughput and throughput[name] < baseline_value * (1 - threshold)
+    ]
+    if len(regressions) > 0:
+        print("[red]Parser regressions found:[/red]")
+        for regression in regressions:
+            print(f"- {regression}")
+        raise typer.Exit(code=1)
+    print("[green]No parser regressions found[/green]")
+
+
+def _write_synthetic_corpus(target_dir: Path, huge_count: int):
+    variants = {
+        "small": (10, mockserver.MockServerConfig()),
+        "medium": (1_000, mockserver.MockServerConfig()),
+        "huge": (huge_count, mockserver.MockServerConfig()),
+        "medium-polygons": (1_000, mockserver.MockServerConfig(polygon_vertices=64)),
+        "medium-many-links": (1_000, mockserver.MockServerConfig(links_per_item=50)),
+    }
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for resource_name, factory in mockserver.ITEM_FACTORIES.items():
+        items_key = "items" if resource_name == "datastreams" else "features"
+        for label, (count, config) in variants.items():
+            payload = {items_key: [factory(i, config) for i in range(count)], "links": []}
+            (target_dir / f"{resource_name}--synthetic-{label}.json").write_text(
+                json.dumps(payload))
+
+
+@app.command()
+def record_corpus(
+    base_url: str,
+    label: str,
+    resource: list[str] = typer.Option(list(mockserver.RESOURCE_NAMES)),
+    limit: int = 1000,
+    corpus_dir: Path = LOCAL_ROOT_DIR / "bench" / "corpus",
+):
+    """Save responses of an OACS server for replaying them with `bench-parse`."""
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    for resource_name in resource:
+        response = httpx.get(
+            f"{base_url.rstrip('/')}/{resource_name}",
+            params={"limit": limit},
+            headers={
+                "Accept": (
+                    "application/json" if resource_name == "datastreams"
+                    else "application/geo+json"
+                ),
+            },
+            follow_redirects=True,
+            timeout=60,
+        )
+        response.raise_for_status()
+        target_path = corpus_dir / f"{resource_name}--{label}.json"
+        target_path.write_bytes(response.content)
+        print(f"Saved {resource_name} to {str(target_path)!r}")
+
+
+@app.command()
+def mock_server(
+    count: int = 100,
+    polygon_vertices: int = 0,
+    latency_ms: int = 0,
+    page_size: int = 0,
+    port: int = 8000,
+):
+    """Serve synthetic OACS data locally until interrupted."""
+    server = mockserver.MockOacsServer(
+        mockserver.MockServerConfig(
+            counts={name: count for name in mockserver.RESOURCE_NAMES},
+            polygon_vertices=polygon_vertices,
+            latency_ms=latency_ms,
+            default_page_size=page_size,
+        ),
+        port=port,
+    )
+    print(f"Serving synthetic OACS data at {server.url} - press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 @app.command()
 def generate_plugin_repo_xml(
     context: typer.Context,
@@ -0,0 +1,521 @@
+"""Client-side index over the catalog items fetched from each connection.
+
+Every item that the client parses is added to the index of the connection it
+came from, so that text search, filtering by type and sorting can be done
+locally - also when the server is not reachable.
+"""
+
+import collections
+import dataclasses
+import enum
+import sys
+import typing
+import uuid
+
+from qgis.PyQt import QtCore
+
+from . import models
+from .client import (
+    OacsRequestMetadata,
+    oacs_client,
+)
+from .settings import settings_manager
+from .utils import log_message
+
+# fetched items kept per connection, see `CatalogIndexManager.get_items`
+MAX_KEPT_ITEMS_PER_CONNECTION = 10_000
+
+
+def _get_searchable_text(item: models.OacsItem) -> str:
+    return "\n".join(item.get_searchable_texts()).casefold()
+
+
+def _get_trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def get_facets(item: models.OacsItem) -> tuple[enum.Enum, ...]:
+    """Return the enumerated types of an item, e.g. its `SystemType` and `AssetType`."""
+    return tuple(
+        value for value in (getattr(item, "feature_type", None), getattr(item, "asset_type", None))
+        if isinstance(value, enum.Enum)
+    )
+
+
+def count_facets(items: typing.Iterable[models.OacsItem]) -> dict[enum.Enum, int]:
+    """Count the items of each enumerated type, see `get_facets`."""
+    counts = {}
+    for item in items:
+        for facet in get_facets(item):
+            counts[facet] = counts.get(facet, 0) + 1
+    return counts
+
+
+class SortKey(enum.Enum):
+    NAME = "name"
+    UID = "uid"
+    TYPE = "type"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CatalogEntry:
+    """What the index keeps of an item: its key, searchable text, sort keys and types.
+
+    Entries are built from items in background tasks, the items themselves,
+    with their raw responses, are not kept by the index.
+    """
+
+    key: tuple[typing.Type[models.OacsItem], str]
+    text: str
+    name: str
+    uid: str
+    type_label: str
+    facets: tuple[enum.Enum, ...]
+
+    @classmethod
+    def from_item(cls, item: models.OacsItem) -> "CatalogEntry":
+        return cls(
+            key=(type(item), item.id_),
+            text=_get_searchable_text(item),
+            name=item.name.casefold(),
+            uid=getattr(item, "uid", "").casefold(),
+            type_label=sys.intern(item.icon_tooltip),
+            facets=get_facets(item),
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class CatalogSearchResult:
+    # keys of the matching items, see `CatalogIndexManager.get_items`
+    keys: list[tuple[typing.Type[models.OacsItem], str]]
+    # number of items of each enumerated type among those matching the text
+    # and item type, before `filter_set` is applied
+    facet_counts: dict[enum.Enum, int] = dataclasses.field(default_factory=dict)
+
+
+class CatalogIndex:
+    """In-memory index over the items of a single connection.
+
+    Text search uses an inverted trigram index over the name, description,
+    uid and additional property values of each item, with candidates being
+    verified against the full text afterwards. Item types, as well as the
+    `SystemType`, `AssetType` and `ProcedureType` of items, are kept as
+    bitmaps (python ints, one bit per item) so that restricting a search to
+    a type is a single bitwise operation, and counting the matching items of
+    each type a single bit count.
+
+    Items are identified by their type and id - indexing an item that is
+    already known replaces it in its existing position, and positions of
+    removed items are reused, so the index grows with the number of distinct
+    items rather than with the number of times they are fetched.
+
+    An index is only ever modified by a single thread: indexes are built in
+    background tasks and merged into the ones being searched on the main
+    thread, see `merge`.
+    """
+
+    _entries: list[CatalogEntry | None]
+    _texts: list[str]
+    _positions: dict[tuple[type, str], int]
+    _free_positions: list[int]
+    _trigrams: dict[str, set[int]]
+    _type_bitmaps: dict[type, int]
+    _facet_bitmaps: dict[enum.Enum, int]
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> typing.Iterator[CatalogEntry]:
+        return (entry for entry in self._entries if entry is not None)
+
+    def clear(self) -> None:
+        self._entries = []
+        self._texts = []
+        self._positions = {}
+        self._free_positions = []
+        self._trigrams = {}
+        self._type_bitmaps = {}
+        self._facet_bitmaps = {}
+
+    def add_items(self, items: typing.Iterable[models.OacsItem]) -> None:
+        for item in items:
+            self.add_entry(CatalogEntry.from_item(item))
+
+    def add_entry(self, entry: CatalogEntry) -> None:
+        if (position := self._positions.get(entry.key)) is not None:
+            previous_entry = self._entries[position]
+            self._entries[position] = entry
+            self._replace_text(position, entry.text)
+            self._replace_facets(position, previous_entry.facets, entry.facets)
+            return None
+        position = self._allocate_position(entry)
+        self._replace_text(position, entry.text)
+        bit = 1 << position
+        item_type = entry.key[0]
+        self._type_bitmaps[item_type] = self._type_bitmaps.get(item_type, 0) | bit
+        self._replace_facets(position, (), entry.facets)
+
+    def merge(self, other: "CatalogIndex") -> None:
+        """Add the entries of another index, replacing those with the same key.
+
+        The trigrams of new entries are taken from the other index and their
+        bitmaps are built once per type, so that merging an index built in a
+        background task does little work on the main thread.
+        """
+        new_positions = {}
+        type_positions = {}
+        facet_positions = {}
+        offset = len(self._entries)
+        for other_position, entry in enumerate(other._entries):
+            if entry is None:
+                continue
+            if entry.key in self._positions:
+                self.add_entry(entry)
+                continue
+            position = self._allocate_position(entry)
+            self._texts[position] = entry.text
+            new_positions[other_position] = position
+            type_positions.setdefault(entry.key[0], []).append(position)
+            for facet in entry.facets:
+                facet_positions.setdefault(facet, []).append(position)
+        if len(new_positions) == 0:
+            return None
+        if (
+                len(new_positions) == len(other._entries)
+                and len(self._entries) == offset + len(new_positions)
+        ):
+            # the usual case of only new entries appended in order, whose
+            # positions are those of the other index shifted by the same offset
+            for trigram, other_postings in other._trigrams.items():
+                self._trigrams.setdefault(trigram, set()).update(
+                    map(offset.__add__, other_postings))
+        else:
+            for trigram, other_postings in other._trigrams.items():
+                postings = [
+                    new_positions[position] for position in other_postings
+                    if position in new_positions
+                ]
+                if len(postings) > 0:
+                    self._trigrams.setdefault(trigram, set()).update(postings)
+        for bitmaps, positions_by_key in (
+                (self._type_bitmaps, type_positions),
+                (self._facet_bitmaps, facet_positions),
+        ):
+            for key, positions in positions_by_key.items():
+                bitmaps[key] = bitmaps.get(key, 0) | self._positions_to_bitmap(positions)
+
+    def remove_entry(self, key: tuple[typing.Type[models.OacsItem], str]) -> None:
+        if (position := self._positions.pop(key, None)) is None:
+            return None
+        entry = self._entries[position]
+        self._replace_text(position, "")
+        self._replace_facets(position, entry.facets, ())
+        self._entries[position] = None
+        self._type_bitmaps[key[0]] &= ~(1 << position)
+        self._free_positions.append(position)
+
+    def _allocate_position(self, entry: CatalogEntry) -> int:
+        if len(self._free_positions) > 0:
+            position = self._free_positions.pop()
+            self._entries[position] = entry
+        else:
+            position = len(self._entries)
+            self._entries.append(entry)
+            self._texts.append("")
+        self._positions[entry.key] = position
+        return position
+
+    def _replace_text(self, position: int, text: str) -> None:
+        """Set the text of a position, updating only the trigrams that changed."""
+        previous_text = self._texts[position]
+        if text == previous_text:
+            return None
+        self._texts[position] = text
+        previous_trigrams = _get_trigrams(previous_text)
+        trigrams = _get_trigrams(text)
+        for trigram in previous_trigrams - trigrams:
+            postings = self._trigrams[trigram]
+            postings.discard(position)
+            if len(postings) == 0:
+                del self._trigrams[trigram]
+        for trigram in trigrams - previous_trigrams:
+            self._trigrams.setdefault(trigram, set()).add(position)
+
+    def _replace_facets(
+            self,
+            position: int,
+            previous_facets: tuple[enum.Enum, ...],
+            facets: tuple[enum.Enum, ...]
+    ) -> None:
+        if facets == previous_facets:
+            return None
+        bit = 1 << position
+        for facet in previous_facets:
+            self._facet_bitmaps[facet] &= ~bit
+        for facet in facets:
+            self._facet_bitmaps[facet] = self._facet_bitmaps.get(facet, 0) | bit
+
+    def search(
+            self,
+            text: str = "",
+            item_type: typing.Type[models.OacsItem] | None = None,
+            filter_set: models.SystemSearchFilterSet | None = None,
+            sort_by: SortKey = SortKey.NAME,
+            reverse: bool = False,
+    ) -> CatalogSearchResult:
+        """Find the items that contain all words of `text` and match `filter_set`."""
+        if item_type is not None:
+            mask = self._type_bitmaps.get(item_type, 0)
+        else:
+            mask = 0
+            for type_bitmap in self._type_bitmaps.values():
+                mask |= type_bitmap
+        if (candidates := self._find_text_candidates(text)) is not None:
+            mask &= self._positions_to_bitmap(candidates)
+        facet_counts = {
+            facet: count for facet, bitmap in self._facet_bitmaps.items()
+            if (count := (mask & bitmap).bit_count()) > 0
+        }
+        if filter_set is not None:
+            mask &= self._get_filter_bitmap(filter_set)
+        entries = [self._entries[position] for position in self._iter_bits(mask)]
+        entries.sort(key=self._get_sort_function(sort_by), reverse=reverse)
+        return CatalogSearchResult(keys=[entry.key for entry in entries], facet_counts=facet_counts)
+
+    def _get_filter_bitmap(self, filter_set: models.SystemSearchFilterSet) -> int:
+        """Return the positions of items of any of the types of each list of the filter set."""
+        bitmap = -1  # all bits set
+        for facet_type, values in (
+                (models.SystemType, filter_set.system_types),
+                (models.AssetType, filter_set.asset_types),
+        ):
+            if len(values) == 0:
+                continue
+            facet_bitmap = 0
+            for value in values:
+                facet_bitmap |= self._facet_bitmaps.get(facet_type(value), 0)
+            bitmap &= facet_bitmap
+        return bitmap
+
+    def _find_text_candidates(self, text: str) -> set[int] | None:
+        """Return the positions of items containing all words of `text`.
+
+        Returns None when there is no text to look for.
+        """
+        words = text.casefold().split()
+        if len(words) == 0:
+            return None
+        candidates: set[int] | None = None
+        for word in sorted(words, key=len, reverse=True):
+            if len(word) >= 3:
+                postings = sorted(
+                    (self._trigrams.get(trigram, set()) for trigram in _get_trigrams(word)),
+                    key=len
+                )
+                word_candidates = set(postings[0]).intersection(*postings[1:])
+                if candidates is not None:
+                    word_candidates &= candidates
+            elif candidates is not None:
+                word_candidates = candidates
+            else:
+                word_candidates = set(range(len(self._texts)))
+            candidates = {p for p in word_candidates if word in self._texts[p]}
+            if len(candidates) == 0:
+                break
+        return candidates
+
+    @staticmethod
+    def _positions_to_bitmap(positions: typing.Collection[int]) -> int:
+        # setting the bits of a python int one by one copies it each time,
+        # setting them in a byte array and converting it once does not
+        if len(positions) == 0:
+            return 0
+        bitmap_bytes = bytearray(max(positions) // 8 + 1)
+        for position in positions:
+            bitmap_bytes[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(bitmap_bytes, "little")
+
+    @staticmethod
+    def _iter_bits(bitmap: int) -> typing.Iterator[int]:
+        # the binary representation is walked once, from the lowest bit
+        bits = bin(bitmap)[:1:-1]
+        position = bits.find("1")
+        while position != -1:
+            yield position
+            position = bits.find("1", position + 1)
+
+    @staticmethod
+    def _get_sort_function(sort_by: SortKey) -> typing.Callable[[CatalogEntry], typing.Any]:
+        return {
+            SortKey.NAME: lambda entry: entry.name,
+            SortKey.UID: lambda entry: entry.uid,
+            SortKey.TYPE: lambda entry: (entry.type_label, entry.name),
+        }[sort_by]
+
+
+class CatalogIndexManager(QtCore.QObject):
+    """Keeps one `CatalogIndex` per connection, fed by the client's responses.
+
+    Responses are indexed in background tasks (see `tasks.CatalogIndexingTask`),
+    one at a time, and the resulting indexes merged into the connection's.
+    The index only keeps entries, the items they were built from are looked
+    up with `get_items`: the most recently fetched items of each connection
+    are kept, up to `MAX_KEPT_ITEMS_PER_CONNECTION`, and older ones are
+    evicted along with their entries. Connections with a local mirror keep
+    the entries of all mirrored items, whose items are read back from the
+    mirror when needed.
+
+    The items of a connection's local mirror are added once, by an index
+    built from the mirror in a background task (see `tasks.MirrorLoaderTask`)
+    and then by the changes of each sync.
+    """
+
+    mirror_loaded = QtCore.pyqtSignal(str)  # serialized connection id
+
+    _indexes: dict[uuid.UUID, CatalogIndex]
+    _loaded_mirrors: set[uuid.UUID]
+    _kept_items: dict[uuid.UUID, collections.OrderedDict[tuple[type, str], models.OacsItem]]
+    # items waiting for the indexing task, which indexes one connection at a time
+    _pending_items: dict[uuid.UUID, list[models.OacsItem]]
+    _is_indexing: bool
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._indexes = {}
+        self._loaded_mirrors = set()
+        self._kept_items = {}
+        self._pending_items = {}
+        self._is_indexing = False
+        oacs_client.response_fetched.connect(self.handle_response)
+        oacs_client.response_batch_fetched.connect(self.handle_response)
+        settings_manager.data_source_connection_deleted.connect(
+            lambda serialized_id: self.drop_index(uuid.UUID(serialized_id)))
+
+    def get_index(self, connection_id: uuid.UUID) -> CatalogIndex:
+        return self._indexes.setdefault(connection_id, CatalogIndex())
+
+    def drop_index(self, connection_id: uuid.UUID) -> None:
+        self._indexes.pop(connection_id, None)
+        self._kept_items.pop(connection_id, None)
+        self._pending_items.pop(connection_id, None)
+        self._loaded_mirrors.discard(connection_id)
+
+    def is_mirror_loaded(self, connection_id: uuid.UUID) -> bool:
+        return connection_id in self._loaded_mirrors
+
+    def get_items(
+            self,
+            connection_id: uuid.UUID,
+            keys: typing.Iterable[tuple[typing.Type[models.OacsItem], str]],
+    ) -> list[models.OacsItem]:
+        """Return the kept items with these keys, in order.
+
+        Keys of items that are not kept, e.g. those that are only in the
+        connection's mirror, are skipped, see `get_missing_keys`.
+        """
+        kept_items = self._kept_items.get(connection_id, {})
+        return [item for key in keys if (item := kept_items.get(key)) is not None]
+
+    def get_missing_keys(
+            self,
+            connection_id: uuid.UUID,
+            keys: typing.Iterable[tuple[typing.Type[models.OacsItem], str]],
+    ) -> list[tuple[typing.Type[models.OacsItem], str]]:
+        kept_items = self._kept_items.get(connection_id, {})
+        return [key for key in keys if key not in kept_items]
+
+    def install_mirror_index(self, connection_id: uuid.UUID, mirror_index: CatalogIndex) -> None:
+        """Use an index built from the connection's mirror.
+
+        Items fetched while it was being built are more recent than the
+        mirrored ones, so they are added on top.
+        """
+        if (current_index := self._indexes.get(connection_id)) is not None:
+            mirror_index.merge(current_index)
+        self._indexes[connection_id] = mirror_index
+        self._loaded_mirrors.add(connection_id)
+        self.mirror_loaded.emit(str(connection_id))
+
+    def apply_mirror_changes(
+            self,
+            connection_id: uuid.UUID,
+            changes_index: CatalogIndex,
+            deleted_keys: typing.Iterable[tuple[typing.Type[models.OacsItem], str]],
+    ) -> None:
+        """Update the index with what a sync changed in the connection's mirror.
+
+        Kept items that changed or were deleted are forgotten, they are read
+        from the mirror from now on.
+        """
+        index = self.get_index(connection_id)
+        index.merge(changes_index)
+        kept_items = self._kept_items.get(connection_id, {})
+        for entry in changes_index:
+            kept_items.pop(entry.key, None)
+        for key in deleted_keys:
+            index.remove_entry(key)
+            kept_items.pop(key, None)
+
+    def handle_response(self, payload: typing.Any, request_metadata: OacsRequestMetadata) -> None:
+        if (connection_id := request_metadata.connection_id) is None:
+            return None
+        if isinstance(payload, models.OacsItem):
+            items = [payload]
+        elif isinstance(items := getattr(payload, "items", None), list):
+            pass
+        else:
+            log_message(f"Not indexing response of type {type(payload).__name__!r}")
+            return None
+        self.get_index(connection_id)
+        self._keep_items(connection_id, items)
+        self._pending_items.setdefault(connection_id, []).extend(items)
+        self._schedule_indexing()
+
+    def _keep_items(
+            self,
+            connection_id: uuid.UUID,
+            items: typing.Iterable[models.OacsItem],
+    ) -> None:
+        kept_items = self._kept_items.setdefault(connection_id, collections.OrderedDict())
+        for item in items:
+            key = (type(item), item.id_)
+            kept_items[key] = item
+            kept_items.move_to_end(key)
+        evict_entries = connection_id not in self._loaded_mirrors
+        while len(kept_items) > MAX_KEPT_ITEMS_PER_CONNECTION:
+            key, _ = kept_items.popitem(last=False)
+            if evict_entries:
+                self._indexes[connection_id].remove_entry(key)
+
+    def _schedule_indexing(self) -> None:
+        if self._is_indexing or len(self._pending_items) == 0:
+            return None
+        # imported here, as the tasks module depends on this one
+        from . import tasks
+
+        connection_id = next(iter(self._pending_items))
+        tasks.schedule_catalog_indexing(connection_id, self._pending_items.pop(connection_id))
+        self._is_indexing = True
+
+    def install_response_index(
+            self,
+            connection_id: uuid.UUID,
+            response_index: CatalogIndex | None,
+    ) -> None:
+        """Merge an index built by `tasks.CatalogIndexingTask` and index the next pending items."""
+        self._is_indexing = False
+        if response_index is not None and (index := self._indexes.get(connection_id)) is not None:
+            index.merge(response_index)
+            if connection_id not in self._loaded_mirrors:
+                # items may have been evicted while they were being indexed
+                kept_items = self._kept_items.get(connection_id, {})
+                for entry in response_index:
+                    if entry.key not in kept_items:
+                        index.remove_entry(entry.key)
+        self._schedule_indexing()
+
+
+catalog_index_manager = CatalogIndexManager()
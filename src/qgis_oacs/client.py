@@ -1,7 +1,9 @@
 import dataclasses
+import datetime as dt
 import enum
 import functools
 import json
+import traceback
 import typing
 import uuid
 
@@ -11,10 +13,14 @@ from qgis.PyQt import (
     QtNetwork,
 )
 
+from . import jsonstream
 from . import models
 from . import settings
 from .constants import LinkRelation, OgcLinkRelation
-from .utils import log_message
+from .utils import (
+    log_message,
+    parse_json,
+)
 
 
 class RequestType(enum.Enum):
@@ -30,16 +36,77 @@ class RequestType(enum.Enum):
     SYSTEM_ITEM = "system-item"
 
 
+# list parsers and the member of the response holding the items, for the
+# requests that can be streamed
+_STREAMABLE_LIST_TYPES: dict[RequestType, tuple[typing.Type, str]] = {
+    RequestType.SYSTEM_LIST: (models.SystemList, "features"),
+    RequestType.DEPLOYMENT_LIST: (models.DeploymentList, "features"),
+    RequestType.SAMPLING_FEATURE_LIST: (models.SamplingFeatureList, "features"),
+    RequestType.PROCEDURE_LIST: (models.ProcedureList, "features"),
+    RequestType.DATASTREAM_LIST: (models.DataStreamList, "items"),
+}
+
+# how many items of a streamed response are parsed and emitted together
+DEFAULT_STREAMING_BATCH_SIZE = 500
+
+
 @dataclasses.dataclass(frozen=True)
 class OacsRequestMetadata:
     request_type: RequestType
     request_id: uuid.UUID = dataclasses.field(default_factory=uuid.uuid4)
+    search_params: models.ClientSearchParams | None = None
+    connection_id: uuid.UUID | None = None
+    requested_at: dt.datetime = dataclasses.field(
+        default_factory=lambda: dt.datetime.now(dt.timezone.utc))
+
+
+class _StreamedResponse:
+    """A list response which is parsed while it is being received."""
+
+    reply: QtNetwork.QNetworkReply
+    list_type: typing.Type
+    items_key: str
+    batch_size: int
+    parser: jsonstream.ListResponseStreamParser
+    pending_items: list[dict]
+
+    def __init__(
+            self,
+            reply: QtNetwork.QNetworkReply,
+            list_type: typing.Type,
+            items_key: str,
+            batch_size: int
+    ):
+        self.reply = reply
+        self.list_type = list_type
+        self.items_key = items_key
+        self.batch_size = batch_size
+        self.parser = jsonstream.ListResponseStreamParser(items_key)
+        self.pending_items = []
+
+    def cancel(self) -> None:
+        self.reply.abort()
+
+    def is_http_error(self) -> bool:
+        status = self.reply.attribute(QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        return status is not None and int(status) >= 400
+
+    def take_batches(self, final: bool = False) -> typing.Iterator[typing.Any]:
+        """Parse the pending items into lists of `batch_size`, the last one may be shorter if `final`."""
+        while len(self.pending_items) >= self.batch_size or (final and self.pending_items):
+            batch = self.pending_items[:self.batch_size]
+            del self.pending_items[:self.batch_size]
+            yield self.list_type.from_api_response({self.items_key: batch})
 
 
 class OacsClient(QtCore.QObject):
     request_started = QtCore.pyqtSignal(OacsRequestMetadata)
     request_ended = QtCore.pyqtSignal(OacsRequestMetadata)
     request_failed = QtCore.pyqtSignal(OacsRequestMetadata, str)
+    # emitted for every successfully parsed response, alongside the specific signal
+    response_fetched = QtCore.pyqtSignal(object, OacsRequestMetadata)
+    # emitted with each batch of items of a streamed list response
+    response_batch_fetched = QtCore.pyqtSignal(object, OacsRequestMetadata)
     deployment_list_fetched = QtCore.pyqtSignal(models.DeploymentList, OacsRequestMetadata)
     deployment_item_fetched = QtCore.pyqtSignal(models.Deployment, OacsRequestMetadata)
     system_list_fetched = QtCore.pyqtSignal(models.SystemList, OacsRequestMetadata)
@@ -51,25 +118,43 @@ class OacsClient(QtCore.QObject):
     datastream_list_fetched = QtCore.pyqtSignal(models.DataStreamList, OacsRequestMetadata)
     datastream_item_fetched = QtCore.pyqtSignal(models.DataStream, OacsRequestMetadata)
 
+    _in_flight: dict[
+        uuid.UUID,
+        tuple[qgis.core.QgsNetworkContentFetcherTask | _StreamedResponse, OacsRequestMetadata]
+    ]
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._in_flight = {}
+
     def initiate_system_list_search(
             self,
             connection: settings.DataSourceConnectionSettings,
-            q_filter: str | None = None
+            q_filter: str | None = None,
+            streamed: bool = False,
     ) -> OacsRequestMetadata:
         query = {
             "f": "geojson" if connection.use_f_query_param else None,
-            "q": q_filter,
+            "q": q_filter or None,
         }
-        meta = OacsRequestMetadata(request_type=RequestType.SYSTEM_LIST)
-        self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                "/systems",
-                query=(
-                    {k: v for k, v in query.items() if v is not None}
-                    if query else None
-                ),
-                headers={"Accept": "application/geo+json"},
+        search_params = models.ClientSearchParams(
+            "/systems",
+            query=(
+                {k: v for k, v in query.items() if v is not None}
+                if query else None
             ),
+            headers={"Accept": "application/geo+json"},
+        )
+        if streamed:
+            return self.initiate_streaming_search(
+                RequestType.SYSTEM_LIST, search_params, connection)
+        meta = OacsRequestMetadata(
+            request_type=RequestType.SYSTEM_LIST,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
+        self.dispatch_network_request(
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -86,21 +171,30 @@ class OacsClient(QtCore.QObject):
             self,
             connection: settings.DataSourceConnectionSettings,
             q_filter: str | None = None,
+            streamed: bool = False,
     ) -> OacsRequestMetadata:
         query = {
             "f": "geojson" if connection.use_f_query_param else None,
-            "q": q_filter,
+            "q": q_filter or None,
         }
-        meta = OacsRequestMetadata(request_type=RequestType.DEPLOYMENT_LIST)
-        self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                "/deployments",
-                query=(
-                    {k: v for k, v in query.items() if v is not None}
-                    if query else None
-                ),
-                headers={"Accept": "application/geo+json"},
+        search_params = models.ClientSearchParams(
+            "/deployments",
+            query=(
+                {k: v for k, v in query.items() if v is not None}
+                if query else None
             ),
+            headers={"Accept": "application/geo+json"},
+        )
+        if streamed:
+            return self.initiate_streaming_search(
+                RequestType.DEPLOYMENT_LIST, search_params, connection)
+        meta = OacsRequestMetadata(
+            request_type=RequestType.DEPLOYMENT_LIST,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
+        self.dispatch_network_request(
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -115,22 +209,31 @@ class OacsClient(QtCore.QObject):
     def initiate_procedure_list_search(
             self,
             connection: settings.DataSourceConnectionSettings,
-            q_filter: str | None = None
+            q_filter: str | None = None,
+            streamed: bool = False,
     ) -> OacsRequestMetadata:
         query = {
             "f": "geojson" if connection.use_f_query_param else None,
-            "q": q_filter,
+            "q": q_filter or None,
         }
-        meta = OacsRequestMetadata(request_type=RequestType.PROCEDURE_LIST)
-        self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                "/procedures",
-                query=(
-                    {k: v for k, v in query.items() if v is not None}
-                    if query else None
-                ),
-                headers={"Accept": "application/geo+json"},
+        search_params = models.ClientSearchParams(
+            "/procedures",
+            query=(
+                {k: v for k, v in query.items() if v is not None}
+                if query else None
             ),
+            headers={"Accept": "application/geo+json"},
+        )
+        if streamed:
+            return self.initiate_streaming_search(
+                RequestType.PROCEDURE_LIST, search_params, connection)
+        meta = OacsRequestMetadata(
+            request_type=RequestType.PROCEDURE_LIST,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
+        self.dispatch_network_request(
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -146,21 +249,30 @@ class OacsClient(QtCore.QObject):
             self,
             connection: settings.DataSourceConnectionSettings,
             q_filter: str | None = None,
+            streamed: bool = False,
     ) -> OacsRequestMetadata:
         query = {
             "f": "geojson" if connection.use_f_query_param else None,
-            "q": q_filter,
+            "q": q_filter or None,
         }
-        meta = OacsRequestMetadata(request_type=RequestType.SAMPLING_FEATURE_LIST)
-        self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                "/samplingFeatures",
-                query=(
-                    {k: v for k, v in query.items() if v is not None}
-                    if query else None
-                ),
-                headers={"Accept": "application/geo+json"},
+        search_params = models.ClientSearchParams(
+            "/samplingFeatures",
+            query=(
+                {k: v for k, v in query.items() if v is not None}
+                if query else None
             ),
+            headers={"Accept": "application/geo+json"},
+        )
+        if streamed:
+            return self.initiate_streaming_search(
+                RequestType.SAMPLING_FEATURE_LIST, search_params, connection)
+        meta = OacsRequestMetadata(
+            request_type=RequestType.SAMPLING_FEATURE_LIST,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
+        self.dispatch_network_request(
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -176,21 +288,30 @@ class OacsClient(QtCore.QObject):
             self,
             connection: settings.DataSourceConnectionSettings,
             q_filter: str | None = None,
+            streamed: bool = False,
     ) -> OacsRequestMetadata:
         query = {
             "f": "json" if connection.use_f_query_param else None,
-            "q": q_filter,
+            "q": q_filter or None,
         }
-        meta = OacsRequestMetadata(request_type=RequestType.DATASTREAM_LIST)
-        self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                "/datastreams",
-                query=(
-                    {k: v for k, v in query.items() if v is not None}
-                    if query else None
-                ),
-                headers={"Accept": "application/json"},
+        search_params = models.ClientSearchParams(
+            "/datastreams",
+            query=(
+                {k: v for k, v in query.items() if v is not None}
+                if query else None
             ),
+            headers={"Accept": "application/json"},
+        )
+        if streamed:
+            return self.initiate_streaming_search(
+                RequestType.DATASTREAM_LIST, search_params, connection)
+        meta = OacsRequestMetadata(
+            request_type=RequestType.DATASTREAM_LIST,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
+        self.dispatch_network_request(
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -210,13 +331,18 @@ class OacsClient(QtCore.QObject):
         query = {
             "f": "geojson" if connection.use_f_query_param else None
         }
-        meta = OacsRequestMetadata(request_type=RequestType.SYSTEM_ITEM)
+        search_params = models.ClientSearchParams(
+            f"/systems/{system_id}",
+            query={k: v for k, v in query.items()} if query else None,
+            headers={"Accept": "application/geo+json"},
+        )
+        meta = OacsRequestMetadata(
+            request_type=RequestType.SYSTEM_ITEM,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
         self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                f"/systems/{system_id}",
-                query={k: v for k, v in query.items()} if query else None,
-                headers={"Accept": "application/geo+json"},
-            ),
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -236,13 +362,18 @@ class OacsClient(QtCore.QObject):
         query = {
             "f": "geojson" if connection.use_f_query_param else None
         }
-        meta = OacsRequestMetadata(request_type=RequestType.DEPLOYMENT_ITEM)
+        search_params = models.ClientSearchParams(
+            f"/deployments/{deployment_id}",
+            query={k: v for k, v in query.items()} if query else None,
+            headers={"Accept": "application/geo+json"},
+        )
+        meta = OacsRequestMetadata(
+            request_type=RequestType.DEPLOYMENT_ITEM,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
         self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                f"/deployments/{deployment_id}",
-                query={k: v for k, v in query.items()} if query else None,
-                headers={"Accept": "application/geo+json"},
-            ),
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -262,13 +393,18 @@ class OacsClient(QtCore.QObject):
         query = {
             "f": "geojson" if connection.use_f_query_param else None
         }
-        meta = OacsRequestMetadata(request_type=RequestType.SAMPLING_FEATURE_ITEM)
+        search_params = models.ClientSearchParams(
+            f"/samplingFeatures/{sampling_feature_id}",
+            query={k: v for k, v in query.items()} if query else None,
+            headers={"Accept": "application/geo+json"},
+        )
+        meta = OacsRequestMetadata(
+            request_type=RequestType.SAMPLING_FEATURE_ITEM,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
         self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                f"/samplingFeatures/{sampling_feature_id}",
-                query={k: v for k, v in query.items()} if query else None,
-                headers={"Accept": "application/geo+json"},
-            ),
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -288,13 +424,18 @@ class OacsClient(QtCore.QObject):
         query = {
             "f": "geojson" if connection.use_f_query_param else None
         }
-        meta = OacsRequestMetadata(request_type=RequestType.PROCEDURE_ITEM)
+        search_params = models.ClientSearchParams(
+            f"/procedures/{procedure_id}",
+            query={k: v for k, v in query.items()} if query else None,
+            headers={"Accept": "application/geo+json"},
+        )
+        meta = OacsRequestMetadata(
+            request_type=RequestType.PROCEDURE_ITEM,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
         self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                f"/procedures/{procedure_id}",
-                query={k: v for k, v in query.items()} if query else None,
-                headers={"Accept": "application/geo+json"},
-            ),
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -314,13 +455,18 @@ class OacsClient(QtCore.QObject):
         query = {
             "f": "json" if connection.use_f_query_param else None
         }
-        meta = OacsRequestMetadata(request_type=RequestType.DATASTREAM_ITEM)
+        search_params = models.ClientSearchParams(
+            f"/datastreams/{datastream_id}",
+            query={k: v for k, v in query.items()} if query else None,
+            headers={"Accept": "application/json"},
+        )
+        meta = OacsRequestMetadata(
+            request_type=RequestType.DATASTREAM_ITEM,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
         self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                f"/datastreams/{datastream_id}",
-                query={k: v for k, v in query.items()} if query else None,
-                headers={"Accept": "application/json"},
-            ),
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -381,12 +527,68 @@ class OacsClient(QtCore.QObject):
             log_message(f"Unsupported link relation: {link.rel}")
             return None
         request_type, parser, signal, headers = config
-        meta = OacsRequestMetadata(request_type=request_type)
+        search_params = models.ClientSearchParams(
+            url_or_relative_path=link.href,
+            headers=headers,
+        )
+        meta = OacsRequestMetadata(
+            request_type=request_type,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
         self.dispatch_network_request(
-            search_params=models.ClientSearchParams(
-                url_or_relative_path=link.href,
-                headers=headers,
+            search_params=search_params,
+            connection=connection,
+            task_metadata=meta,
+            response_handler=functools.partial(
+                self.handle_network_response,
+                parser=parser,
+                to_emit=signal,
             ),
+        )
+        self.request_started.emit(meta)
+        return meta
+
+    def initiate_search(
+            self,
+            request_type: RequestType,
+            search_params: models.ClientSearchParams,
+            connection: settings.DataSourceConnectionSettings
+    ) -> OacsRequestMetadata:
+        """Initiate a request of the given type with previously built search parameters.
+
+        This is used to repeat a request, for example when refreshing a layer.
+        """
+        request_config = {
+            RequestType.SYSTEM_LIST: (
+                models.SystemList.from_api_response, self.system_list_fetched),
+            RequestType.SYSTEM_ITEM: (
+                models.System.from_api_response, self.system_item_fetched),
+            RequestType.DEPLOYMENT_LIST: (
+                models.DeploymentList.from_api_response, self.deployment_list_fetched),
+            RequestType.DEPLOYMENT_ITEM: (
+                models.Deployment.from_api_response, self.deployment_item_fetched),
+            RequestType.SAMPLING_FEATURE_LIST: (
+                models.SamplingFeatureList.from_api_response, self.sampling_feature_list_fetched),
+            RequestType.SAMPLING_FEATURE_ITEM: (
+                models.SamplingFeature.from_api_response, self.sampling_feature_item_fetched),
+            RequestType.PROCEDURE_LIST: (
+                models.ProcedureList.from_api_response, self.procedure_list_fetched),
+            RequestType.PROCEDURE_ITEM: (
+                models.Procedure.from_api_response, self.procedure_item_fetched),
+            RequestType.DATASTREAM_LIST: (
+                models.DataStreamList.from_api_response, self.datastream_list_fetched),
+            RequestType.DATASTREAM_ITEM: (
+                models.DataStream.from_api_response, self.datastream_item_fetched),
+        }
+        parser, signal = request_config[request_type]
+        meta = OacsRequestMetadata(
+            request_type=request_type,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
+        self.dispatch_network_request(
+            search_params=search_params,
             connection=connection,
             task_metadata=meta,
             response_handler=functools.partial(
@@ -398,6 +600,64 @@ class OacsClient(QtCore.QObject):
         self.request_started.emit(meta)
         return meta
 
+    def initiate_streaming_search(
+            self,
+            request_type: RequestType,
+            search_params: models.ClientSearchParams,
+            connection: settings.DataSourceConnectionSettings,
+            batch_size: int = DEFAULT_STREAMING_BATCH_SIZE,
+    ) -> OacsRequestMetadata:
+        """Initiate a list request whose items are parsed and emitted as they arrive.
+
+        Items are emitted by `response_batch_fetched`, in lists of the same
+        type as the non-streamed request would give, of up to `batch_size`
+        items. `request_ended` marks the end of the response. Neither
+        `response_fetched` nor the request type's own signal are emitted, as
+        the whole list is never put together - this is meant for responses
+        too large to be held in memory at once.
+        """
+        try:
+            list_type, items_key = _STREAMABLE_LIST_TYPES[request_type]
+        except KeyError:
+            raise ValueError(
+                f"Responses of {request_type.value!r} requests cannot be streamed") from None
+        meta = OacsRequestMetadata(
+            request_type=request_type,
+            search_params=search_params,
+            connection_id=connection.id,
+        )
+        request = build_network_request(search_params, connection)
+        if connection.auth_config:
+            qgis.core.QgsApplication.authManager().updateNetworkRequest(
+                request, connection.auth_config)
+        reply = qgis.core.QgsNetworkAccessManager.instance().get(request)
+        if connection.auth_config:
+            qgis.core.QgsApplication.authManager().updateNetworkReply(
+                reply, connection.auth_config)
+        streamed_response = _StreamedResponse(reply, list_type, items_key, batch_size)
+        self._in_flight[meta.request_id] = (streamed_response, meta)
+        reply.readyRead.connect(
+            functools.partial(self.handle_streamed_response_data, streamed_response, meta))
+        reply.finished.connect(
+            functools.partial(self.handle_streamed_response_finished, streamed_response, meta))
+        self.request_started.emit(meta)
+        return meta
+
+    def cancel_request(self, request_id: uuid.UUID) -> bool:
+        """Cancel an in-flight request, returning whether there was one to cancel.
+
+        The response of a canceled request is discarded, no `*_fetched` nor
+        `request_failed` signal is emitted for it.
+        """
+        try:
+            api_request_task, task_metadata = self._in_flight.pop(request_id)
+        except KeyError:
+            return False
+        api_request_task.cancel()
+        log_message(f"Canceled request {request_id}")
+        self.request_ended.emit(task_metadata)
+        return True
+
     def handle_network_response(
             self,
             response: qgis.core.QgsNetworkContentFetcherTask,
@@ -412,6 +672,8 @@ class OacsClient(QtCore.QObject):
             return None
         elif task_metadata.request_id != target_task_metadata.request_id:
             return None
+        elif self._in_flight.pop(task_metadata.request_id, None) is None:
+            return None  # request has been canceled, it has already been reported as ended
         try:
             if reply.error() != QtNetwork.QNetworkReply.NetworkError.NoError:
                 http_status = reply.attribute(
@@ -420,9 +682,80 @@ class OacsClient(QtCore.QObject):
                 self.request_failed.emit(task_metadata, error_message)
                 log_message(f"Connection error {error_message!r}")
             else:
-                response_payload = response.contentAsString()
-                parsed_payload = parser(json.loads(response_payload))
+                # the body is parsed from the reply's bytes, `contentAsString`
+                # would first decode it to a QString and then a python str
+                parsed_payload = parser(parse_json(reply.readAll()))
                 to_emit.emit(parsed_payload, task_metadata)
+                self.response_fetched.emit(parsed_payload, task_metadata)
+        except json.JSONDecodeError as err:
+            error_message = f"Could not parse response to JSON: {str(err)}"
+            log_message(error_message)
+            self.request_failed.emit(task_metadata, error_message)
+        except Exception as err:
+            error_message = f"Unexpected error: {str(err)}"
+            log_message(error_message)
+            log_message(traceback.format_exc())
+            self.request_failed.emit(task_metadata, error_message)
+        finally:
+            self.request_ended.emit(task_metadata)
+
+    def handle_streamed_response_data(
+            self,
+            streamed_response: _StreamedResponse,
+            task_metadata: OacsRequestMetadata
+    ) -> None:
+        if task_metadata.request_id not in self._in_flight:
+            return None  # request has been canceled, or has already failed
+        if streamed_response.is_http_error():
+            return None  # reported once the reply is finished
+        try:
+            streamed_response.pending_items.extend(
+                streamed_response.parser.feed(memoryview(streamed_response.reply.readAll())))
+            for batch in streamed_response.take_batches():
+                self.response_batch_fetched.emit(batch, task_metadata)
+        except json.JSONDecodeError as err:
+            self._abort_streamed_response(
+                streamed_response, task_metadata, f"Could not parse response to JSON: {str(err)}")
+        except Exception as err:
+            log_message(traceback.format_exc())
+            self._abort_streamed_response(
+                streamed_response, task_metadata, f"Unexpected error: {str(err)}")
+
+    def _abort_streamed_response(
+            self,
+            streamed_response: _StreamedResponse,
+            task_metadata: OacsRequestMetadata,
+            error_message: str
+    ) -> None:
+        # the reply is finished by aborting it, which is then ignored
+        del self._in_flight[task_metadata.request_id]
+        streamed_response.cancel()
+        log_message(error_message)
+        self.request_failed.emit(task_metadata, error_message)
+        self.request_ended.emit(task_metadata)
+
+    def handle_streamed_response_finished(
+            self,
+            streamed_response: _StreamedResponse,
+            task_metadata: OacsRequestMetadata
+    ) -> None:
+        reply = streamed_response.reply
+        reply.deleteLater()
+        if self._in_flight.pop(task_metadata.request_id, None) is None:
+            return None  # request has been canceled, it has already been reported as ended
+        try:
+            if reply.error() != QtNetwork.QNetworkReply.NetworkError.NoError:
+                http_status = reply.attribute(
+                    QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+                error_message = f"HTTP code {http_status}: {reply.errorString()}"
+                self.request_failed.emit(task_metadata, error_message)
+                log_message(f"Connection error {error_message!r}")
+            else:
+                parser = streamed_response.parser
+                streamed_response.pending_items.extend(parser.feed(memoryview(reply.readAll())))
+                streamed_response.pending_items.extend(parser.close())
+                for batch in streamed_response.take_batches(final=True):
+                    self.response_batch_fetched.emit(batch, task_metadata)
         except json.JSONDecodeError as err:
             error_message = f"Could not parse response to JSON: {str(err)}"
             log_message(error_message)
@@ -430,7 +763,6 @@ class OacsClient(QtCore.QObject):
         except Exception as err:
             error_message = f"Unexpected error: {str(err)}"
             log_message(error_message)
-            import traceback
             log_message(traceback.format_exc())
             self.request_failed.emit(task_metadata, error_message)
         finally:
@@ -444,31 +776,14 @@ class OacsClient(QtCore.QObject):
             response_handler: typing.Callable[
                 [qgis.core.QgsNetworkContentFetcherTask], None]
     ) -> None:
-        request_query = QtCore.QUrlQuery()
-        query_items = {
-            **(search_params.query or {})
-        }
-        if len(query_items) > 0:
-            request_query.setQueryItems(list(query_items.items()))
-        if search_params.url_or_relative_path.startswith("/"):
-            request_url = QtCore.QUrl(
-                f"{connection.base_url}{search_params.url_or_relative_path}")
-        else:
-            request_url = QtCore.QUrl(f"{search_params.url_or_relative_path}")
-        if not request_query.isEmpty():
-            request_url.setQuery(request_query)
-        request = QtNetwork.QNetworkRequest(request_url)
-        for header_name, header_value in search_params.headers.items():
-            request.setRawHeader(
-                header_name.capitalize().encode(),
-                header_value.encode()
-            )
+        request = build_network_request(search_params, connection)
         api_request_task = qgis.core.QgsNetworkContentFetcherTask(
             request=request,
             authcfg=connection.auth_config,
             description=f"test-oacs-plugin-search"
         )
         api_request_task.oacs_metadata = task_metadata
+        self._in_flight[task_metadata.request_id] = (api_request_task, task_metadata)
         qgis.core.QgsApplication.taskManager().addTask(api_request_task)
         handler = functools.partial(
             response_handler,
@@ -478,4 +793,37 @@ class OacsClient(QtCore.QObject):
         api_request_task.fetched.connect(handler)
 
 
+def build_request_url(
+        search_params: models.ClientSearchParams,
+        connection: settings.DataSourceConnectionSettings,
+) -> QtCore.QUrl:
+    request_query = QtCore.QUrlQuery()
+    query_items = {
+        **(search_params.query or {})
+    }
+    if len(query_items) > 0:
+        request_query.setQueryItems(list(query_items.items()))
+    if search_params.url_or_relative_path.startswith("/"):
+        request_url = QtCore.QUrl(
+            f"{connection.base_url}{search_params.url_or_relative_path}")
+    else:
+        request_url = QtCore.QUrl(f"{search_params.url_or_relative_path}")
+    if not request_query.isEmpty():
+        request_url.setQuery(request_query)
+    return request_url
+
+
+def build_network_request(
+        search_params: models.ClientSearchParams,
+        connection: settings.DataSourceConnectionSettings,
+) -> QtNetwork.QNetworkRequest:
+    request = QtNetwork.QNetworkRequest(build_request_url(search_params, connection))
+    for header_name, header_value in search_params.headers.items():
+        request.setRawHeader(
+            header_name.capitalize().encode(),
+            header_value.encode()
+        )
+    return request
+
+
 oacs_client = OacsClient()
\ No newline at end of file
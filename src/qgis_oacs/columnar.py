@@ -0,0 +1,191 @@
+"""Column-oriented feature lists, for result sets too large for one object per feature.
+
+A `ColumnarFeatureList` keeps what layers are split and built on in NumPy
+arrays: geometry types as small integer codes and point coordinates as float64
+arrays. Layers are built by grouping rows with array operations, and point
+geometries straight from the coordinate arrays. The columns are read from the
+raw API responses of lazily parsed features, so their geometry field is not
+parsed.
+
+NumPy is shipped with QGIS on most platforms but is not a hard requirement of
+the plugin, check `is_available` before building columnar lists.
+"""
+
+import dataclasses
+import itertools
+import typing
+
+import qgis.core
+
+from . import (
+    geometries,
+    models,
+)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# geometry codes are indexes into this table, or one of the negative values below
+GEOMETRY_TYPES = (
+    "Point",
+    "MultiPoint",
+    "LineString",
+    "MultiLineString",
+    "Polygon",
+    "MultiPolygon",
+)
+NO_GEOMETRY = -1
+# geometry collections, 3D and malformed geometries, which are left to the row objects
+OTHER_GEOMETRY = -2
+_GEOMETRY_CODES = {name: code for code, name in enumerate(GEOMETRY_TYPES)}
+_POINT_CODE = _GEOMETRY_CODES["Point"]
+# how many levels of lists to flatten to get to the positions of each geometry
+# type, points being a single position
+_POSITION_DEPTHS = (0, 0, 0, 1, 1, 2)
+_WKB_TYPES_BY_GEOMETRY_CODE = (
+    qgis.core.Qgis.WkbType.Point,
+    qgis.core.Qgis.WkbType.MultiPoint,
+    qgis.core.Qgis.WkbType.LineString,
+    qgis.core.Qgis.WkbType.MultiLineString,
+    qgis.core.Qgis.WkbType.Polygon,
+    qgis.core.Qgis.WkbType.MultiPolygon,
+)
+
+_NAN_POINT = (float("nan"),) * 2
+
+
+def is_available() -> bool:
+    return np is not None
+
+
+def get_wkb_type(geometry_code: int) -> qgis.core.Qgis.WkbType:
+    return _WKB_TYPES_BY_GEOMETRY_CODE[geometry_code]
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class ColumnarFeatureList:
+    """Features of a single type, with their geometries stored as columns.
+
+    The feature objects themselves are the rows, other fields are read from
+    them when needed.
+    """
+
+    item_type: typing.Type[models.OacsFeature]
+    # codes into `GEOMETRY_TYPES`, or `NO_GEOMETRY` or `OTHER_GEOMETRY`
+    geometry_codes: "np.ndarray"
+    # coordinates of 2D points, NaN for other geometries
+    x: "np.ndarray"
+    y: "np.ndarray"
+    _rows: typing.Sequence[models.OacsFeature] = dataclasses.field(repr=False)
+
+    @classmethod
+    def from_features(
+            cls,
+            item_type: typing.Type[models.OacsFeature],
+            features: typing.Sequence[models.OacsFeature],
+    ) -> "ColumnarFeatureList":
+        """Build a columnar list out of feature objects.
+
+        Geometries of lazily parsed features are read from their raw
+        response, without parsing the geometry field, and no other field is
+        read. The sequence is kept as is as the rows, it must not be modified
+        afterwards.
+        """
+        if np is None:
+            raise RuntimeError("Columnar feature lists need NumPy, which is not installed")
+        geometry_codes = []
+        points = []
+        for feature in features:
+            if (raw_feature := feature._raw_response) is not None:
+                geometry_code, point = _read_raw_geometry(raw_feature.get("geometry"))
+            else:
+                geometry_code, point = _read_geometry(feature.geometry)
+            geometry_codes.append(geometry_code)
+            points.append(point)
+        points_array = np.array(points, dtype=np.float64).reshape(len(features), 2)
+        return cls(
+            item_type=item_type,
+            geometry_codes=np.array(geometry_codes, dtype=np.int8),
+            x=points_array[:, 0].copy(),
+            y=points_array[:, 1].copy(),
+            _rows=features,
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def row(self, index: int) -> models.OacsFeature:
+        return self._rows[index]
+
+    def build_geometries(self, indexes: typing.Sequence[int]) -> list[qgis.core.QgsGeometry | None]:
+        """Build the geometries of rows with the same geometry code, all together.
+
+        Points are made from the coordinate columns and other geometries from
+        the raw responses, without parsing the geometry of the feature objects.
+        Rows of features that were parsed eagerly, or whose geometry code is
+        `OTHER_GEOMETRY`, get None and are left to their feature object.
+        """
+        codes = set(self.geometry_codes[indexes].tolist())
+        if codes == {_POINT_CODE}:
+            return geometries.build_point_geometries(
+                self.x[indexes].tolist(), self.y[indexes].tolist())
+        result = [None] * len(indexes)
+        if OTHER_GEOMETRY in codes or NO_GEOMETRY in codes:
+            return result
+        raw_positions = []
+        raw_geometries = []
+        for position, index in enumerate(indexes):
+            if (raw_response := self._rows[index]._raw_response) is not None:
+                raw_positions.append(position)
+                raw_geometries.append(raw_response["geometry"])
+        for position, geometry in zip(raw_positions, geometries.build_geometries(raw_geometries)):
+            result[position] = geometry
+        return result
+
+    def group_by_geometry_code(self) -> dict[int, "np.ndarray"]:
+        """Return the indexes of the rows with each geometry code, in order."""
+        order = np.argsort(self.geometry_codes, kind="stable")
+        codes, starts = np.unique(self.geometry_codes[order], return_index=True)
+        return {
+            code: indexes
+            for code, indexes in zip(codes.tolist(), np.split(order, starts[1:]))
+        }
+
+
+def _read_raw_geometry(raw_geometry: typing.Any) -> tuple[int, tuple[float, float]]:
+    if not raw_geometry:
+        return NO_GEOMETRY, _NAN_POINT
+    if (code := _GEOMETRY_CODES.get(raw_geometry.get("type"))) is None:
+        return OTHER_GEOMETRY, _NAN_POINT
+    try:
+        positions = raw_geometry["coordinates"]
+        for _ in range(_POSITION_DEPTHS[code]):
+            positions = itertools.chain.from_iterable(positions)
+        if code == _POINT_CODE:
+            positions = (positions,)
+        # only 2D geometries with numeric coordinates are described by their code
+        point = _NAN_POINT
+        for position in positions:
+            if len(position) != 2:
+                return OTHER_GEOMETRY, _NAN_POINT
+            point = (float(position[0]), float(position[1]))
+    except (KeyError, IndexError, TypeError, ValueError):
+        return OTHER_GEOMETRY, _NAN_POINT
+    return code, point if code == _POINT_CODE else _NAN_POINT
+
+
+def _read_geometry(
+        geometry: qgis.core.QgsReferencedGeometry | None
+) -> tuple[int, tuple[float, float]]:
+    if not geometry:
+        return NO_GEOMETRY, _NAN_POINT
+    wkb_type = geometry.wkbType()
+    if wkb_type not in _WKB_TYPES_BY_GEOMETRY_CODE:
+        return OTHER_GEOMETRY, _NAN_POINT
+    code = _WKB_TYPES_BY_GEOMETRY_CODE.index(wkb_type)
+    if code == _POINT_CODE:
+        point = geometry.asPoint()
+        return code, (point.x(), point.y())
+    return code, _NAN_POINT
+
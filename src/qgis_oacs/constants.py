@@ -26,6 +26,18 @@ class IconPath:
     system_asset_type_group = ":/plugins/qgis_oacs/manufacturing.svg"
     system_asset_type_other = ":/plugins/qgis_oacs/manufacturing.svg"
 
+    @classmethod
+    def all(cls) -> set[str]:
+        return {
+            value for name, value in vars(cls).items()
+            if not name.startswith("_") and isinstance(value, str)
+        }
+
+
+# prefix of the custom properties recording where a layer was loaded from, see
+# `layers.LayerProvenance`
+LAYER_CUSTOM_PROPERTY_PREFIX = "qgis_oacs"
+
 
 # we look for both `rel=<name>` and `rel=ogc-rel:<name>` because of:
 #
@@ -0,0 +1,133 @@
+"""Build QGIS geometries straight from GeoJSON coordinate arrays.
+
+Going through `QgsJsonUtils.geometryFromGeoJson` means serializing each
+geometry back to a JSON string and having QGIS parse it again, which is most
+of the cost of parsing a response with many features. The builders here
+create the geometry objects directly from the already decoded coordinates,
+with whole rings and lines being passed to QGIS as coordinate arrays. Lists of
+geometries of the same type can be built in batches, see `build_geometries`.
+"""
+
+import functools
+import itertools
+import json
+import typing
+
+import qgis.core
+
+Position = typing.Sequence[float]
+
+
+@functools.lru_cache(maxsize=1)
+def get_default_crs() -> qgis.core.QgsCoordinateReferenceSystem:
+    """Return the CRS of GeoJSON coordinates.
+
+    CRS objects are implicitly shared, so handing out the same instance to
+    every geometry avoids looking it up again for each feature.
+    """
+    return qgis.core.QgsCoordinateReferenceSystem("EPSG:4326")
+
+
+def _build_point(position: Position) -> qgis.core.QgsPoint:
+    if len(position) > 2:
+        return qgis.core.QgsPoint(position[0], position[1], position[2])
+    return qgis.core.QgsPoint(position[0], position[1])
+
+
+def _build_line_string(positions: typing.Sequence[Position]) -> qgis.core.QgsLineString:
+    xs = [position[0] for position in positions]
+    ys = [position[1] for position in positions]
+    if len(positions) > 0 and all(len(position) > 2 for position in positions):
+        return qgis.core.QgsLineString(xs, ys, [position[2] for position in positions])
+    return qgis.core.QgsLineString(xs, ys)
+
+
+def _build_polygon(rings: typing.Sequence[typing.Sequence[Position]]) -> qgis.core.QgsPolygon:
+    polygon = qgis.core.QgsPolygon()
+    if len(rings) > 0:
+        polygon.setExteriorRing(_build_line_string(rings[0]))
+        for interior_ring in rings[1:]:
+            polygon.addInteriorRing(_build_line_string(interior_ring))
+    return polygon
+
+
+def _build_collection(
+        collection: qgis.core.QgsGeometryCollection,
+        parts: typing.Iterable[qgis.core.QgsAbstractGeometry],
+) -> qgis.core.QgsGeometryCollection:
+    for part in parts:
+        collection.addGeometry(part)
+    return collection
+
+
+_BUILDERS: dict[str, typing.Callable[[typing.Any], qgis.core.QgsAbstractGeometry]] = {
+    "Point": _build_point,
+    "LineString": _build_line_string,
+    "Polygon": _build_polygon,
+    "MultiPoint": lambda coordinates: _build_collection(
+        qgis.core.QgsMultiPoint(), (_build_point(p) for p in coordinates)),
+    "MultiLineString": lambda coordinates: _build_collection(
+        qgis.core.QgsMultiLineString(), (_build_line_string(p) for p in coordinates)),
+    "MultiPolygon": lambda coordinates: _build_collection(
+        qgis.core.QgsMultiPolygon(), (_build_polygon(p) for p in coordinates)),
+}
+
+
+def build_geometry(raw_geometry: dict) -> qgis.core.QgsGeometry:
+    """Build a geometry from a GeoJSON geometry object.
+
+    Geometry collections and malformed coordinates are left to
+    `QgsJsonUtils`, which is slower but handles them like it always did.
+    """
+    builder = _BUILDERS.get(raw_geometry.get("type"))
+    if builder is not None:
+        try:
+            return qgis.core.QgsGeometry(builder(raw_geometry["coordinates"]))
+        except (KeyError, IndexError, TypeError):
+            pass
+    return qgis.core.QgsJsonUtils.geometryFromGeoJson(json.dumps(raw_geometry))
+
+
+def build_geometries(raw_geometries: typing.Iterable[dict]) -> list[qgis.core.QgsGeometry]:
+    """Build the geometries of many GeoJSON geometry objects, e.g. of all features of a layer.
+
+    This gives the same geometries as calling `build_geometry` on each of
+    them, but runs of geometries of the same type, the usual case, are built
+    together: the builder is looked up once per run and each geometry is only
+    handed over to `build_geometry` if the builder cannot handle it.
+    """
+    result = []
+    for geometry_type, run in itertools.groupby(raw_geometries, key=lambda raw: raw.get("type")):
+        if (builder := _BUILDERS.get(geometry_type)) is None:
+            result.extend(build_geometry(raw_geometry) for raw_geometry in run)
+            continue
+        for raw_geometry in run:
+            try:
+                result.append(qgis.core.QgsGeometry(builder(raw_geometry["coordinates"])))
+            except (KeyError, IndexError, TypeError):
+                result.append(build_geometry(raw_geometry))
+    return result
+
+
+def build_point_geometries(
+        xs: typing.Sequence[float],
+        ys: typing.Sequence[float]
+) -> list[qgis.core.QgsGeometry]:
+    """Build 2D point geometries out of coordinate arrays."""
+    return [qgis.core.QgsGeometry(qgis.core.QgsPoint(x, y)) for x, y in zip(xs, ys)]
+
+
+def build_referenced_geometry(raw_geometry: dict) -> qgis.core.QgsReferencedGeometry:
+    return qgis.core.QgsReferencedGeometry(build_geometry(raw_geometry), get_default_crs())
+
+
+def build_referenced_rectangle(raw_bbox: typing.Sequence[float]) -> qgis.core.QgsReferencedRectangle:
+    """Build a rectangle from a GeoJSON bbox, which may have 4 or 6 (3D) values."""
+    if len(raw_bbox) == 6:
+        x_min, y_min, _, x_max, y_max, _ = raw_bbox
+    elif len(raw_bbox) == 4:
+        x_min, y_min, x_max, y_max = raw_bbox
+    else:
+        raise ValueError(f"Invalid bbox: {raw_bbox!r}")
+    return qgis.core.QgsReferencedRectangle(
+        qgis.core.QgsRectangle(x_min, y_min, x_max, y_max), get_default_crs())
@@ -2,7 +2,6 @@ import functools
 import json
 import re
 import uuid
-from pathlib import Path
 
 import qgis.core
 import qgis.gui
@@ -11,16 +10,22 @@ from qgis.PyQt import (
     QtNetwork,
     QtWidgets,
 )
-from qgis.PyQt.uic import loadUiType
 
-from .. import models
+from .. import (
+    models,
+    utils,
+)
 from ..settings import (
     DataSourceConnectionSettings,
+    LayerStorageFormat,
     settings_manager,
 )
-from ..utils import log_message
+from ..utils import (
+    log_debug,
+    log_message,
+)
 
-DialogUi, _ = loadUiType(Path(__file__).parents[1] / "ui/data_source_connection_dialog.ui")
+DialogUi = utils.load_ui_form("data_source_connection_dialog")
 
 
 class DataSourceConnectionDialog(QtWidgets.QDialog, DialogUi):
@@ -32,6 +37,9 @@ class DataSourceConnectionDialog(QtWidgets.QDialog, DialogUi):
     button_box: QtWidgets.QDialogButtonBox
     message_bar: qgis.gui.QgsMessageBar
     use_f_query_param_cb: QtWidgets.QCheckBox
+    use_offline_mirror_cb: QtWidgets.QCheckBox
+    layer_storage_format_cmb: QtWidgets.QComboBox
+    layer_storage_dir_fw: qgis.gui.QgsFileWidget
 
     data_source_connection_id: uuid.UUID
     _to_toggle_during_connection_test: tuple[QtWidgets.QWidget, ...]
@@ -50,6 +58,18 @@ class DataSourceConnectionDialog(QtWidgets.QDialog, DialogUi):
             "for servers that are able to read the HTTP `Accept` "
             "header, which is the usual way to perform content negotiation."
         )
+        self.layer_storage_format_cmb.addItem("Memory layers", LayerStorageFormat.MEMORY)
+        self.layer_storage_format_cmb.addItem("GeoPackage", LayerStorageFormat.GEOPACKAGE)
+        self.layer_storage_format_cmb.addItem("FlatGeobuf", LayerStorageFormat.FLATGEOBUF)
+        self.layer_storage_format_cmb.setToolTip(
+            "Loaded layers can be written to a local GeoPackage or FlatGeobuf "
+            "file, with a spatial index, so that they survive between QGIS sessions "
+            "without having to be downloaded again."
+        )
+        self.layer_storage_dir_fw.setStorageMode(qgis.gui.QgsFileWidget.StorageMode.GetDirectory)
+        self.layer_storage_format_cmb.currentIndexChanged.connect(
+            self.toggle_layer_storage_dir_enabled)
+        self.toggle_layer_storage_dir_enabled()
         self.message_bar = qgis.gui.QgsMessageBar()
         self.message_bar.setSizePolicy(
             QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Fixed
@@ -99,8 +119,15 @@ class DataSourceConnectionDialog(QtWidgets.QDialog, DialogUi):
             base_url=self.base_url_le.text().strip(),
             auth_config=self.authcfg_acs.configId(),
             use_f_query_param=self.use_f_query_param_cb.isChecked(),
+            layer_storage_format=self.layer_storage_format_cmb.currentData(),
+            layer_storage_dir=self.layer_storage_dir_fw.filePath().strip() or None,
+            use_offline_mirror=self.use_offline_mirror_cb.isChecked(),
         )
 
+    def toggle_layer_storage_dir_enabled(self) -> None:
+        self.layer_storage_dir_fw.setEnabled(
+            self.layer_storage_format_cmb.currentData() != LayerStorageFormat.MEMORY)
+
     def toggle_editable_widgets(self) -> None:
         for widget in self._to_toggle_during_connection_test:
             currently_enabled = widget.isEnabled()
@@ -134,7 +161,7 @@ class DataSourceConnectionDialog(QtWidgets.QDialog, DialogUi):
             landing_page = models.ApiLandingPage.from_api_response(
                 json.loads(network_fetcher_task.contentAsString())
             )
-            log_message(f"{landing_page.title=}")
+            log_debug("Landing page title: %r", landing_page.title)
             current_settings = self.get_connection_settings()
             conformance_request_task = qgis.core.QgsNetworkContentFetcherTask(
                 url=QtCore.QUrl(landing_page.conformance_link.href),
@@ -161,7 +188,7 @@ class DataSourceConnectionDialog(QtWidgets.QDialog, DialogUi):
             conformance = models.Conformance.from_api_response(
                 json.loads(network_fetcher_task.contentAsString())
             )
-            log_message(f"{conformance=}")
+            log_debug("Conformance: %r", conformance)
             self.detected_capabilities_lw.clear()
             for conformance_item in conformance.conforms_to:
                 list_item = QtWidgets.QListWidgetItem(str(conformance_item))
@@ -174,5 +201,9 @@ class DataSourceConnectionDialog(QtWidgets.QDialog, DialogUi):
         self.name_le.setText(data_source_connection.name)
         self.base_url_le.setText(data_source_connection.base_url)
         self.use_f_query_param_cb.setChecked(data_source_connection.use_f_query_param)
+        self.layer_storage_format_cmb.setCurrentIndex(
+            self.layer_storage_format_cmb.findData(data_source_connection.layer_storage_format))
+        self.layer_storage_dir_fw.setFilePath(data_source_connection.layer_storage_dir or "")
+        self.use_offline_mirror_cb.setChecked(data_source_connection.use_offline_mirror)
         if data_source_connection.auth_config:
             self.authcfg_acs.setConfigId(data_source_connection.auth_config)
@@ -1,3 +1,5 @@
+import time
+
 import qgis.core
 import qgis.gui
 
@@ -5,7 +7,7 @@ from qgis.PyQt import QtCore
 from qgis.PyQt import QtGui
 from qgis.PyQt import QtWidgets
 
-from .data_source_widget import OacsDataSourceWidget
+from ..utils import log_message
 
 
 class OacsSourceSelectProvider(qgis.gui.QgsSourceSelectProvider):
@@ -16,7 +18,14 @@ class OacsSourceSelectProvider(qgis.gui.QgsSourceSelectProvider):
             fl: QtCore.Qt.WindowFlags | QtCore.Qt.WindowType = QtCore.Qt.Widget,
             widget_mode: qgis.core.QgsProviderRegistry.WidgetMode = qgis.core.QgsProviderRegistry.WidgetMode.Embedded,
     ):
-        return OacsDataSourceWidget(parent, fl, widget_mode)
+        # the GUI modules are only imported when the data source manager is
+        # actually opened, so that QGIS startup does not pay for them
+        start = time.perf_counter()
+        from .data_source_widget import OacsDataSourceWidget
+        widget = OacsDataSourceWidget(parent, fl, widget_mode)
+        log_message(
+            f"Created the data source widget in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return widget
 
     def providerKey(self):
         return "qgis_oacs_provider"
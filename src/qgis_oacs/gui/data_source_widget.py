@@ -1,6 +1,8 @@
 import functools
+import importlib
+import time
+import typing
 import uuid
-from pathlib import Path
 
 import qgis.core
 import qgis.gui
@@ -8,22 +10,37 @@ from qgis.PyQt import (
     QtCore,
     QtWidgets,
 )
-from qgis.PyQt.uic import loadUiType
 
-from .. import utils
+from .. import (
+    mirror,
+    tasks,
+    utils,
+)
 from ..client import (
     oacs_client,
     OacsRequestMetadata,
 )
 from ..settings import settings_manager
 from .data_source_connection_dialog import DataSourceConnectionDialog
-from .search_widgets.datastream_items_widget import SearchDataStreamItemsWidget
-from .search_widgets.deployment_items_widget import SearchDeploymentItemsWidget
-from .search_widgets.procedure_items_widget import SearchProcedureItemsWidget
-from .search_widgets.sampling_feature_items_widget import SearchSamplingFeatureItemsWidget
-from .search_widgets.system_items_widget import SearchSystemItemsWidget
 
-DataSourceWidgetUi, _ = loadUiType(Path(__file__).parents[1] / "ui/data_source_widget.ui")
+if typing.TYPE_CHECKING:
+    from .search_widgets.base import OacsResourceSearchWidgetBase
+
+DataSourceWidgetUi = utils.load_ui_form("data_source_widget")
+
+# tab name, module and class of each search page - pages are only imported and
+# built when their tab is first shown
+_SEARCH_PAGES = (
+    ("systems", ".search_widgets.system_items_widget", "SearchSystemItemsWidget"),
+    ("deployments", ".search_widgets.deployment_items_widget", "SearchDeploymentItemsWidget"),
+    (
+        "sampling features",
+        ".search_widgets.sampling_feature_items_widget",
+        "SearchSamplingFeatureItemsWidget"
+    ),
+    ("procedures", ".search_widgets.procedure_items_widget", "SearchProcedureItemsWidget"),
+    ("datastreams", ".search_widgets.datastream_items_widget", "SearchDataStreamItemsWidget"),
+)
 
 
 class OacsDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, DataSourceWidgetUi):
@@ -31,8 +48,9 @@ class OacsDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, DataSourceWidge
     connection_new_btn: QtWidgets.QPushButton
     connection_edit_btn: QtWidgets.QPushButton
     connection_remove_btn: QtWidgets.QPushButton
+    connection_sync_btn: QtWidgets.QToolButton
     resource_types_tw: QtWidgets.QTabWidget
-    resource_type_pages: dict[str, QtWidgets.QWidget]
+    resource_type_pages: dict[str, "OacsResourceSearchWidgetBase"]
     button_box: QtWidgets.QDialogButtonBox
     message_bar: qgis.gui.QgsMessageBar
 
@@ -58,19 +76,18 @@ class OacsDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, DataSourceWidge
         )
         self.layout().insertLayout(4, self.grid_layout)
 
-        self.resource_type_pages = {
-            "systems": SearchSystemItemsWidget(),
-            "deployments": SearchDeploymentItemsWidget(),
-            "sampling features": SearchSamplingFeatureItemsWidget(),
-            "procedures": SearchProcedureItemsWidget(),
-            "datastreams": SearchDataStreamItemsWidget(),
-        }
+        self.resource_type_pages = {}
         self.resource_types_tw.clear()
-        for name, page in self.resource_type_pages.items():
-            self.resource_types_tw.addTab(page, name.capitalize())
+        for name, *_ in _SEARCH_PAGES:
+            placeholder = QtWidgets.QWidget()
+            placeholder_layout = QtWidgets.QVBoxLayout(placeholder)
+            placeholder_layout.setContentsMargins(0, 0, 0, 0)
+            self.resource_types_tw.addTab(placeholder, name.capitalize())
+        self.resource_types_tw.currentChanged.connect(self.ensure_search_page)
         self.resource_types_tw.currentChanged.connect(
             self.resource_types_tw.updateGeometry
         )
+        self.ensure_search_page(self.resource_types_tw.currentIndex())
 
         oacs_client.request_started.connect(self.handle_search_started)
         oacs_client.request_ended.connect(self.handle_search_ended)
@@ -92,10 +109,28 @@ class OacsDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, DataSourceWidge
         self.connection_new_btn.clicked.connect(add_new_handler)
         self.connection_edit_btn.clicked.connect(self.spawn_data_source_connection_dialog)
         self.connection_remove_btn.clicked.connect(self.remove_current_data_source_connection)
+        self.connection_sync_btn.clicked.connect(self.sync_current_data_source_connection)
         self.connection_list_cmb.activated.connect(self.update_current_data_source_connection)
         self.update_connections_combobox()
         self.handle_current_connection_changed()
 
+    def ensure_search_page(self, tab_index: int) -> None:
+        """Build the search page of the input tab, if it does not exist yet."""
+        if not 0 <= tab_index < len(_SEARCH_PAGES):
+            return None
+        name, module_name, class_name = _SEARCH_PAGES[tab_index]
+        if name in self.resource_type_pages:
+            return None
+        start = time.perf_counter()
+        module = importlib.import_module(module_name, package=__package__)
+        page = getattr(module, class_name)()
+        self.resource_types_tw.widget(tab_index).layout().addWidget(page)
+        self.resource_type_pages[name] = page
+        utils.log_message(
+            f"Created the {name!r} search page in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
     def spawn_data_source_connection_dialog(self, add_new: bool):
         if add_new:
             dialog = DataSourceConnectionDialog(parent=self)
@@ -130,6 +165,7 @@ class OacsDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, DataSourceWidge
                     break
             settings_manager.set_current_data_source_connection(new_current_connection_id)
             settings_manager.delete_data_source_connection(current_data_source_connection.id)
+            mirror.delete_mirror(current_data_source_connection.id)
             self.update_connections_combobox()
 
     def update_connections_combobox(self) -> None:
@@ -141,15 +177,40 @@ class OacsDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, DataSourceWidge
             index = self.connection_list_cmb.findData(str(current_connection.id))
             self.connection_list_cmb.setCurrentIndex(index)
 
+    def sync_current_data_source_connection(self) -> None:
+        connection = settings_manager.get_current_data_source_connection()
+        if connection is None:
+            return None
+        task = tasks.schedule_catalog_sync(connection)
+        task.taskCompleted.connect(
+            functools.partial(
+                utils.show_message,
+                self.message_bar,
+                f"Local mirror of {connection.name!r} is up to date",
+                qgis.core.Qgis.MessageLevel.Success
+            )
+        )
+        task.taskTerminated.connect(
+            functools.partial(
+                utils.show_message,
+                self.message_bar,
+                f"Could not sync the local mirror of {connection.name!r}, see the log for details",
+                qgis.core.Qgis.MessageLevel.Warning
+            )
+        )
+
     def handle_current_connection_changed(self) -> None:
-        if settings_manager.get_current_data_source_connection():
+        current_connection = settings_manager.get_current_data_source_connection()
+        if current_connection:
             self.connection_edit_btn.setEnabled(True)
             self.connection_remove_btn.setEnabled(True)
+            self.connection_sync_btn.setEnabled(current_connection.use_offline_mirror)
         else:
             self.connection_edit_btn.setEnabled(False)
             self.connection_remove_btn.setEnabled(False)
+            self.connection_sync_btn.setEnabled(False)
         for widget_page in self.resource_type_pages.values():
-            utils.clear_search_results(widget_page.search_results_layout)
+            widget_page.clear_search_results()
 
     def handle_search_started(self):
         utils.toggle_widgets_enabled(self._interactive_widgets, force_state=False)
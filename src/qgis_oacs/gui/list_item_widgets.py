@@ -1,9 +1,10 @@
 import abc
+import collections
+import functools
 import typing
 import uuid
-from pathlib import Path
+import weakref
 
-from qgis.PyQt.uic import loadUiType
 from qgis.PyQt import (
     QtCore,
     QtGui,
@@ -11,24 +12,33 @@ from qgis.PyQt import (
 )
 
 from .. import (
+    layers,
     models,
-    utils,
     settings,
+    tasks,
+    utils,
 )
 from ..client import (
     oacs_client,
     OacsRequestMetadata,
 )
 from ..constants import IconPath
-from ..utils import log_message
+from ..utils import (
+    log_debug,
+    log_message,
+)
 from ..settings import settings_manager
 from .abc import AbstractQWidgetMeta
 
-ResourceListItemWidgetUi, _ = loadUiType(
-    Path(__file__).parents[1] / "ui/resource_list_item_widget.ui")
+ResourceListItemWidgetUi = utils.load_ui_form("resource_list_item_widget")
+
+DatastreamListItemWidgetUi = utils.load_ui_form("datastream_list_item_widget")
 
-DatastreamListItemWidgetUi, _ = loadUiType(
-    Path(__file__).parents[1] / "ui/datastream_list_item_widget.ui")
+# maximum number of item widgets that keep their details subtree around after
+# being collapsed, so that re-expanding a recently seen item is instantaneous
+DETAILS_CACHE_LIMIT = 10
+_collapsed_details_cache: collections.OrderedDict[
+    int, weakref.ReferenceType["OacsItemListItemWidgetBase"]] = collections.OrderedDict()
 
 
 class OacsItemListItemWidgetBase(
@@ -39,13 +49,16 @@ class OacsItemListItemWidgetBase(
     icon_la: QtWidgets.QLabel
     description_la: QtWidgets.QLabel
     details_pb: QtWidgets.QPushButton
-    details_frame: QtWidgets.QFrame
-    details_properties_tw: QtWidgets.QTableWidget
+    frame: QtWidgets.QFrame
+    details_frame: QtWidgets.QFrame | None
+    details_properties_tw: QtWidgets.QTableWidget | None
+    related_resources_widget: typing.Optional["RelatedResourcesWidget"]
     item: models.OacsItem
     details_initiator: typing.Callable[[str, settings.DataSourceConnectionSettings ], None]
     listen_to: QtCore.pyqtSignal
 
     _already_fetched_details: bool
+    _details_request_metadata: OacsRequestMetadata | None
 
     def __init__(
             self,
@@ -56,8 +69,12 @@ class OacsItemListItemWidgetBase(
         self.setupUi(self)
         self.item = item
         self.details_pb.setText("Details...")
-        self.details_frame.setVisible(False)
+        # the details subtree is only built when the user first expands it
+        self.details_frame = None
+        self.details_properties_tw = None
+        self.related_resources_widget = None
         self._already_fetched_details = False
+        self._details_request_metadata = None
         utils.set_up_icon(
             self.icon_la,
             icon_path=self.get_icon_path(),
@@ -69,27 +86,55 @@ class OacsItemListItemWidgetBase(
         self.description_la.setTextFormat(QtCore.Qt.TextFormat.RichText)
         self.details_pb.clicked.connect(self.toggle_details)
         self.listen_to.connect(self.handle_fetch_details_response)
+        widget_id = id(self)
+        self.destroyed.connect(lambda *_: _collapsed_details_cache.pop(widget_id, None))
 
-    @abc.abstractmethod
-    def get_icon_path(self) -> str: ...
+    def get_icon_path(self) -> str:
+        return self.item.icon_path
 
-    @abc.abstractmethod
-    def get_icon_tooltip(self) -> str: ...
+    def get_icon_tooltip(self) -> str:
+        return self.item.icon_tooltip
 
     @abc.abstractmethod
     def get_description(self) -> str: ...
 
     def toggle_details(self) -> None:
-        if self.details_frame.isVisible():
+        if self.details_frame is not None and self.details_frame.isVisible():
             self.details_frame.setVisible(False)
             self.details_pb.setText("Details...")
+            _remember_collapsed_details(self)
         else:
             self.details_pb.setText("Hide details...")
+            _collapsed_details_cache.pop(id(self), None)
+            if self.details_frame is None:
+                self._build_details_frame()
             self.details_frame.setVisible(True)
             if not self._already_fetched_details:
-                log_message(f"About to fetch details from the server...")
+                log_debug("About to fetch details from the server...")
                 self.initiate_fetch_details()
 
+    def tear_down_details(self) -> None:
+        """Delete the details subtree, it is rebuilt if the user expands it again."""
+        if self.details_frame is None:
+            return None
+        self.details_frame.deleteLater()
+        self.details_frame = None
+        self.details_properties_tw = None
+        self.related_resources_widget = None
+
+    def _build_details_frame(self) -> None:
+        self.details_frame = QtWidgets.QFrame()
+        self.details_frame.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Preferred, QtWidgets.QSizePolicy.Policy.Expanding)
+        self.details_frame.setFrameShape(QtWidgets.QFrame.Shape.StyledPanel)
+        self.details_frame.setFrameShadow(QtWidgets.QFrame.Shadow.Raised)
+        self.details_properties_tw = QtWidgets.QTableWidget()
+        details_layout = QtWidgets.QVBoxLayout(self.details_frame)
+        details_layout.addWidget(self.details_properties_tw)
+        self.frame.layout().addWidget(self.details_frame)
+        if self._already_fetched_details:
+            self._render_details()
+
     def initiate_fetch_details(self) -> None:
         self.details_initiator(
             self.item.id_,
@@ -106,7 +151,9 @@ class OacsItemListItemWidgetBase(
 
         self.item = item
         self._already_fetched_details = True
-        self._render_details()
+        self._details_request_metadata = request_metadata
+        if self.details_frame is not None:
+            self._render_details()
 
     def _render_details(self):
         table_items = [
@@ -165,6 +212,21 @@ class OacsFeatureListItemWidgetBase(
     @abc.abstractmethod
     def initiate_layer_loading(self) -> None: ...
 
+    def schedule_layer_loading(self) -> None:
+        connection = settings.settings_manager.get_current_data_source_connection()
+        tasks.schedule_layer_loading(
+            functools.partial(
+                layers.build_oacs_feature_layer,
+                self.item,
+                storage=layers.LayerStorage.from_connection(connection),
+                provenance=(
+                    layers.LayerProvenance.from_request(self._details_request_metadata, connection)
+                    if self._details_request_metadata is not None else None
+                ),
+            ),
+            description=f"Load OACS layer {self.item.name!r}"
+        )
+
     def load_as_layer(self):
         if self._already_fetched_details:
             self.initiate_layer_loading()
@@ -197,25 +259,11 @@ class SystemListItemWidget(
         self.listen_to = oacs_client.system_item_fetched
         super().__init__(item, parent)
 
-    def get_icon_path(self) -> str:
-        return (
-            self.item.feature_type.get_icon_path()
-            if self.item.feature_type
-            else models.IconPath.system_type_system
-        )
-
-    def get_icon_tooltip(self) -> str:
-        return (
-            self.item.feature_type.value.upper()
-            if self.item.feature_type
-            else models.SystemType.SYSTEM.value.upper()
-        )
-
     def get_description(self) -> str:
         return f"<p>{self.item.uid}</p>"
 
     def initiate_layer_loading(self) -> None:
-        utils.load_oacs_feature_as_layer(self.item)
+        self.schedule_layer_loading()
 
 
 class DeploymentListItemWidget(
@@ -232,21 +280,11 @@ class DeploymentListItemWidget(
         self.listen_to = oacs_client.deployment_item_fetched
         super().__init__(item, parent)
 
-    def get_icon_path(self) -> str:
-        return models.IconPath.deployment
-
-    def get_icon_tooltip(self) -> str:
-        return (
-            self.item.feature_type.upper()
-            if self.item.feature_type
-            else "DEPLOYMENT"
-        )
-
     def get_description(self) -> str:
         return f"<p>{self.item.uid}</p>"
 
     def initiate_layer_loading(self) -> None:
-        utils.load_oacs_feature_as_layer(self.item)
+        self.schedule_layer_loading()
 
 
 class SamplingFeatureListItemWidget(
@@ -263,21 +301,11 @@ class SamplingFeatureListItemWidget(
         self.listen_to = oacs_client.sampling_feature_item_fetched
         super().__init__(item, parent)
 
-    def get_icon_path(self) -> str:
-        return models.IconPath.sampling_feature
-
-    def get_icon_tooltip(self) -> str:
-        return (
-            self.item.feature_type.upper()
-            if self.item.feature_type
-            else "SAMPLING_FEATURE"
-        )
-
     def get_description(self) -> str:
         return f"<p>{self.item.uid}</p>"
 
     def initiate_layer_loading(self) -> None:
-        utils.load_oacs_feature_as_layer(self.item)
+        self.schedule_layer_loading()
 
 
 class ProcedureListItemWidget(
@@ -294,17 +322,11 @@ class ProcedureListItemWidget(
         self.listen_to = oacs_client.procedure_item_fetched
         super().__init__(item, parent)
 
-    def get_icon_path(self) -> str:
-        return models.IconPath.procedure_type_procedure
-
-    def get_icon_tooltip(self) -> str:
-        return self.item.feature_type.value.upper()
-
     def get_description(self) -> str:
         return f"<p>{self.item.uid}</p>"
 
     def initiate_layer_loading(self) -> None:
-        utils.load_oacs_feature_as_layer(self.item)
+        self.schedule_layer_loading()
 
 
 class DataStreamListItemWidget(
@@ -321,28 +343,31 @@ class DataStreamListItemWidget(
         self.listen_to = oacs_client.datastream_item_fetched
         super().__init__(item, parent)
 
-    def get_icon_path(self) -> str:
-        return (
-            self.item.datastream_type.get_icon_path()
-            if self.item.datastream_type
-            else models.IconPath.datastream
-        )
-
-    def get_icon_tooltip(self) -> str:
-        return (
-            self.item.datastream_type.value.upper()
-            if self.item.datastream_type
-            else "DATASTREAM"
-        )
-
     def get_description(self) -> str:
         return f"<p>{self.item.description or ''}</p>"
 
 
+def _remember_collapsed_details(widget: OacsItemListItemWidgetBase) -> None:
+    _collapsed_details_cache[id(widget)] = weakref.ref(widget)
+    while len(_collapsed_details_cache) > DETAILS_CACHE_LIMIT:
+        _, oldest_ref = _collapsed_details_cache.popitem(last=False)
+        if (oldest := oldest_ref()) is not None:
+            try:
+                oldest.tear_down_details()
+            except RuntimeError:
+                pass  # the underlying C++ widget has already been deleted
+
+
 class ExpandableSection(QtWidgets.QFrame):
-    """A collapsible section with a toggle button and content area."""
+    """A collapsible section with a toggle button and content area.
+
+    Content is fetched the first time the section is expanded. If that fails
+    or is canceled the error is shown instead, and expanding the section
+    again retries.
+    """
 
     _pending_request_id: uuid.UUID | None
+    _error_label: QtWidgets.QLabel | None
 
     def __init__(
             self,
@@ -353,6 +378,7 @@ class ExpandableSection(QtWidgets.QFrame):
         super().__init__(parent)
         self.link = link
         self._pending_request_id = None
+        self._error_label = None
 
         self.setFrameShape(QtWidgets.QFrame.StyledPanel)
         self.setFrameShadow(QtWidgets.QFrame.Raised)
@@ -378,11 +404,6 @@ class ExpandableSection(QtWidgets.QFrame):
         self.content_widget.setVisible(False)
         layout.addWidget(self.content_widget)
 
-        oacs_client.sampling_feature_list_fetched.connect(
-            self.handle_sampling_feature_list_response)
-        oacs_client.datastream_list_fetched.connect(
-            self.handle_datastream_list_response)
-
     def toggle(self):
         title = self.toggle_button.text().split(" ", 1)[1]
         if self.content_widget.isVisible():  # need to hide
@@ -391,8 +412,13 @@ class ExpandableSection(QtWidgets.QFrame):
         else:  # need to show
             icon = "▼"
             self.content_widget.setVisible(True)
-            if self._pending_request_id is None and self.content_layout.count() == 0:
-                self.load_content()
+            if self._pending_request_id is None:
+                if self._error_label is not None:
+                    self.content_layout.removeWidget(self._error_label)
+                    self._error_label.deleteLater()
+                    self._error_label = None
+                if self.content_layout.count() == 0:
+                    self.load_content()
         self.toggle_button.setText(f"{icon} {title}")
 
     def load_content(self):
@@ -402,9 +428,45 @@ class ExpandableSection(QtWidgets.QFrame):
             self.link, connection)
         if request_metadata is not None:
             self._pending_request_id = request_metadata.request_id
+            # only listen to the client while our own request is in flight
+            oacs_client.sampling_feature_list_fetched.connect(
+                self.handle_sampling_feature_list_response)
+            oacs_client.datastream_list_fetched.connect(
+                self.handle_datastream_list_response)
+            oacs_client.request_failed.connect(self.handle_request_failed)
+            oacs_client.request_ended.connect(self.handle_request_ended)
         else:
             log_message(f"Unsupported link relation: {self.link.rel}")
 
+    def _stop_listening(self) -> None:
+        self._pending_request_id = None
+        oacs_client.sampling_feature_list_fetched.disconnect(
+            self.handle_sampling_feature_list_response)
+        oacs_client.datastream_list_fetched.disconnect(
+            self.handle_datastream_list_response)
+        oacs_client.request_failed.disconnect(self.handle_request_failed)
+        oacs_client.request_ended.disconnect(self.handle_request_ended)
+
+    def handle_request_failed(
+            self,
+            request_metadata: OacsRequestMetadata,
+            error_message: str
+    ) -> None:
+        if self._pending_request_id != request_metadata.request_id:
+            return
+        self._stop_listening()
+        self._error_label = QtWidgets.QLabel(
+            f"Could not load this section: {error_message}")
+        self._error_label.setWordWrap(True)
+        self.content_layout.addWidget(self._error_label)
+
+    def handle_request_ended(self, request_metadata: OacsRequestMetadata) -> None:
+        # responses and failures have already been handled by now, so this
+        # only gets here for canceled requests
+        if self._pending_request_id != request_metadata.request_id:
+            return
+        self._stop_listening()
+
     def handle_sampling_feature_list_response(
             self,
             sampling_feature_list: models.SamplingFeatureList,
@@ -412,7 +474,7 @@ class ExpandableSection(QtWidgets.QFrame):
     ) -> None:
         if self._pending_request_id != request_metadata.request_id:
             return
-        self._pending_request_id = None
+        self._stop_listening()
         for sampling_feature_item in sampling_feature_list.items:
             display_widget = SamplingFeatureListItemWidget(sampling_feature_item)
             self.content_layout.addWidget(display_widget)
@@ -425,7 +487,7 @@ class ExpandableSection(QtWidgets.QFrame):
     ) -> None:
         if self._pending_request_id != request_metadata.request_id:
             return
-        self._pending_request_id = None
+        self._stop_listening()
         for item in datastream_list.items:
             display_widget = DataStreamListItemWidget(item)
             self.content_layout.addWidget(display_widget)
@@ -0,0 +1,322 @@
+import collections
+import time
+import typing
+import uuid
+
+from qgis.PyQt import (
+    QtCore,
+    QtGui,
+    QtWidgets,
+)
+
+from .. import (
+    models,
+    utils,
+)
+
+
+class OacsItemListModel(QtCore.QAbstractListModel):
+    """List model holding search results.
+
+    Results are shown by a QListView with an `OacsItemDelegate`, which paints
+    each row directly instead of creating a widget per row.
+    """
+
+    ItemRole = QtCore.Qt.ItemDataRole.UserRole + 1
+    IconPathRole = QtCore.Qt.ItemDataRole.UserRole + 2
+    SummaryRole = QtCore.Qt.ItemDataRole.UserRole + 3
+
+    _items: list[models.OacsItem]
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._items = []
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(
+            self,
+            index: QtCore.QModelIndex,
+            role: int = QtCore.Qt.ItemDataRole.DisplayRole
+    ) -> typing.Any:
+        if not index.isValid():
+            return None
+        item = self._items[index.row()]
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return item.name
+        elif role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            return item.icon_tooltip
+        elif role == self.ItemRole:
+            return item
+        elif role == self.IconPathRole:
+            return item.icon_path
+        elif role == self.SummaryRole:
+            return item.summary
+        return None
+
+    def set_items(self, items: typing.Sequence[models.OacsItem]) -> None:
+        self.beginResetModel()
+        self._items = list(items)
+        self.endResetModel()
+
+    def append_items(self, items: typing.Sequence[models.OacsItem]) -> None:
+        if len(items) == 0:
+            return None
+        first_row = len(self._items)
+        self.beginInsertRows(QtCore.QModelIndex(), first_row, first_row + len(items) - 1)
+        self._items.extend(items)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        self.set_items([])
+
+
+class IncrementalModelFiller(QtCore.QObject):
+    """Append items to a model in time-sliced batches.
+
+    Each event loop tick appends rows until the frame budget is used up and
+    then yields back to the event loop, so that the GUI stays responsive and
+    the first rows show up immediately, regardless of how many items there are.
+
+    Items of a streamed response can be handed over as they arrive: start
+    with `complete=False`, `extend` with each batch and `close` once the last
+    one was received. `finished` is only emitted after that.
+    """
+
+    progress = QtCore.pyqtSignal(int, int)  # number of rows added, total
+    finished = QtCore.pyqtSignal()
+
+    model: OacsItemListModel
+    frame_budget_seconds: float
+    batch_size: int
+
+    _pending: list[models.OacsItem]
+    _num_added: int
+    _is_complete: bool
+    _is_stopped: bool
+    _timer: QtCore.QTimer
+
+    def __init__(
+            self,
+            model: OacsItemListModel,
+            frame_budget_ms: int = 10,
+            batch_size: int = 50,
+            parent: QtCore.QObject | None = None
+    ):
+        super().__init__(parent)
+        self.model = model
+        self.frame_budget_seconds = frame_budget_ms / 1000
+        self.batch_size = batch_size
+        self._pending = []
+        self._num_added = 0
+        self._is_complete = True
+        self._is_stopped = False
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._add_next_batches)
+
+    @property
+    def num_added(self) -> int:
+        return self._num_added
+
+    @property
+    def total(self) -> int:
+        return len(self._pending)
+
+    def is_running(self) -> bool:
+        return not self._is_stopped and (self._timer.isActive() or not self._is_complete)
+
+    def start(self, items: typing.Sequence[models.OacsItem], complete: bool = True) -> None:
+        self.stop()
+        self._pending = list(items)
+        self._num_added = 0
+        self._is_complete = complete
+        self._is_stopped = False
+        self._add_next_batches()
+
+    def extend(self, items: typing.Sequence[models.OacsItem]) -> None:
+        self._pending.extend(items)
+        if not (self._is_stopped or self._timer.isActive()):
+            self._add_next_batches()
+
+    def close(self) -> None:
+        """Mark that no more items will be added with `extend`."""
+        self._is_complete = True
+        if not (self._is_stopped or self._timer.isActive()):
+            self._add_next_batches()
+
+    def stop(self) -> None:
+        self._is_stopped = True
+        self._timer.stop()
+
+    def _add_next_batches(self) -> None:
+        deadline = time.perf_counter() + self.frame_budget_seconds
+        total = len(self._pending)
+        while self._num_added < total and time.perf_counter() < deadline:
+            batch = self._pending[self._num_added:self._num_added + self.batch_size]
+            self.model.append_items(batch)
+            self._num_added += len(batch)
+        if self._num_added < total:
+            self._timer.start()
+            self.progress.emit(self._num_added, total)
+        else:
+            self.progress.emit(self._num_added, total)
+            if self._is_complete:
+                self.finished.emit()
+
+
+class RecentSearchCache:
+    """Remember the results of the most recent free text searches.
+
+    A recent exact hit can be shown without asking the server again, older
+    ones may be stale and are only good as a preview. Results of a shorter
+    query that is a prefix of the current text can be filtered locally to
+    give immediate feedback while the server is still being queried.
+    """
+
+    max_size: int
+    # (connection id, text) -> (time.monotonic() when stored, search result)
+    _entries: collections.OrderedDict[tuple[uuid.UUID, str], tuple[float, typing.Any]]
+
+    def __init__(self, max_size: int = 20):
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+
+    def get(
+            self,
+            connection_id: uuid.UUID,
+            text: str,
+            max_age_seconds: float | None = None
+    ) -> typing.Any | None:
+        """Return the cached result of the query, if it is younger than `max_age_seconds`."""
+        key = (connection_id, text)
+        if (entry := self._entries.get(key)) is None:
+            return None
+        stored_at, result = entry
+        if max_age_seconds is not None and time.monotonic() - stored_at > max_age_seconds:
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, connection_id: uuid.UUID, text: str, search_result: typing.Any) -> None:
+        self._entries[(connection_id, text)] = (time.monotonic(), search_result)
+        self._entries.move_to_end((connection_id, text))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_prefix_match(self, connection_id: uuid.UUID, text: str) -> typing.Any | None:
+        """Return the cached result of the longest non-empty query that prefixes `text`."""
+        best_length = 0
+        best_result = None
+        for (cached_connection_id, cached_text), (_, result) in self._entries.items():
+            if (
+                    cached_connection_id == connection_id
+                    and best_length < len(cached_text) < len(text)
+                    and text.startswith(cached_text)
+            ):
+                best_length = len(cached_text)
+                best_result = result
+        return best_result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def filter_items_by_text(
+        items: typing.Iterable[models.OacsItem],
+        text: str
+) -> list[models.OacsItem]:
+    """Keep the items whose name or description contains all words of `text`."""
+    words = text.casefold().split()
+    result = []
+    for item in items:
+        haystack = " ".join((item.name, item.summary, item.description or "")).casefold()
+        if all(word in haystack for word in words):
+            result.append(item)
+    return result
+
+
+class OacsItemDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints an icon, the item name and its summary for each search result.
+
+    Rows that currently have an index widget (i.e. the expanded row) are
+    sized after the widget and not painted.
+    """
+
+    icon_size = 30
+    padding = 6
+
+    def paint(
+            self,
+            painter: QtGui.QPainter,
+            option: QtWidgets.QStyleOptionViewItem,
+            index: QtCore.QModelIndex
+    ) -> None:
+        view = typing.cast(QtWidgets.QAbstractItemView, self.parent())
+        if view.indexWidget(index) is not None:
+            return None
+        style = option.widget.style() if option.widget else QtWidgets.QApplication.style()
+        style.drawPrimitive(
+            QtWidgets.QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+        painter.save()
+        rect = option.rect.adjusted(self.padding, self.padding, -self.padding, -self.padding)
+        pixmap = utils.create_pixmap_from_svg(
+            index.data(OacsItemListModel.IconPathRole),
+            self.icon_size,
+            option.widget.devicePixelRatioF() if option.widget else None
+        )
+        painter.drawPixmap(
+            rect.left(),
+            rect.top() + (rect.height() - self.icon_size) // 2,
+            pixmap
+        )
+        text_rect = rect.adjusted(self.icon_size + self.padding, 0, 0, 0)
+        half_height = text_rect.height() // 2
+        is_selected = bool(option.state & QtWidgets.QStyle.StateFlag.State_Selected)
+        painter.setPen(
+            option.palette.color(
+                QtGui.QPalette.ColorRole.HighlightedText
+                if is_selected else QtGui.QPalette.ColorRole.Text
+            )
+        )
+        name_font = QtGui.QFont(option.font)
+        name_font.setBold(True)
+        painter.setFont(name_font)
+        name_rect = QtCore.QRect(text_rect.left(), text_rect.top(), text_rect.width(), half_height)
+        painter.drawText(
+            name_rect,
+            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter,
+            QtGui.QFontMetrics(name_font).elidedText(
+                index.data(QtCore.Qt.ItemDataRole.DisplayRole),
+                QtCore.Qt.TextElideMode.ElideRight,
+                name_rect.width()
+            )
+        )
+        painter.setFont(option.font)
+        summary_rect = QtCore.QRect(
+            text_rect.left(), text_rect.top() + half_height, text_rect.width(), half_height)
+        painter.drawText(
+            summary_rect,
+            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter,
+            option.fontMetrics.elidedText(
+                index.data(OacsItemListModel.SummaryRole),
+                QtCore.Qt.TextElideMode.ElideRight,
+                summary_rect.width()
+            )
+        )
+        painter.restore()
+
+    def sizeHint(
+            self,
+            option: QtWidgets.QStyleOptionViewItem,
+            index: QtCore.QModelIndex
+    ) -> QtCore.QSize:
+        view = typing.cast(QtWidgets.QAbstractItemView, self.parent())
+        if (widget := view.indexWidget(index)) is not None:
+            return QtCore.QSize(option.rect.width(), widget.sizeHint().height())
+        return QtCore.QSize(
+            option.rect.width(),
+            max(self.icon_size, 2 * option.fontMetrics.height()) + 2 * self.padding
+        )
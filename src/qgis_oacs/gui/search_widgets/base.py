@@ -1,5 +1,8 @@
 import abc
+import enum
 import functools
+import typing
+import uuid
 
 from qgis.PyQt import (
     QtCore,
@@ -7,7 +10,10 @@ from qgis.PyQt import (
 )
 
 from ... import (
+    catalog,
+    layers,
     models,
+    tasks,
     utils,
 )
 from ...client import OacsRequestMetadata
@@ -15,23 +21,105 @@ from ...constants import IconPath
 from ...settings import settings_manager
 from ...client import oacs_client
 from ..abc import AbstractQWidgetMeta
+from ..search_results import (
+    IncrementalModelFiller,
+    OacsItemDelegate,
+    OacsItemListModel,
+    RecentSearchCache,
+    filter_items_by_text,
+)
+
+# how long to wait after the last keystroke before searching, in live search mode
+LIVE_SEARCH_DEBOUNCE_MS = 400
+# results of the same query that are older than this are only shown as a
+# preview while the server is asked again, as the catalog may have changed
+RECENT_SEARCH_MAX_AGE_SECONDS = 60
 
 
 class OacsResourceSearchWidgetBase(
     QtWidgets.QWidget,
     metaclass=AbstractQWidgetMeta
 ):
+    item_type: typing.ClassVar[typing.Type[models.OacsItem]]
     free_text_le: QtWidgets.QLineEdit
+    live_search_cb: QtWidgets.QCheckBox
     search_pb: QtWidgets.QPushButton
     search_results_layout: QtWidgets.QVBoxLayout
+    search_results_la: QtWidgets.QLabel
+    stop_rendering_pb: QtWidgets.QPushButton
+    search_results_lv: QtWidgets.QListView
+    search_results_model: OacsItemListModel
+    search_results_filler: IncrementalModelFiller
+
+    _expanded_index: QtCore.QPersistentModelIndex | None
+    _pending_request: OacsRequestMetadata | None
+    _search_results_note: str
+    _recent_searches: RecentSearchCache
+    _live_search_timer: QtCore.QTimer
+    # connection whose mirror is being loaded, to be searched once it is
+    _awaited_mirror_id: uuid.UUID | None
+    # identifies the latest mirror search whose items are being read from the mirror
+    _awaited_mirror_read: object | None
+    # items of the pending search received so far, its response is streamed
+    _streamed_result: models.OacsItemList | None
+    # all items of the shown search result, before the local filters are applied
+    _shown_result: models.OacsItemList | None
+    _shown_facet_counts: dict[enum.Enum, int]
 
     def __init__(self, parent: QtWidgets.QWidget | None = None):
         super().__init__(parent)
         self.setupUi(self)
         self.search_pb.setIcon(utils.create_icon_from_svg(IconPath.search))
         self.search_pb.clicked.connect(self.initiate_search)
+        self._expanded_index = None
+        self._pending_request = None
+        self._search_results_note = ""
+        self._recent_searches = RecentSearchCache()
+        self._awaited_mirror_id = None
+        self._awaited_mirror_read = None
+        self._streamed_result = None
+        self._shown_result = None
+        self._shown_facet_counts = {}
+        self._live_search_timer = QtCore.QTimer(self)
+        self._live_search_timer.setSingleShot(True)
+        self._live_search_timer.setInterval(LIVE_SEARCH_DEBOUNCE_MS)
+        self._live_search_timer.timeout.connect(self.run_live_search)
+        self.live_search_cb.setChecked(settings_manager.is_live_search_enabled())
+        self.live_search_cb.toggled.connect(self.toggle_live_search)
+        self.free_text_le.textEdited.connect(self.handle_free_text_edited)
+        self.search_results_la = QtWidgets.QLabel()
+        self.search_results_la.setVisible(False)
+        self.stop_rendering_pb = QtWidgets.QPushButton("Stop")
+        self.stop_rendering_pb.setToolTip("Stop adding search results to the list")
+        self.stop_rendering_pb.setVisible(False)
+        self.stop_rendering_pb.clicked.connect(self.stop_rendering_search_results)
+        self.search_results_model = OacsItemListModel(self)
+        self.search_results_filler = IncrementalModelFiller(self.search_results_model, parent=self)
+        self.search_results_filler.progress.connect(self.handle_rendering_progress)
+        self.search_results_filler.finished.connect(self.handle_rendering_finished)
+        self.search_results_lv = QtWidgets.QListView()
+        self.search_results_lv.setModel(self.search_results_model)
+        self.search_results_lv.setItemDelegate(OacsItemDelegate(self.search_results_lv))
+        self.search_results_lv.setVerticalScrollMode(
+            QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+        # lay out rows incrementally, so that huge result sets don't block the GUI
+        self.search_results_lv.setLayoutMode(QtWidgets.QListView.LayoutMode.Batched)
+        self.search_results_lv.setBatchSize(200)
+        self.search_results_lv.setMinimumHeight(300)
+        self.search_results_lv.setToolTip("Double-click a result to expand it")
+        self.search_results_lv.activated.connect(self.toggle_expanded_item)
+        status_layout = QtWidgets.QHBoxLayout()
+        status_layout.setContentsMargins(9, 0, 9, 0)
+        status_layout.addWidget(self.search_results_la)
+        status_layout.addStretch()
+        status_layout.addWidget(self.stop_rendering_pb)
+        self.search_results_layout.addLayout(status_layout)
+        self.search_results_layout.addWidget(self.search_results_lv)
         oacs_client.request_started.connect(self.handle_request_started)
         oacs_client.request_ended.connect(self.handle_request_ended)
+        oacs_client.request_failed.connect(self.handle_request_failed)
+        oacs_client.response_batch_fetched.connect(self.handle_search_batch)
+        catalog.catalog_index_manager.mirror_loaded.connect(self.handle_mirror_loaded)
 
     def sizeHint(self):
         if self.isVisible():
@@ -43,8 +131,23 @@ class OacsResourceSearchWidgetBase(
             return super().minimumSizeHint()
         return QtCore.QSize(0, 0)
 
+    def eventFilter(self, watched: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        # the expanded row must follow size changes of its widget, for example
+        # when its details are shown
+        if (
+                event.type() == QtCore.QEvent.Type.LayoutRequest
+                and self._expanded_index is not None
+                and self._expanded_index.isValid()
+                and watched is self.search_results_lv.indexWidget(
+                    QtCore.QModelIndex(self._expanded_index))
+        ):
+            self.search_results_lv.itemDelegate().sizeHintChanged.emit(
+                QtCore.QModelIndex(self._expanded_index))
+        return super().eventFilter(watched, event)
+
     @abc.abstractmethod
-    def _initiate_search(self) -> None: ...
+    def _initiate_search(self) -> OacsRequestMetadata:
+        """Initiate a streamed search, whose results are emitted in batches."""
 
     @abc.abstractmethod
     def _get_interactive_widgets(self) -> tuple[QtWidgets.QWidget, ...]: ...
@@ -52,93 +155,431 @@ class OacsResourceSearchWidgetBase(
     @abc.abstractmethod
     def _get_display_widget(self, item: models.OacsItem) -> QtWidgets.QWidget: ...
 
+    def _get_filter_set(self) -> models.SystemSearchFilterSet | None:
+        """Return the filters that are applied locally to the search results."""
+        return None
+
+    def _show_facet_counts(self, facet_counts: dict[enum.Enum, int]) -> None:
+        """Show how many of the search results have each enumerated type."""
+
+    def _filter_items(
+            self,
+            items: typing.Sequence[models.OacsItem]
+    ) -> typing.Sequence[models.OacsItem]:
+        if (filter_set := self._get_filter_set()) is None or filter_set.is_empty():
+            return items
+        return [item for item in items if filter_set.matches(item)]
+
     def toggle_interactive_widgets(
             self,
             force_state: bool | None = None
     ) -> None:
-        utils.toggle_widgets_enabled(self._get_interactive_widgets(), force_state)
+        widgets = self._get_interactive_widgets()
+        if self.live_search_cb.isChecked():
+            # the user must be able to keep typing while a live search is running
+            widgets = tuple(w for w in widgets if w is not self.free_text_le)
+        utils.toggle_widgets_enabled(widgets, force_state)
 
     def handle_request_started(self, metadata: OacsRequestMetadata) -> None:
         self.toggle_interactive_widgets(force_state=False)
 
     def handle_request_ended(self, metadata: OacsRequestMetadata) -> None:
         self.toggle_interactive_widgets(force_state=True)
+        if self._is_pending_search(metadata):
+            self.finish_search(metadata)
+
+    def toggle_expanded_item(self, index: QtCore.QModelIndex) -> None:
+        """Show the full item widget for the input row, collapsing any other.
+
+        Only the expanded row has a real widget, all other rows are painted
+        by the view's delegate.
+        """
+        was_expanded = (
+                self._expanded_index is not None
+                and self._expanded_index.row() == index.row()
+        )
+        self.collapse_expanded_item()
+        if not was_expanded:
+            widget = self._get_display_widget(
+                index.data(OacsItemListModel.ItemRole))
+            widget.installEventFilter(self)
+            self.search_results_lv.setIndexWidget(index, widget)
+            self._expanded_index = QtCore.QPersistentModelIndex(index)
+            self.search_results_lv.itemDelegate().sizeHintChanged.emit(index)
+
+    def collapse_expanded_item(self) -> None:
+        if self._expanded_index is None:
+            return None
+        if self._expanded_index.isValid():
+            index = QtCore.QModelIndex(self._expanded_index)
+            # replacing the index widget deletes the previous one
+            self.search_results_lv.setIndexWidget(index, None)
+            self.search_results_lv.itemDelegate().sizeHintChanged.emit(index)
+        self._expanded_index = None
+
+    def clear_search_results(self) -> None:
+        self.cancel_pending_search()
+        self._awaited_mirror_id = None
+        self._awaited_mirror_read = None
+        self.reset_search_results()
+
+    def reset_search_results(self) -> None:
+        """Empty the results list, without canceling the pending search."""
+        self._streamed_result = None
+        self._shown_result = None
+        self._shown_facet_counts = {}
+        self.search_results_filler.stop()
+        self.stop_rendering_pb.setVisible(False)
+        self.collapse_expanded_item()
+        self.search_results_model.clear()
+        self.search_results_la.setVisible(False)
 
     def initiate_search(self) -> None:
-        utils.clear_search_results(self.search_results_layout)
-        self._initiate_search()
+        self._live_search_timer.stop()
+        self.clear_search_results()
+        connection = settings_manager.get_current_data_source_connection()
+        if connection is not None and connection.use_offline_mirror:
+            self.show_mirror_search_result(connection.id)
+        else:
+            self._pending_request = self._initiate_search()
 
-    def handle_search_response(
+    def show_mirror_search_result(self, connection_id: uuid.UUID) -> None:
+        """Search the connection's local mirror instead of the server.
+
+        The first search of a connection loads its mirror in a background
+        task, the search is then run when it has been loaded. The index only
+        keeps entries of the mirrored items, those found are read back from
+        the mirror in another background task.
+        """
+        if not catalog.catalog_index_manager.is_mirror_loaded(connection_id):
+            self._awaited_mirror_id = connection_id
+            tasks.schedule_mirror_loading(connection_id)
+            self.search_results_la.setText("Loading the local mirror...")
+            self.search_results_la.setVisible(True)
+            return None
+        self._awaited_mirror_id = None
+        index = catalog.catalog_index_manager.get_index(connection_id)
+        # the index filters with its type bitmaps, which also count the results of each type
+        index_result = index.search(
+            self.free_text_le.text(), item_type=self.item_type, filter_set=self._get_filter_set())
+        missing_keys = catalog.catalog_index_manager.get_missing_keys(
+            connection_id, index_result.keys)
+        mirror_read = self._awaited_mirror_read = object()
+        if len(missing_keys) == 0:
+            self.show_mirror_items(mirror_read, connection_id, index_result, [])
+            return None
+        tasks.schedule_mirror_items_loading(
+            connection_id,
+            missing_keys,
+            functools.partial(self.show_mirror_items, mirror_read, connection_id, index_result)
+        )
+        self.search_results_la.setText("Reading the results from the local mirror...")
+        self.search_results_la.setVisible(True)
+
+    def show_mirror_items(
             self,
-            search_result: models.OacsFeatureList,
+            mirror_read: object,
+            connection_id: uuid.UUID,
+            index_result: catalog.CatalogSearchResult,
+            mirror_items: list[models.OacsItem],
+    ) -> None:
+        """Show the items found by a mirror search, unless a newer search was made since."""
+        if mirror_read is not self._awaited_mirror_read:
+            return None
+        self._awaited_mirror_read = None
+        items_by_key = {(type(item), item.id_): item for item in mirror_items}
+        for item in catalog.catalog_index_manager.get_items(connection_id, index_result.keys):
+            items_by_key[(type(item), item.id_)] = item
+        self.show_search_result(
+            models.OacsItemList(
+                items=[
+                    item for key in index_result.keys
+                    if (item := items_by_key.get(key)) is not None
+                ]
+            ),
+            None,
+            note="from local mirror",
+            facet_counts=index_result.facet_counts,
+        )
+
+    def refilter_search_results(self) -> None:
+        """Apply changed local filters to the shown results, without searching again."""
+        connection = settings_manager.get_current_data_source_connection()
+        if (
+                connection is not None
+                and connection.use_offline_mirror
+                and catalog.catalog_index_manager.is_mirror_loaded(connection.id)
+        ):
+            self.show_mirror_search_result(connection.id)
+            return None
+        if (shown_result := self._shown_result) is None:
+            return None
+        is_streaming = self._streamed_result is not None and self._pending_request is not None
+        self.search_results_filler.stop()
+        self.collapse_expanded_item()
+        self.search_results_model.clear()
+        self.search_results_filler.start(
+            self._filter_items(shown_result.items), complete=not is_streaming)
+
+    def handle_mirror_loaded(self, serialized_connection_id: str) -> None:
+        if (
+                self._awaited_mirror_id is not None
+                and str(self._awaited_mirror_id) == serialized_connection_id
+        ):
+            self.show_mirror_search_result(self._awaited_mirror_id)
+
+    def cancel_pending_search(self) -> None:
+        # forgotten first, as canceling emits `request_ended`
+        if (pending_request := self._pending_request) is not None:
+            self._pending_request = None
+            oacs_client.cancel_request(pending_request.request_id)
+
+    def toggle_live_search(self, enabled: bool) -> None:
+        settings_manager.set_live_search_enabled(enabled)
+        if not enabled:
+            self._live_search_timer.stop()
+
+    def handle_free_text_edited(self, text: str) -> None:
+        if not self.live_search_cb.isChecked():
+            return None
+        # a newer query makes the in-flight one useless
+        self.cancel_pending_search()
+        self._live_search_timer.start()
+
+    def run_live_search(self) -> None:
+        """Search for the current free text, using recent results where possible."""
+        text = self.free_text_le.text().strip()
+        connection = settings_manager.get_current_data_source_connection()
+        if not text or connection is None:
+            return None
+        if connection.use_offline_mirror:
+            self.show_mirror_search_result(connection.id)
+            return None
+        if (
+                cached := self._recent_searches.get(
+                    connection.id, text, max_age_seconds=RECENT_SEARCH_MAX_AGE_SECONDS)
+        ) is not None:
+            self.show_search_result(*cached)
+            return None
+        # show a locally computed preview, the server's answer replaces it
+        if (stale_cached := self._recent_searches.get(connection.id, text)) is not None:
+            stale_result, _ = stale_cached
+            self.show_search_result(stale_result, None)
+        elif (prefix_cached := self._recent_searches.get_prefix_match(connection.id, text)) is not None:
+            prefix_result, _ = prefix_cached
+            self.show_search_result(
+                type(prefix_result)(items=filter_items_by_text(prefix_result.items, text)),
+                None
+            )
+        elif len(local_items := self.search_catalog_index(connection.id, text)) > 0:
+            self.show_search_result(models.OacsItemList(items=local_items), None)
+        self.cancel_pending_search()
+        self._pending_request = self._initiate_search()
+
+    def _is_pending_search(self, request_metadata: OacsRequestMetadata) -> bool:
+        # the client signals also carry responses of requests made by other
+        # widgets, as well as responses of superseded searches
+        return (
+            self._pending_request is not None
+            and request_metadata.request_id == self._pending_request.request_id
+        )
+
+    def handle_search_batch(
+            self,
+            batch: models.OacsItemList,
             request_metadata: OacsRequestMetadata
     ) -> None:
-        if len(search_result.items) == 0:
-            self.search_results_layout.addWidget(
-                QtWidgets.QLabel("No items found"))
+        """Show a batch of results of the pending search, as soon as it is received."""
+        if not self._is_pending_search(request_metadata):
+            return None
+        if self._streamed_result is None:
+            # the first batch replaces what was shown so far, e.g. a preview
+            self.reset_search_results()
+            self._search_results_note = ""
+            self._streamed_result = type(batch)(items=[])
+            self._shown_result = self._streamed_result
+            self.search_results_la.setVisible(True)
+            self.search_results_filler.start([], complete=False)
+            QtCore.QTimer.singleShot(0, self.updateGeometry)
+        self._streamed_result.items.extend(batch.items)
+        for facet, count in catalog.count_facets(batch.items).items():
+            self._shown_facet_counts[facet] = self._shown_facet_counts.get(facet, 0) + count
+        self._show_facet_counts(self._shown_facet_counts)
+        self.search_results_filler.extend(self._filter_items(batch.items))
+
+    def finish_search(self, request_metadata: OacsRequestMetadata) -> None:
+        """Handle the end of the pending search, once all its results were received."""
+        self._pending_request = None
+        if (search_result := self._streamed_result) is None:
+            search_result = models.OacsItemList(items=[])
+            self.show_search_result(search_result, request_metadata)
         else:
-            for item in search_result.items:
-                self.search_results_layout.addWidget(
-                    self._get_display_widget(item)
-                )
-        self.search_results_layout.addStretch()
+            self.search_results_filler.close()
+        if request_metadata.connection_id is not None and request_metadata.search_params:
+            query = request_metadata.search_params.query or {}
+            self._recent_searches.put(
+                request_metadata.connection_id,
+                str(query.get("q", "")).strip(),
+                (search_result, request_metadata)
+            )
+
+    def search_catalog_index(self, connection_id: uuid.UUID, text: str) -> list[models.OacsItem]:
+        """Search the items previously fetched from the connection, without going to the server."""
+        index_result = catalog.catalog_index_manager.get_index(connection_id).search(
+            text, item_type=self.item_type)
+        return catalog.catalog_index_manager.get_items(connection_id, index_result.keys)
+
+    def handle_request_failed(self, request_metadata: OacsRequestMetadata, error_message: str) -> None:
+        if not self._is_pending_search(request_metadata):
+            return None
+        self._pending_request = None
+        if self._streamed_result is not None:
+            self._search_results_note = "incomplete, the server response was interrupted"
+            self.search_results_filler.close()
+            return None
+        local_items = self.search_catalog_index(
+            request_metadata.connection_id, self.free_text_le.text())
+        if len(local_items) > 0:
+            self.show_search_result(
+                models.OacsItemList(items=local_items),
+                None,
+                note="previously fetched, the server could not be reached"
+            )
+
+    def show_search_result(
+            self,
+            search_result: models.OacsFeatureList,
+            request_metadata: OacsRequestMetadata | None,
+            note: str = "",
+            facet_counts: dict[enum.Enum, int] | None = None,
+    ) -> None:
+        """Show a search result, through the local filters.
+
+        Results that were already filtered, e.g. by the catalog index, come
+        with the facet counts of the unfiltered result.
+        """
+        self.clear_search_results()
+        self._search_results_note = note
+        self._shown_result = search_result
+        self._shown_facet_counts = (
+            facet_counts if facet_counts is not None else catalog.count_facets(search_result.items))
+        self._show_facet_counts(self._shown_facet_counts)
+        self.search_results_la.setVisible(True)
+        # results are added over several event loop iterations - the user is
+        # able to scroll, stop or start a new search in the meantime
+        self.search_results_filler.start(self._filter_items(search_result.items))
         QtCore.QTimer.singleShot(0, self.updateGeometry)
 
+    def handle_rendering_progress(self, num_added: int, total: int) -> None:
+        self.search_results_la.setText(f"Showing {num_added} of {total} items...")
+        self.stop_rendering_pb.setVisible(self.search_results_filler.is_running())
+
+    def handle_rendering_finished(self) -> None:
+        total = self.search_results_filler.total
+        text = f"{total} items found" if total > 0 else "No items found"
+        if self._search_results_note:
+            text = f"{text} ({self._search_results_note})"
+        self.search_results_la.setText(text)
+        self.stop_rendering_pb.setVisible(False)
+
+    def stop_rendering_search_results(self) -> None:
+        self.search_results_filler.stop()
+        self.stop_rendering_pb.setVisible(False)
+        self.search_results_la.setText(
+            f"Showing {self.search_results_filler.num_added} of "
+            f"{self.search_results_filler.total} items (stopped)"
+        )
+
 
 class OacsFeatureSearchWidgetBase(
     OacsResourceSearchWidgetBase,
     metaclass=AbstractQWidgetMeta
 ):
+    load_all_pb: QtWidgets.QPushButton
 
-    def _add_load_all_search_results_button(
-            self,
-            oacs_feature_list: models.OacsFeatureList,
-            layer_name_prefix: str
-    ) -> None:
-        load_all_pb = QtWidgets.QPushButton("Load all search results")
+    _last_search_result: models.OacsFeatureList | None
+    _last_request_metadata: OacsRequestMetadata | None
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None):
+        super().__init__(parent)
+        self._last_search_result = None
+        self._last_request_metadata = None
+        self.load_all_pb = QtWidgets.QPushButton("Load all search results")
+        self.load_all_pb.setVisible(False)
+        self.load_all_pb.clicked.connect(self.load_last_search_results)
         button_layout = QtWidgets.QHBoxLayout()
         button_layout.setContentsMargins(9, 9, 9, 9)
         button_layout.addStretch()
-        button_layout.addWidget(load_all_pb)
-        load_all_pb.clicked.connect(
+        button_layout.addWidget(self.load_all_pb)
+        self.search_results_layout.insertLayout(0, button_layout)
+
+    def load_all_search_results(
+            self,
+            oacs_feature_list: models.OacsFeatureList,
+            layer_name_prefix: str,
+            request_metadata: OacsRequestMetadata | None = None,
+    ) -> None:
+        connection = settings_manager.get_current_data_source_connection()
+        tasks.schedule_layer_loading(
             functools.partial(
-                utils.load_oacs_feature_list_as_layers,
-                oacs_feature_list,
-                name_prefix=layer_name_prefix
-            )
+                layers.build_oacs_feature_list_layers,
+                oacs_feature_list.items,
+                name_prefix=layer_name_prefix,
+                storage=layers.LayerStorage.from_connection(connection),
+                provenance=(
+                    layers.LayerProvenance.from_request(request_metadata, connection)
+                    if request_metadata is not None else None
+                ),
+            ),
+            description=f"Load OACS layers {layer_name_prefix!r}"
         )
-        self.search_results_layout.addLayout(button_layout)
 
-    def handle_search_response(
+    def load_last_search_results(self) -> None:
+        if self._last_search_result is None:
+            return None
+        # only the results that pass the local filters are loaded, as shown
+        items = list(self._filter_items(self._last_search_result.items))
+        if len(items) == 0:
+            return None
+        self.load_all_search_results(
+            type(self._last_search_result)(items=items),
+            "-".join(
+                (
+                    settings_manager.get_current_data_source_connection().name,
+                    "systems"
+                )
+            ),
+            request_metadata=self._last_request_metadata
+        )
+
+    def reset_search_results(self) -> None:
+        super().reset_search_results()
+        self._last_search_result = None
+        self._last_request_metadata = None
+        self.load_all_pb.setVisible(False)
+
+    def show_search_result(
             self,
             search_result: models.OacsFeatureList,
-            request_metadata: OacsRequestMetadata
+            request_metadata: OacsRequestMetadata | None,
+            note: str = "",
+            facet_counts: dict[enum.Enum, int] | None = None,
     ) -> None:
-        if len(search_result.items) == 0:
-            self.search_results_layout.addWidget(
-                QtWidgets.QLabel("No items found"))
-        else:
-            load_all_pb = QtWidgets.QPushButton("Load all search results")
-            button_layout = QtWidgets.QHBoxLayout()
-            button_layout.setContentsMargins(9, 9, 9, 9)
-            button_layout.addStretch()
-            button_layout.addWidget(load_all_pb)
-            load_all_pb.clicked.connect(
-                functools.partial(
-                    utils.load_oacs_feature_list_as_layers,
-                    search_result,
-                    name_prefix="-".join(
-                        (
-                            settings_manager.get_current_data_source_connection().name,
-                            "systems"
-                        )
-                    )
-                )
-            )
-            self.search_results_layout.addLayout(button_layout)
-            for item in search_result.items:
-                self.search_results_layout.addWidget(
-                    self._get_display_widget(item)
-                )
-        self.search_results_layout.addStretch()
-        QtCore.QTimer.singleShot(0, self.updateGeometry)
+        super().show_search_result(search_result, request_metadata, note, facet_counts)
+        self._offer_loading(search_result, request_metadata)
+
+    def finish_search(self, request_metadata: OacsRequestMetadata) -> None:
+        streamed_result = self._streamed_result
+        super().finish_search(request_metadata)
+        if streamed_result is not None:
+            self._offer_loading(streamed_result, request_metadata)
+
+    def _offer_loading(
+            self,
+            search_result: models.OacsFeatureList,
+            request_metadata: OacsRequestMetadata | None,
+    ) -> None:
+        if len(search_result.items) > 0:
+            self._last_search_result = search_result
+            self._last_request_metadata = request_metadata
+            self.load_all_pb.setVisible(True)
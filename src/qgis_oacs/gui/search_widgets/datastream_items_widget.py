@@ -1,30 +1,27 @@
 import typing
-from pathlib import Path
 
 from qgis.PyQt import QtWidgets
-from qgis.PyQt.uic import loadUiType
 
-from ... import models
-from ...client import oacs_client
+from ... import (
+    models,
+    utils,
+)
+from ...client import (
+    OacsRequestMetadata,
+    oacs_client,
+)
 from ...settings import settings_manager
 from .. import list_item_widgets
 from .base import OacsResourceSearchWidgetBase
 
-SearchDataStreamItemsWidgetUi, _ = loadUiType(
-    Path(__file__).parents[2] / "ui/search_datastream_items_widget.ui")
+SearchDataStreamItemsWidgetUi = utils.load_ui_form("search_datastream_items_widget")
 
 
 class SearchDataStreamItemsWidget(
     OacsResourceSearchWidgetBase,
     SearchDataStreamItemsWidgetUi
 ):
-
-    def __init__(
-            self,
-            parent: QtWidgets.QWidget=None
-    ) -> None:
-        super().__init__(parent)
-        oacs_client.datastream_list_fetched.connect(self.handle_search_response)
+    item_type = models.DataStream
 
     def _get_interactive_widgets(self) -> tuple[QtWidgets.QWidget, ...]:
         return (
@@ -32,9 +29,13 @@ class SearchDataStreamItemsWidget(
             self.search_pb,
         )
 
-    def _initiate_search(self) -> None:
+    def _initiate_search(self) -> OacsRequestMetadata:
         connection = settings_manager.get_current_data_source_connection()
-        oacs_client.initiate_datastream_list_search(connection)
+        return oacs_client.initiate_datastream_list_search(
+            connection,
+            q_filter=self.free_text_le.text(),
+            streamed=True,
+        )
 
     def _get_display_widget(self, item: models.OacsItem) -> QtWidgets.QWidget:
         item = typing.cast(models.DataStream, item)
@@ -1,30 +1,27 @@
 import typing
-from pathlib import Path
 
 from qgis.PyQt import QtWidgets
-from qgis.PyQt.uic import loadUiType
 
-from ... import models
-from ...client import oacs_client
+from ... import (
+    models,
+    utils,
+)
+from ...client import (
+    OacsRequestMetadata,
+    oacs_client,
+)
 from ...settings import settings_manager
 from .. import list_item_widgets
 from .base import OacsFeatureSearchWidgetBase
 
-SearchProcedureItemsWidgetUi, _ = loadUiType(
-    Path(__file__).parents[2] / "ui/search_procedure_items_widget.ui")
+SearchProcedureItemsWidgetUi = utils.load_ui_form("search_procedure_items_widget")
 
 
 class SearchProcedureItemsWidget(
     OacsFeatureSearchWidgetBase,
     SearchProcedureItemsWidgetUi
 ):
-
-    def __init__(
-            self,
-            parent: QtWidgets.QWidget=None
-    ) -> None:
-        super().__init__(parent)
-        oacs_client.procedure_list_fetched.connect(self.handle_search_response)
+    item_type = models.Procedure
 
     def _get_interactive_widgets(self) -> tuple[QtWidgets.QWidget, ...]:
         return (
@@ -32,10 +29,12 @@ class SearchProcedureItemsWidget(
             self.search_pb,
         )
 
-    def _initiate_search(self) -> None:
+    def _initiate_search(self) -> OacsRequestMetadata:
         connection = settings_manager.get_current_data_source_connection()
-        oacs_client.initiate_procedure_list_search(
+        return oacs_client.initiate_procedure_list_search(
             connection,
+            q_filter=self.free_text_le.text(),
+            streamed=True,
         )
 
     def _get_display_widget(self, item: models.OacsFeature) -> QtWidgets.QWidget:
@@ -1,34 +1,46 @@
+import enum
 import typing
-from pathlib import Path
 
 from qgis.PyQt import QtWidgets
-from qgis.PyQt.uic import loadUiType
 
-from ... import models
-from ...client import oacs_client
+from ... import (
+    models,
+    utils,
+)
+from ...client import (
+    OacsRequestMetadata,
+    oacs_client,
+)
 from ...settings import settings_manager
 from .. import list_item_widgets
 from .base import OacsFeatureSearchWidgetBase
 
-SearchSystemItemsWidgetUi, _ = loadUiType(
-    Path(__file__).parents[2] / "ui/search_system_items_widget.ui")
+SearchSystemItemsWidgetUi = utils.load_ui_form("search_system_items_widget")
 
 
 class SearchSystemItemsWidget(
     OacsFeatureSearchWidgetBase,
     SearchSystemItemsWidgetUi
 ):
+    item_type = models.System
+
     id_le: QtWidgets.QLineEdit
     advanced_filters_gb: QtWidgets.QGroupBox
     property_name_le: QtWidgets.QLineEdit
     property_value_le: QtWidgets.QLineEdit
+    system_type_cmb: QtWidgets.QComboBox
+    asset_type_cmb: QtWidgets.QComboBox
 
-    def __init__(
-            self,
-            parent: QtWidgets.QWidget=None
-    ) -> None:
+    def __init__(self, parent: QtWidgets.QWidget | None = None):
         super().__init__(parent)
-        oacs_client.system_list_fetched.connect(self.handle_search_response)
+        for combo_box, facet_type in (
+                (self.system_type_cmb, models.SystemType),
+                (self.asset_type_cmb, models.AssetType),
+        ):
+            combo_box.addItem("Any", None)
+            for member in facet_type:
+                combo_box.addItem(_get_facet_label(member), member)
+            combo_box.currentIndexChanged.connect(self.refilter_search_results)
 
     def _get_interactive_widgets(self) -> tuple[QtWidgets.QWidget, ...]:
         return (
@@ -37,13 +49,33 @@ class SearchSystemItemsWidget(
             self.advanced_filters_gb,
         )
 
-    def _initiate_search(self) -> None:
+    def _initiate_search(self) -> OacsRequestMetadata:
         connection = settings_manager.get_current_data_source_connection()
-        oacs_client.initiate_system_list_search(
+        return oacs_client.initiate_system_list_search(
             connection,
-            q_filter=self.free_text_le.text()
+            q_filter=self.free_text_le.text(),
+            streamed=True,
+        )
+
+    def _get_filter_set(self) -> models.SystemSearchFilterSet:
+        system_type = self.system_type_cmb.currentData()
+        asset_type = self.asset_type_cmb.currentData()
+        return models.SystemSearchFilterSet(
+            system_types=[system_type.value] if system_type is not None else [],
+            asset_types=[asset_type.value] if asset_type is not None else [],
         )
 
+    def _show_facet_counts(self, facet_counts: dict[enum.Enum, int]) -> None:
+        for combo_box in (self.system_type_cmb, self.asset_type_cmb):
+            for index in range(1, combo_box.count()):
+                member = combo_box.itemData(index)
+                combo_box.setItemText(
+                    index, f"{_get_facet_label(member)} ({facet_counts.get(member, 0)})")
+
     def _get_display_widget(self, item: models.OacsFeature) -> QtWidgets.QWidget:
         item = typing.cast(models.System, item)
         return list_item_widgets.SystemListItemWidget(item)
+
+
+def _get_facet_label(member: enum.Enum) -> str:
+    return member.value.replace("_", " ").capitalize()
@@ -0,0 +1,227 @@
+"""Incremental parsing of list responses, as their bytes arrive.
+
+List responses are a JSON object whose items are in one array member, like
+the `features` of a GeoJSON FeatureCollection or the `items` of a JSON list
+response. `ListResponseStreamParser` is fed the response in chunks and hands
+out each element of that array as soon as it is complete, so that neither the
+whole response text nor its whole decoded tree ever has to be held in memory.
+
+Only the structure around the items is walked here, the items themselves and
+the other members are decoded by the standard `json` decoder.
+"""
+
+import codecs
+import enum
+import json
+import re
+import typing
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _State(enum.Enum):
+    START = enum.auto()  # expecting the opening brace of the response
+    FIRST_KEY = enum.auto()  # expecting a member name or the closing brace
+    KEY = enum.auto()  # expecting a member name
+    COLON = enum.auto()
+    VALUE = enum.auto()
+    MEMBER_SEPARATOR = enum.auto()  # expecting a comma or the closing brace
+    FIRST_ITEM = enum.auto()  # expecting an item or the closing bracket
+    ITEM = enum.auto()
+    ITEM_SEPARATOR = enum.auto()  # expecting a comma or the closing bracket
+    DONE = enum.auto()
+
+
+class ListResponseStreamParser:
+    """Parse a list response incrementally, yielding its items one at a time.
+
+    Members other than the items (e.g. `links`, `numberMatched`) are
+    collected in `members` once they are complete. Invalid JSON raises
+    `json.JSONDecodeError`, either when it is found or, if it could still
+    have been a partially received value, when the input is closed.
+    """
+
+    items_key: str
+    members: dict[str, typing.Any]
+
+    _decoder: json.JSONDecoder
+    _text_decoder: codecs.IncrementalDecoder
+    _buffer: str
+    _position: int
+    # text received after the buffer, which is only joined to it once
+    # there is enough of it for the incomplete value to possibly be complete
+    _pending_chunks: list[str]
+    _pending_length: int
+    _wait_for_length: int
+    _state: _State
+    _key: str | None
+    _closed: bool
+
+    def __init__(self, items_key: str):
+        self.items_key = items_key
+        self.members = {}
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._pending_chunks = []
+        self._pending_length = 0
+        self._wait_for_length = 0
+        self._state = _State.START
+        self._key = None
+        self._closed = False
+
+    @property
+    def is_done(self) -> bool:
+        return self._state == _State.DONE
+
+    def feed(self, chunk: bytes | memoryview) -> list[typing.Any]:
+        """Add the next chunk of the response and return the items it completed."""
+        text = self._text_decoder.decode(chunk)
+        self._pending_chunks.append(text)
+        self._pending_length += len(text)
+        # an incomplete value is decoded again from its start each time more
+        # input is joined, waiting for it to double keeps large values linear
+        if len(self._buffer) - self._position + self._pending_length < self._wait_for_length:
+            return []
+        self._join_pending_chunks()
+        return self._parse()
+
+    def close(self) -> list[typing.Any]:
+        """Signal the end of the response and return the last items."""
+        self._pending_chunks.append(self._text_decoder.decode(b"", final=True))
+        self._join_pending_chunks()
+        self._closed = True
+        items = self._parse()
+        if self._state != _State.DONE:
+            raise json.JSONDecodeError("Unexpected end of response", self._buffer, self._position)
+        if self._buffer[self._skip_whitespace():]:
+            raise json.JSONDecodeError("Extra data", self._buffer, self._position)
+        return items
+
+    def _parse(self) -> list[typing.Any]:
+        items = []
+        while self._state != _State.DONE:
+            position = self._skip_whitespace()
+            if position == len(self._buffer):
+                break
+            char = self._buffer[position]
+            state = self._state
+            if state == _State.START:
+                self._expect(char, "{", _State.FIRST_KEY)
+            elif state in (_State.FIRST_KEY, _State.KEY):
+                if state == _State.FIRST_KEY and char == "}":
+                    self._advance(_State.DONE)
+                elif char != '"':
+                    self._fail("Expecting property name enclosed in double quotes")
+                elif (key := self._decode_value()) is not None:
+                    self._key = key[0]
+                    self._state = _State.COLON
+                else:
+                    break
+            elif state == _State.COLON:
+                self._expect(char, ":", _State.VALUE)
+            elif state == _State.VALUE:
+                if self._key == self.items_key and char == "[":
+                    self._advance(_State.FIRST_ITEM)
+                elif (value := self._decode_value()) is not None:
+                    self.members[self._key] = value[0]
+                    self._state = _State.MEMBER_SEPARATOR
+                else:
+                    break
+            elif state == _State.MEMBER_SEPARATOR:
+                if char == "}":
+                    self._advance(_State.DONE)
+                else:
+                    self._expect(char, ",", _State.KEY)
+            elif state == _State.FIRST_ITEM and char == "]":
+                self._advance(_State.MEMBER_SEPARATOR)
+            elif state == _State.ITEM and char == "]":
+                self._fail("Illegal trailing comma before end of array")
+            elif state in (_State.FIRST_ITEM, _State.ITEM):
+                if not self._parse_items(items):
+                    break
+            elif state == _State.ITEM_SEPARATOR:
+                if char == "]":
+                    self._advance(_State.MEMBER_SEPARATOR)
+                else:
+                    self._expect(char, ",", _State.ITEM)
+        return items
+
+    def _parse_items(self, items: list[typing.Any]) -> bool:
+        """Decode consecutive items, returning whether parsing can go on.
+
+        This is the loop that runs for almost all of a response, so it
+        avoids the per-character state handling of `_parse`.
+        """
+        buffer = self._buffer
+        buffer_length = len(buffer)
+        raw_decode = self._decoder.raw_decode
+        match_whitespace = _WHITESPACE.match
+        position = self._position
+        while True:
+            try:
+                item, end = raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if self._closed:
+                    raise
+                self._wait_for_length = 2 * (buffer_length - position)
+                return False
+            self._wait_for_length = 0
+            if end == buffer_length and not self._closed:
+                # may be a number with more digits to come
+                return False
+            items.append(item)
+            position = match_whitespace(buffer, end).end()
+            if position < buffer_length and buffer[position] == ",":
+                position = match_whitespace(buffer, position + 1).end()
+                self._position = position
+                self._state = _State.ITEM
+                if position < buffer_length and buffer[position] != "]":
+                    continue
+            else:
+                self._position = position
+                self._state = _State.ITEM_SEPARATOR
+            return True
+
+    def _join_pending_chunks(self) -> None:
+        self._buffer = "".join((self._buffer[self._position:], *self._pending_chunks))
+        self._position = 0
+        self._pending_chunks = []
+        self._pending_length = 0
+
+    def _skip_whitespace(self) -> int:
+        self._position = _WHITESPACE.match(self._buffer, self._position).end()
+        return self._position
+
+    def _advance(self, state: _State) -> None:
+        self._position += 1
+        self._state = state
+
+    def _expect(self, char: str, expected: str, state: _State) -> None:
+        if char != expected:
+            self._fail(f"Expecting {expected!r} delimiter")
+        self._advance(state)
+
+    def _fail(self, message: str) -> typing.NoReturn:
+        raise json.JSONDecodeError(message, self._buffer, self._position)
+
+    def _decode_value(self) -> tuple[typing.Any] | None:
+        """Decode the value at the current position, or return None if more input is needed.
+
+        A value that reaches the end of the input is only accepted once the
+        input is closed, as it may be a number with more digits to come.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._position)
+        except json.JSONDecodeError:
+            if self._closed:
+                raise
+            self._wait_for_length = 2 * (len(self._buffer) - self._position)
+            return None
+        if end == len(self._buffer) and not self._closed:
+            self._wait_for_length = 0
+            return None
+        self._position = end
+        self._wait_for_length = 0
+        return (value,)
@@ -0,0 +1,887 @@
+import contextlib
+import dataclasses
+import datetime as dt
+import functools
+import hashlib
+import json
+import re
+import sqlite3
+import typing
+import uuid
+from pathlib import Path
+
+import qgis.core
+from qgis.PyQt import QtCore
+
+from . import (
+    geometries,
+    models,
+    tasks,
+)
+from .client import (
+    OacsRequestMetadata,
+    RequestType,
+    build_request_url,
+    oacs_client,
+)
+from .constants import LAYER_CUSTOM_PROPERTY_PREFIX
+from .settings import (
+    DataSourceConnectionSettings,
+    LayerStorageFormat,
+    settings_manager,
+)
+from .utils import log_message
+
+if typing.TYPE_CHECKING:
+    from . import columnar
+
+# how many features to process between progress reports
+_PROGRESS_REPORT_INTERVAL = 100
+# from how many features on layers are built from a columnar feature list
+_COLUMNAR_MIN_FEATURES = 10_000
+
+# fields used to track features when refreshing layers from the server
+ID_FIELD_NAME = "oacs_id"
+HASH_FIELD_NAME = "oacs_hash"
+
+
+@dataclasses.dataclass(frozen=True)
+class LayerProvenance:
+    """Where the contents of a layer came from."""
+
+    connection_id: str
+    request_type: str
+    source_url: str
+    query: dict | None
+    fetched_at: dt.datetime
+
+    def apply_to(self, layer: qgis.core.QgsVectorLayer) -> None:
+        """Record provenance both as layer custom properties and as layer metadata.
+
+        Custom properties are the machine-readable form, which is saved in the
+        QGIS project. Layer metadata is also persisted to the data source, if
+        the layer's provider supports it (e.g. GeoPackage).
+        """
+        for name, value in (
+                ("connection_id", self.connection_id),
+                ("request_type", self.request_type),
+                ("source_url", self.source_url),
+                ("query", json.dumps(self.query or {})),
+                ("fetched_at", self.fetched_at.isoformat()),
+        ):
+            layer.setCustomProperty(f"{LAYER_CUSTOM_PROPERTY_PREFIX}/{name}", value)
+        metadata = layer.metadata()
+        metadata.setIdentifier(self.source_url)
+        metadata.setTitle(layer.name())
+        metadata.setAbstract(
+            f"Retrieved from an OGC API - Connected Systems server at "
+            f"{self.fetched_at.isoformat()}.\n\n"
+            f"Source URL: {self.source_url}\n"
+            f"Query: {json.dumps(self.query or {})}"
+        )
+        metadata.setDateTime(
+            qgis.core.Qgis.MetadataDateType.Created,
+            QtCore.QDateTime.fromString(
+                self.fetched_at.isoformat(), QtCore.Qt.DateFormat.ISODate)
+        )
+        metadata.addLink(
+            qgis.core.QgsAbstractMetadataBase.Link(
+                "source", "OGC API - Connected Systems", self.source_url)
+        )
+        layer.setMetadata(metadata)
+
+    @classmethod
+    def from_request(
+            cls,
+            request_metadata: OacsRequestMetadata,
+            connection: DataSourceConnectionSettings,
+    ) -> "LayerProvenance":
+        return cls(
+            connection_id=str(connection.id),
+            request_type=request_metadata.request_type.value,
+            source_url=build_request_url(
+                request_metadata.search_params, connection).toString(),
+            query=request_metadata.search_params.query,
+            fetched_at=request_metadata.requested_at,
+        )
+
+    @classmethod
+    def from_layer(cls, layer: qgis.core.QgsMapLayer) -> typing.Optional["LayerProvenance"]:
+        """Read back provenance from a layer, if it was loaded by this plugin."""
+        values = {
+            name: layer.customProperty(f"{LAYER_CUSTOM_PROPERTY_PREFIX}/{name}")
+            for name in ("connection_id", "request_type", "source_url", "query", "fetched_at")
+        }
+        if not all(values.values()):
+            return None
+        return cls(
+            connection_id=values["connection_id"],
+            request_type=values["request_type"],
+            source_url=values["source_url"],
+            query=json.loads(values["query"]) or None,
+            fetched_at=dt.datetime.fromisoformat(values["fetched_at"]),
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class LayerStorage:
+    """Where to write loaded layers to, instead of keeping them in memory."""
+
+    storage_format: LayerStorageFormat
+    directory: Path
+    file_stem: str
+
+    @classmethod
+    def from_connection(
+            cls,
+            connection: DataSourceConnectionSettings
+    ) -> typing.Optional["LayerStorage"]:
+        if (
+                connection.layer_storage_format == LayerStorageFormat.MEMORY
+                or not connection.layer_storage_dir
+        ):
+            return None
+        return cls(
+            storage_format=connection.layer_storage_format,
+            directory=Path(connection.layer_storage_dir),
+            file_stem=_sanitize_file_name(connection.name),
+        )
+
+    def get_target_path(self, layer_name: str) -> Path:
+        # GeoPackage files hold all layers of a connection, whereas FlatGeobuf
+        # only supports a single layer per file
+        if self.storage_format == LayerStorageFormat.GEOPACKAGE:
+            return self.directory / f"{self.file_stem}.gpkg"
+        return self.directory / f"{_sanitize_file_name(layer_name)}.fgb"
+
+    def get_unused_layer_name(self, layer_name: str) -> str:
+        """Return the layer name, with a numeric suffix if the storage already has it.
+
+        Layers written before may be in a project, so their data must not be
+        replaced by a later load that happens to get the same name.
+        """
+        taken_names = set()
+        if self.storage_format == LayerStorageFormat.GEOPACKAGE:
+            target_path = self.get_target_path(layer_name)
+            if target_path.exists():
+                taken_names = _list_geopackage_tables(target_path)
+        candidate = layer_name
+        suffix = 1
+        while candidate.casefold() in taken_names or (
+                self.storage_format == LayerStorageFormat.FLATGEOBUF
+                and self.get_target_path(candidate).exists()
+        ):
+            suffix += 1
+            candidate = f"{layer_name}-{suffix}"
+        return candidate
+
+
+def _list_geopackage_tables(path: Path) -> set[str]:
+    """Return the casefolded names of the tables of a GeoPackage, which are case-insensitive."""
+    with contextlib.closing(sqlite3.connect(path)) as db:
+        try:
+            rows = db.execute("SELECT table_name FROM gpkg_contents").fetchall()
+        except sqlite3.DatabaseError:
+            return set()
+    return {row[0].casefold() for row in rows}
+
+
+def build_oacs_feature_layer(
+        oacs_feat: models.OacsFeature,
+        storage: LayerStorage | None = None,
+        provenance: LayerProvenance | None = None,
+        feedback: qgis.core.QgsFeedback | None = None,
+) -> list[qgis.core.QgsVectorLayer]:
+    """Build a layer with a single OACS feature.
+
+    The layer is kept in memory unless a storage is given. This does not
+    touch the current QGIS project, so it is safe to call from a background
+    thread.
+    """
+    if oacs_feat.geometry:
+        geom_type = qgis.core.QgsWkbTypes.displayString(
+            oacs_feat.geometry.wkbType())
+        crs = oacs_feat.geometry.crs()
+    else:
+        geom_type = "None"
+        crs = geometries.get_default_crs()
+    vector_layer = qgis.core.QgsVectorLayer(
+        f"{geom_type}?crs={crs.authid()}", oacs_feat.name, "memory")
+    provider = vector_layer.dataProvider()
+    properties = oacs_feat.get_renderable_properties()
+    provider.addAttributes(_build_fields(properties.keys()))
+    vector_layer.updateFields()
+    provider.addFeatures([to_qgis_feature(oacs_feat, vector_layer.fields())])
+    vector_layer.updateExtents()
+    if feedback is not None:
+        feedback.setProgress(100)
+    return _finalize_layers([vector_layer], storage, provenance)
+
+
+def build_oacs_feature_list_layers(
+        oacs_features: "typing.Sequence[models.OacsFeature] | columnar.ColumnarFeatureList",
+        name_prefix: str = "",
+        storage: LayerStorage | None = None,
+        provenance: LayerProvenance | None = None,
+        feedback: qgis.core.QgsFeedback | None = None,
+) -> list[qgis.core.QgsVectorLayer]:
+    """Build layers with the input OACS features, one per geometry type.
+
+    Layers are kept in memory unless a storage is given. This does not touch
+    the current QGIS project, so it is safe to call from a background thread.
+    Progress is reported to the input feedback and building stops early,
+    returning an empty list, if it is canceled.
+
+    Large inputs are turned into a columnar feature list first, when NumPy is
+    available, see `build_columnar_feature_list_layers`.
+    """
+    # imported here, as it loads NumPy, which plugin startup does not need
+    from . import columnar
+
+    if not isinstance(oacs_features, columnar.ColumnarFeatureList) and (
+            len(oacs_features) >= _COLUMNAR_MIN_FEATURES and columnar.is_available()
+    ):
+        oacs_features = columnar.ColumnarFeatureList.from_features(
+            type(oacs_features[0]), oacs_features)
+    if isinstance(oacs_features, columnar.ColumnarFeatureList):
+        return build_columnar_feature_list_layers(
+            oacs_features, name_prefix, storage, provenance, feedback)
+    # - some features may have geometry, others not
+    # - features that have geometry may have different geometry types
+    feats_to_render = {
+        qgis.core.Qgis.WkbType.Point: [],
+        qgis.core.Qgis.WkbType.MultiPoint: [],
+        qgis.core.Qgis.WkbType.LineString: [],
+        qgis.core.Qgis.WkbType.MultiLineString: [],
+        qgis.core.Qgis.WkbType.Polygon: [],
+        qgis.core.Qgis.WkbType.MultiPolygon: [],
+        None: [],
+    }
+    for oacs_feat in oacs_features:
+        container = feats_to_render[geom.wkbType() if (geom := oacs_feat.geometry) else None]
+        container.append(oacs_feat)
+    total = len(oacs_features)
+    num_processed = 0
+    qgis_layers = []
+    for wkb_type, grouped_oacs_features in feats_to_render.items():
+        if len(grouped_oacs_features) == 0:
+            continue
+        if wkb_type is None:
+            geom_type = "None"
+            crs = geometries.get_default_crs()
+            layer_name = "-".join((name_prefix, "no_geometry"))
+        else:
+            geom_type = qgis.core.QgsWkbTypes.displayString(wkb_type)
+            layer_name = "-".join((name_prefix, geom_type.lower()))
+            # assumes all feats have the same CRS
+            crs = qgis.core.QgsCoordinateReferenceSystem(grouped_oacs_features[0].geometry.crs())
+        vector_layer = qgis.core.QgsVectorLayer(
+            f"{geom_type}?crs={crs.authid()}", layer_name, "memory")
+        provider = vector_layer.dataProvider()
+        all_properties = [feat.get_renderable_properties() for feat in grouped_oacs_features]
+        _names = set()
+        for properties in all_properties:
+            _names.update(properties.keys())
+        provider.addAttributes(_build_fields(_names))
+        vector_layer.updateFields()
+        fields = vector_layer.fields()
+        qgis_features = []
+        for oacs_feat, properties in zip(grouped_oacs_features, all_properties):
+            if feedback is not None:
+                if feedback.isCanceled():
+                    return []
+                if num_processed % _PROGRESS_REPORT_INTERVAL == 0:
+                    feedback.setProgress(100 * num_processed / total)
+            qgis_features.append(to_qgis_feature(oacs_feat, fields, rendered_properties=properties))
+            num_processed += 1
+        provider.addFeatures(qgis_features)
+        vector_layer.updateExtents()
+        qgis_layers.append(vector_layer)
+    if feedback is not None:
+        feedback.setProgress(100)
+    return _finalize_layers(qgis_layers, storage, provenance)
+
+
+def build_columnar_feature_list_layers(
+        oacs_features: "columnar.ColumnarFeatureList",
+        name_prefix: str = "",
+        storage: LayerStorage | None = None,
+        provenance: LayerProvenance | None = None,
+        feedback: qgis.core.QgsFeedback | None = None,
+) -> list[qgis.core.QgsVectorLayer]:
+    """Build layers out of a columnar feature list, one per geometry type.
+
+    This gives the same layers as `build_oacs_feature_list_layers`, but
+    features are grouped by geometry type with array operations and point
+    geometries are made straight from the coordinate columns. Geometries of
+    the other types are built for a whole layer at once from the raw
+    responses, see `ColumnarFeatureList.build_geometries`. The renderable
+    properties of each feature are built once, for both the layer fields and
+    the feature attributes.
+    """
+    from . import columnar
+
+    groups = oacs_features.group_by_geometry_code()
+    # features whose geometry is not described by the columns are grouped
+    # by the type of their parsed geometry, as in the non-columnar case
+    other_groups: dict[qgis.core.Qgis.WkbType | None, list[int]] = {}
+    for index in groups.pop(columnar.OTHER_GEOMETRY, ()):
+        geom = oacs_features.row(index).geometry
+        other_groups.setdefault(geom.wkbType() if geom else None, []).append(index)
+    to_render = [
+        *(
+            (columnar.get_wkb_type(code), indexes.tolist())
+            for code, indexes in groups.items() if code != columnar.NO_GEOMETRY
+        ),
+        *other_groups.items(),
+    ]
+    if columnar.NO_GEOMETRY in groups:
+        to_render.append((None, groups[columnar.NO_GEOMETRY].tolist()))
+    total = len(oacs_features)
+    num_processed = 0
+    qgis_layers = []
+    for wkb_type, indexes in to_render:
+        if wkb_type is None:
+            geom_type = "None"
+            layer_name = "-".join((name_prefix, "no_geometry"))
+        else:
+            geom_type = qgis.core.QgsWkbTypes.displayString(wkb_type)
+            layer_name = "-".join((name_prefix, geom_type.lower()))
+        vector_layer = qgis.core.QgsVectorLayer(
+            f"{geom_type}?crs={geometries.get_default_crs().authid()}", layer_name, "memory")
+        provider = vector_layer.dataProvider()
+        rows = [oacs_features.row(index) for index in indexes]
+        # None for the rows that build their own geometry
+        layer_geometries = oacs_features.build_geometries(indexes)
+        all_properties = [row.get_renderable_properties() for row in rows]
+        _names = set()
+        for properties in all_properties:
+            _names.update(properties.keys())
+        provider.addAttributes(_build_fields(_names))
+        vector_layer.updateFields()
+        fields = vector_layer.fields()
+        qgis_features = []
+        for row, geometry, properties in zip(rows, layer_geometries, all_properties):
+            if feedback is not None:
+                if feedback.isCanceled():
+                    return []
+                if num_processed % _PROGRESS_REPORT_INTERVAL == 0:
+                    feedback.setProgress(100 * num_processed / total)
+            qgis_features.append(
+                to_qgis_feature(row, fields, geometry=geometry, rendered_properties=properties))
+            num_processed += 1
+        provider.addFeatures(qgis_features)
+        vector_layer.updateExtents()
+        qgis_layers.append(vector_layer)
+    if feedback is not None:
+        feedback.setProgress(100)
+    return _finalize_layers(qgis_layers, storage, provenance)
+
+
+def to_qgis_feature(
+        oacs_feat: models.OacsFeature,
+        fields: qgis.core.QgsFields,
+        geometry: qgis.core.QgsGeometry | None = None,
+        rendered_properties: dict[str, str] | None = None,
+) -> qgis.core.QgsFeature:
+    """Convert an OACS feature into a QGIS feature with the input fields.
+
+    Besides the feature's renderable properties, the QGIS feature also gets the
+    OACS identifier and a content hash, which are used when refreshing the
+    layer from the server. A geometry or renderable properties that were
+    already built for the feature can be passed in, so that they are not built
+    again.
+    """
+    qgis_feature = qgis.core.QgsFeature(fields)
+    if geometry is None:
+        geometry = oacs_feat.geometry
+    if geometry:
+        qgis_feature.setGeometry(geometry)
+    if rendered_properties is None:
+        rendered_properties = oacs_feat.get_renderable_properties()
+    attributes = []
+    for field in fields:
+        if (field_name := field.name()) == ID_FIELD_NAME:
+            attributes.append(oacs_feat.id_)
+        elif field_name == HASH_FIELD_NAME:
+            attributes.append(compute_content_hash(oacs_feat, rendered_properties, geometry))
+        else:
+            attributes.append(rendered_properties.get(field_name, ""))
+    qgis_feature.setAttributes(attributes)
+    return qgis_feature
+
+
+def compute_content_hash(
+        oacs_feat: models.OacsFeature,
+        rendered_properties: dict[str, str] | None = None,
+        geometry: qgis.core.QgsGeometry | None = None,
+) -> str:
+    hasher = hashlib.sha1(
+        json.dumps(
+            rendered_properties or oacs_feat.get_renderable_properties(),
+            sort_keys=True
+        ).encode("utf-8")
+    )
+    if geometry is None:
+        geometry = oacs_feat.geometry
+    if geometry:
+        hasher.update(geometry.asWkb().data())
+    return hasher.hexdigest()
+
+
+def _build_fields(property_names: typing.Iterable[str]) -> list[qgis.core.QgsField]:
+    return [
+        qgis.core.QgsField(ID_FIELD_NAME, QtCore.QVariant.Type.String),
+        qgis.core.QgsField(HASH_FIELD_NAME, QtCore.QVariant.Type.String),
+        *(
+            qgis.core.QgsField(name, QtCore.QVariant.Type.String)
+            for name in property_names
+        ),
+    ]
+
+
+def write_layer_to_storage(
+        layer: qgis.core.QgsVectorLayer,
+        storage: LayerStorage,
+) -> qgis.core.QgsVectorLayer:
+    """Write a layer to a GeoPackage or FlatGeobuf file and return the file-backed layer.
+
+    Existing layers are never overwritten, the layer gets a numeric suffix
+    if its name is already taken in the storage.
+    """
+    layer_name = storage.get_unused_layer_name(layer.name())
+    target_path = storage.get_target_path(layer_name)
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    options = qgis.core.QgsVectorFileWriter.SaveVectorOptions()
+    options.layerName = layer_name
+    options.layerOptions = ["SPATIAL_INDEX=YES"]
+    if storage.storage_format == LayerStorageFormat.GEOPACKAGE:
+        options.driverName = "GPKG"
+        options.actionOnExistingFile = (
+            qgis.core.QgsVectorFileWriter.ActionOnExistingFile.CreateOrOverwriteLayer
+            if target_path.exists()
+            else qgis.core.QgsVectorFileWriter.ActionOnExistingFile.CreateOrOverwriteFile
+        )
+        uri = f"{target_path}|layername={layer_name}"
+    else:
+        options.driverName = "FlatGeobuf"
+        options.actionOnExistingFile = (
+            qgis.core.QgsVectorFileWriter.ActionOnExistingFile.CreateOrOverwriteFile)
+        uri = str(target_path)
+    error, error_message, *_ = qgis.core.QgsVectorFileWriter.writeAsVectorFormatV3(
+        layer,
+        str(target_path),
+        # the project's transform context must not be accessed from a
+        # background thread - we don't reproject anyway
+        qgis.core.QgsCoordinateTransformContext(),
+        options
+    )
+    if error != qgis.core.QgsVectorFileWriter.WriterError.NoError:
+        raise RuntimeError(
+            f"Could not write layer {layer_name!r} to {str(target_path)!r}: {error_message}")
+    return qgis.core.QgsVectorLayer(uri, layer_name, "ogr")
+
+
+def _finalize_layers(
+        layers: list[qgis.core.QgsVectorLayer],
+        storage: LayerStorage | None,
+        provenance: LayerProvenance | None,
+) -> list[qgis.core.QgsVectorLayer]:
+    result = []
+    for layer in layers:
+        if storage is not None:
+            if (
+                    storage.storage_format == LayerStorageFormat.FLATGEOBUF
+                    and not layer.isSpatial()
+            ):
+                log_message(
+                    f"FlatGeobuf does not support layers without geometry, "
+                    f"keeping {layer.name()!r} as a memory layer",
+                    level=qgis.core.Qgis.MessageLevel.Warning
+                )
+            else:
+                layer = write_layer_to_storage(layer, storage)
+        if provenance is not None:
+            provenance.apply_to(layer)
+            if storage is not None and storage.storage_format == LayerStorageFormat.GEOPACKAGE:
+                error_message, saved = layer.saveDefaultMetadata()
+                if not saved:
+                    log_message(f"Could not save metadata of {layer.name()!r}: {error_message}")
+        result.append(layer)
+    return result
+
+
+def _sanitize_file_name(name: str) -> str:
+    return re.sub(r"[^\w\-.]+", "_", name).strip("_") or "oacs"
+
+
+@dataclasses.dataclass(frozen=True)
+class LayerDiff:
+    """What has to change in a layer, with the QGIS features already built.
+
+    The features have the layer's fields followed by `new_fields`, which
+    `apply_layer_diff` adds to the layer first.
+    """
+
+    new_fields: list[qgis.core.QgsField]
+    to_add: list[qgis.core.QgsFeature]
+    to_change: dict[int, qgis.core.QgsFeature]
+    to_delete: list[int]
+
+    def is_empty(self) -> bool:
+        return not any((self.to_add, self.to_change, self.to_delete))
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.to_add)} added, {len(self.to_change)} changed, "
+            f"{len(self.to_delete)} deleted"
+        )
+
+
+def compute_layer_diff(
+        feature_source: qgis.core.QgsAbstractFeatureSource,
+        layer_wkb_type: qgis.core.Qgis.WkbType,
+        layer_fields: qgis.core.QgsFields,
+        remote_features: typing.Iterable[models.OacsFeature],
+        feedback: qgis.core.QgsFeedback | None = None,
+) -> LayerDiff | None:
+    """Compare a layer's features with freshly retrieved OACS features.
+
+    The layer is read through a feature source, e.g. a
+    `QgsVectorLayerFeatureSource` made on the main thread, so that this can
+    run in a background thread. Returns None if it is canceled.
+
+    Features are matched by their OACS identifier and considered changed when
+    their content hash differs. Layers are split by geometry type when loaded,
+    so remote features whose geometry does not fit the layer are left out and
+    any local copy of them is deleted.
+    """
+    layer_geom_type = qgis.core.QgsWkbTypes.flatType(layer_wkb_type)
+    # geometry and renderable properties of the relevant remote features,
+    # which are built once for hashing and for the QGIS features
+    relevant = {}
+    for oacs_feat in remote_features:
+        geometry = oacs_feat.geometry
+        feat_geom_type = (
+            qgis.core.QgsWkbTypes.flatType(geometry.wkbType())
+            if geometry else qgis.core.Qgis.WkbType.NoGeometry
+        )
+        if feat_geom_type == layer_geom_type:
+            relevant[oacs_feat.id_] = (oacs_feat, geometry, oacs_feat.get_renderable_properties())
+    request = qgis.core.QgsFeatureRequest()
+    request.setFlags(qgis.core.QgsFeatureRequest.Flag.NoGeometry)
+    request.setSubsetOfAttributes([ID_FIELD_NAME, HASH_FIELD_NAME], layer_fields)
+    changed = {}
+    to_delete = []
+    seen_ids = set()
+    for qgis_feature in feature_source.getFeatures(request):
+        if feedback is not None and feedback.isCanceled():
+            return None
+        oacs_id = qgis_feature[ID_FIELD_NAME]
+        if (remote := relevant.get(oacs_id)) is None:
+            to_delete.append(qgis_feature.id())
+        else:
+            seen_ids.add(oacs_id)
+            oacs_feat, geometry, properties = remote
+            remote_hash = compute_content_hash(oacs_feat, properties, geometry)
+            if qgis_feature[HASH_FIELD_NAME] != remote_hash:
+                changed[qgis_feature.id()] = remote
+    added = [remote for id_, remote in relevant.items() if id_ not in seen_ids]
+    new_property_names = set()
+    for _, _, properties in (*added, *changed.values()):
+        new_property_names.update(properties.keys())
+    new_fields = [
+        qgis.core.QgsField(name, QtCore.QVariant.Type.String)
+        for name in sorted(new_property_names - set(layer_fields.names()))
+    ]
+    fields = qgis.core.QgsFields(layer_fields)
+    for field in new_fields:
+        fields.append(field)
+    return LayerDiff(
+        new_fields=new_fields,
+        to_add=[
+            to_qgis_feature(oacs_feat, fields, geometry, properties)
+            for oacs_feat, geometry, properties in added
+        ],
+        to_change={
+            feature_id: to_qgis_feature(oacs_feat, fields, geometry, properties)
+            for feature_id, (oacs_feat, geometry, properties) in changed.items()
+        },
+        to_delete=to_delete,
+    )
+
+
+def apply_layer_diff(layer: qgis.core.QgsVectorLayer, diff: LayerDiff) -> None:
+    """Apply the diff to the layer in a single edit buffer commit."""
+    if not layer.startEditing():
+        raise RuntimeError(f"Layer {layer.name()!r} cannot be edited")
+    for field in diff.new_fields:
+        layer.addAttribute(field)
+    num_fields = layer.fields().count()
+    layer.deleteFeatures(diff.to_delete)
+    for feature_id, updated in diff.to_change.items():
+        layer.changeGeometry(feature_id, updated.geometry())
+        layer.changeAttributeValues(
+            feature_id,
+            {idx: updated.attribute(idx) for idx in range(num_fields)}
+        )
+    layer.addFeatures(diff.to_add)
+    if not layer.commitChanges():
+        errors = "; ".join(layer.commitErrors())
+        layer.rollBack()
+        raise RuntimeError(f"Could not commit changes to {layer.name()!r}: {errors}")
+    layer.updateExtents()
+
+
+def _compute_flatgeobuf_layer_diff(
+        feature_source: qgis.core.QgsAbstractFeatureSource,
+        layer_wkb_type: qgis.core.Qgis.WkbType,
+        layer_fields: qgis.core.QgsFields,
+        crs: qgis.core.QgsCoordinateReferenceSystem,
+        remote_features: typing.Iterable[models.OacsFeature],
+        rewritten_path: Path,
+        feedback: qgis.core.QgsFeedback | None = None,
+) -> LayerDiff | None:
+    diff = compute_layer_diff(
+        feature_source, layer_wkb_type, layer_fields, remote_features, feedback=feedback)
+    if diff is not None and not diff.is_empty():
+        rewrite_flatgeobuf_layer(
+            feature_source, layer_wkb_type, layer_fields, crs, diff, rewritten_path)
+    return diff
+
+
+def rewrite_flatgeobuf_layer(
+        feature_source: qgis.core.QgsAbstractFeatureSource,
+        layer_wkb_type: qgis.core.Qgis.WkbType,
+        layer_fields: qgis.core.QgsFields,
+        crs: qgis.core.QgsCoordinateReferenceSystem,
+        diff: LayerDiff,
+        target_path: Path,
+) -> None:
+    """Write the features of a layer, with the diff applied, to a new FlatGeobuf file.
+
+    FlatGeobuf files cannot be edited in place, so they are refreshed by
+    writing the whole layer again, see `replace_flatgeobuf_file`. Like
+    `compute_layer_diff`, this reads the layer through a feature source.
+    """
+    fields = qgis.core.QgsFields(layer_fields)
+    for field in diff.new_fields:
+        fields.append(field)
+    num_new_fields = len(diff.new_fields)
+    options = qgis.core.QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = "FlatGeobuf"
+    options.layerOptions = ["SPATIAL_INDEX=YES"]
+    writer = qgis.core.QgsVectorFileWriter.create(
+        str(target_path),
+        fields,
+        layer_wkb_type,
+        crs,
+        qgis.core.QgsCoordinateTransformContext(),
+        options
+    )
+    try:
+        if writer.hasError() != qgis.core.QgsVectorFileWriter.WriterError.NoError:
+            raise RuntimeError(f"Could not write {str(target_path)!r}: {writer.errorMessage()}")
+        to_delete = set(diff.to_delete)
+        features = []
+        for qgis_feature in feature_source.getFeatures():
+            if (feature_id := qgis_feature.id()) in to_delete:
+                continue
+            if (updated := diff.to_change.get(feature_id)) is not None:
+                features.append(updated)
+            else:
+                kept = qgis.core.QgsFeature(fields)
+                kept.setGeometry(qgis_feature.geometry())
+                kept.setAttributes([*qgis_feature.attributes(), *([None] * num_new_fields)])
+                features.append(kept)
+        features.extend(diff.to_add)
+        if not writer.addFeatures(features):
+            raise RuntimeError(f"Could not write {str(target_path)!r}: {writer.errorMessage()}")
+    finally:
+        # the file is only complete once the writer is deleted
+        del writer
+
+
+def replace_flatgeobuf_file(layer: qgis.core.QgsVectorLayer, rewritten_path: Path) -> None:
+    """Replace the file of a FlatGeobuf layer with a rewritten one and reload the layer."""
+    layer_path = Path(
+        qgis.core.QgsProviderRegistry.instance().decodeUri("ogr", layer.source())["path"])
+    try:
+        rewritten_path.replace(layer_path)
+    except OSError as err:
+        rewritten_path.unlink(missing_ok=True)
+        raise RuntimeError(f"Could not replace {str(layer_path)!r}: {err}") from err
+    layer.dataProvider().reloadData()
+    layer.updateFields()
+    layer.updateExtents()
+    layer.triggerRepaint()
+
+
+def _is_flatgeobuf_layer(layer: qgis.core.QgsVectorLayer) -> bool:
+    return (
+        (provider := layer.dataProvider()) is not None
+        and provider.name() == "ogr"
+        and provider.storageType() == "FlatGeobuf"
+    )
+
+
+# what `apply_layer_diff` does to a layer
+_REFRESH_CAPABILITIES = (
+    qgis.core.QgsVectorDataProvider.Capability.AddFeatures,
+    qgis.core.QgsVectorDataProvider.Capability.DeleteFeatures,
+    qgis.core.QgsVectorDataProvider.Capability.ChangeAttributeValues,
+    qgis.core.QgsVectorDataProvider.Capability.ChangeGeometries,
+    qgis.core.QgsVectorDataProvider.Capability.AddAttributes,
+)
+
+
+class OacsLayerRefresher(QtCore.QObject):
+    """Refresh layers loaded by this plugin with the latest server contents.
+
+    The request that originally produced a layer is repeated and only the
+    differences are applied to the layer. The differences are computed in a
+    background task, only committing them to the layer is done on the main
+    thread.
+    """
+
+    refresh_finished = QtCore.pyqtSignal(str, str)  # layer id, summary
+    refresh_failed = QtCore.pyqtSignal(str, str)  # layer id, error message
+
+    _pending: dict[uuid.UUID, tuple[str, LayerProvenance]]
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._pending = {}
+        oacs_client.response_fetched.connect(self.handle_response)
+        oacs_client.request_failed.connect(self.handle_request_failed)
+
+    @staticmethod
+    def can_refresh(layer: qgis.core.QgsMapLayer) -> bool:
+        """Whether the layer was loaded by this plugin and can be updated.
+
+        Layers are edited in place, except FlatGeobuf ones which cannot be
+        edited, whatever the provider reports, and are rewritten instead.
+        """
+        if not (
+                isinstance(layer, qgis.core.QgsVectorLayer)
+                and LayerProvenance.from_layer(layer) is not None
+                and ID_FIELD_NAME in layer.fields().names()
+                and (provider := layer.dataProvider()) is not None
+        ):
+            return False
+        if _is_flatgeobuf_layer(layer):
+            return True
+        capabilities = provider.capabilities()
+        return all(capabilities & capability for capability in _REFRESH_CAPABILITIES)
+
+    def refresh_layer(self, layer: qgis.core.QgsVectorLayer) -> OacsRequestMetadata:
+        if not self.can_refresh(layer):
+            raise ValueError(f"Layer {layer.name()!r} was not loaded from an OACS server")
+        provenance = LayerProvenance.from_layer(layer)
+        connection = settings_manager.get_data_source_connection(
+            uuid.UUID(provenance.connection_id))
+        request_metadata = oacs_client.initiate_search(
+            RequestType(provenance.request_type),
+            models.ClientSearchParams(
+                provenance.source_url,
+                query=provenance.query,
+                headers={"Accept": "application/geo+json"},
+            ),
+            connection
+        )
+        self._pending[request_metadata.request_id] = (layer.id(), provenance)
+        return request_metadata
+
+    def handle_response(
+            self,
+            parsed_payload: models.OacsFeatureList | models.OacsFeature,
+            request_metadata: OacsRequestMetadata
+    ) -> None:
+        if (pending := self._pending.pop(request_metadata.request_id, None)) is None:
+            return None
+        layer_id, provenance = pending
+        if (layer := qgis.core.QgsProject.instance().mapLayer(layer_id)) is None:
+            return None
+        remote_features = (
+            parsed_payload.items
+            if isinstance(parsed_payload, models.OacsFeatureList)
+            else [parsed_payload]
+        )
+        layer_state = (
+            qgis.core.QgsVectorLayerFeatureSource(layer), layer.wkbType(), layer.fields())
+        rewritten_path = None
+        if _is_flatgeobuf_layer(layer):
+            layer_path = Path(
+                qgis.core.QgsProviderRegistry.instance().decodeUri("ogr", layer.source())["path"])
+            rewritten_path = layer_path.with_name(f"{layer_path.stem}.refreshed.fgb")
+            compute_diff = functools.partial(
+                _compute_flatgeobuf_layer_diff,
+                *layer_state, layer.crs(), remote_features, rewritten_path
+            )
+        else:
+            compute_diff = functools.partial(compute_layer_diff, *layer_state, remote_features)
+        tasks.schedule_layer_diff(
+            compute_diff,
+            functools.partial(
+                self.apply_diff,
+                layer_id,
+                provenance,
+                request_metadata,
+                layer.fields().names(),
+                rewritten_path,
+            ),
+            functools.partial(self.refresh_failed.emit, layer_id),
+            description=f"Refresh OACS layer {layer.name()!r}"
+        )
+
+    def apply_diff(
+            self,
+            layer_id: str,
+            provenance: LayerProvenance,
+            request_metadata: OacsRequestMetadata,
+            field_names: list[str],
+            rewritten_path: Path | None,
+            diff: LayerDiff,
+    ) -> None:
+        """Apply a diff computed by `tasks.LayerDiffTask` to the layer.
+
+        The diff is committed to the layer's edit buffer, or, for FlatGeobuf
+        layers, the file that was rewritten with the diff replaces the
+        layer's.
+        """
+        if (layer := qgis.core.QgsProject.instance().mapLayer(layer_id)) is None:
+            if rewritten_path is not None:
+                rewritten_path.unlink(missing_ok=True)
+            return None
+        try:
+            if layer.fields().names() != field_names:
+                # features of the diff were built with the fields the layer had
+                if rewritten_path is not None:
+                    rewritten_path.unlink(missing_ok=True)
+                raise RuntimeError("the layer's fields changed during the refresh")
+            if diff.is_empty():
+                pass
+            elif rewritten_path is not None:
+                replace_flatgeobuf_file(layer, rewritten_path)
+            else:
+                apply_layer_diff(layer, diff)
+        except RuntimeError as err:
+            self.refresh_failed.emit(layer_id, str(err))
+            return None
+        updated_provenance = dataclasses.replace(
+            provenance, fetched_at=request_metadata.requested_at)
+        updated_provenance.apply_to(layer)
+        if layer.dataProvider().name() == "ogr":
+            layer.saveDefaultMetadata()
+        self.refresh_finished.emit(layer_id, diff.summary())
+
+    def handle_request_failed(
+            self,
+            request_metadata: OacsRequestMetadata,
+            error_message: str
+    ) -> None:
+        if (pending := self._pending.pop(request_metadata.request_id, None)) is not None:
+            self.refresh_failed.emit(pending[0], error_message)
+
+
+layer_refresher = OacsLayerRefresher()
@@ -1,21 +1,145 @@
+import typing
+
+import qgis.core
 from qgis.gui import (
     QgsGui,
     QgisInterface,
 )
+from qgis.PyQt import (
+    QtGui,
+    QtWidgets,
+)
 
+from . import utils
+from .constants import (
+    IconPath,
+    LAYER_CUSTOM_PROPERTY_PREFIX,
+)
 from .gui.data_source_select_provider import OacsSourceSelectProvider
+from .settings import settings_manager
+
+if typing.TYPE_CHECKING:
+    from .layers import OacsLayerRefresher
+
+_MENU_NAME = "&OACS"
 
 
 class QgisOacs:
+    iface: QgisInterface
     source_select_provider: OacsSourceSelectProvider
+    refresh_layer_action: QtWidgets.QAction | None
+    layer_refresher: typing.Optional["OacsLayerRefresher"]
+    debug_logging_action: QtWidgets.QAction | None
+    copy_log_action: QtWidgets.QAction | None
 
     def __init__(self, iface: QgisInterface) -> None:
+        self.iface = iface
         self.source_select_provider = OacsSourceSelectProvider()
+        self.refresh_layer_action = None
+        self.layer_refresher = None
+        self.debug_logging_action = None
+        self.copy_log_action = None
+        utils.set_debug_logging_enabled(settings_manager.is_debug_logging_enabled())
 
     def initGui(self) -> None:
+        utils.warm_up_pixmap_cache(IconPath.all())
         QgsGui.sourceSelectProviderRegistry().addProvider(self.source_select_provider)
+        self.refresh_layer_action = QtWidgets.QAction(
+            "Refresh from OACS server", self.iface.mainWindow())
+        self.refresh_layer_action.setToolTip(
+            "Query the server again and apply only the differences to this layer")
+        self.refresh_layer_action.triggered.connect(self.refresh_active_layer)
+        self.iface.addCustomActionForLayerType(
+            self.refresh_layer_action,
+            "",
+            qgis.core.Qgis.LayerType.Vector,
+            allLayers=False
+        )
+        project = qgis.core.QgsProject.instance()
+        self.register_refreshable_layers(list(project.mapLayers().values()))
+        project.layersAdded.connect(self.register_refreshable_layers)
+        self.debug_logging_action = QtWidgets.QAction(
+            "Debug logging", self.iface.mainWindow())
+        self.debug_logging_action.setToolTip(
+            "Log the details of each parsed item and request - this slows down large searches")
+        self.debug_logging_action.setCheckable(True)
+        self.debug_logging_action.setChecked(utils.is_debug_logging_enabled())
+        self.debug_logging_action.toggled.connect(self.toggle_debug_logging)
+        self.iface.addPluginToMenu(_MENU_NAME, self.debug_logging_action)
+        self.copy_log_action = QtWidgets.QAction(
+            "Copy recent log messages", self.iface.mainWindow())
+        self.copy_log_action.setToolTip(
+            "Copy the plugin's most recent log messages to the clipboard, e.g. for a bug report")
+        self.copy_log_action.triggered.connect(self.copy_recent_log_messages)
+        self.iface.addPluginToMenu(_MENU_NAME, self.copy_log_action)
 
     def unload(self):
         QgsGui.sourceSelectProviderRegistry().removeProvider(
             self.source_select_provider
         )
+        if self.refresh_layer_action is not None:
+            qgis.core.QgsProject.instance().layersAdded.disconnect(
+                self.register_refreshable_layers)
+            self.iface.removeCustomActionForLayerType(self.refresh_layer_action)
+            self.refresh_layer_action = None
+        for action in (self.debug_logging_action, self.copy_log_action):
+            if action is not None:
+                self.iface.removePluginMenu(_MENU_NAME, action)
+        self.debug_logging_action = None
+        self.copy_log_action = None
+        if self.layer_refresher is not None:
+            self.layer_refresher.refresh_finished.disconnect(self.handle_layer_refresh_finished)
+            self.layer_refresher.refresh_failed.disconnect(self.handle_layer_refresh_failed)
+            self.layer_refresher = None
+        utils.clear_pixmap_cache()
+
+    def register_refreshable_layers(self, layers: list[qgis.core.QgsMapLayer]) -> None:
+        # only look for the provenance recorded on the layer, which does not need
+        # importing the layers module at startup - `refresh_active_layer` checks
+        # whether the layer can really be refreshed
+        for layer in layers:
+            if layer.customProperty(f"{LAYER_CUSTOM_PROPERTY_PREFIX}/connection_id"):
+                self.iface.addCustomActionForLayer(self.refresh_layer_action, layer)
+
+    def refresh_active_layer(self) -> None:
+        if (layer := self.iface.activeLayer()) is None:
+            return None
+        if self.layer_refresher is None:
+            from .layers import layer_refresher
+            layer_refresher.refresh_finished.connect(self.handle_layer_refresh_finished)
+            layer_refresher.refresh_failed.connect(self.handle_layer_refresh_failed)
+            self.layer_refresher = layer_refresher
+        if not self.layer_refresher.can_refresh(layer):
+            self.iface.messageBar().pushMessage(
+                "OACS", f"{layer.name()!r} cannot be refreshed from its OACS server",
+                level=qgis.core.Qgis.MessageLevel.Warning
+            )
+            return None
+        self.layer_refresher.refresh_layer(layer)
+
+    def toggle_debug_logging(self, enabled: bool) -> None:
+        settings_manager.set_debug_logging_enabled(enabled)
+        utils.set_debug_logging_enabled(enabled)
+
+    def copy_recent_log_messages(self) -> None:
+        records = utils.get_recent_log_records()
+        QtGui.QGuiApplication.clipboard().setText(
+            "\n".join(record.format() for record in records))
+        self.iface.messageBar().pushMessage(
+            "OACS", f"Copied {len(records)} log messages to the clipboard",
+            level=qgis.core.Qgis.MessageLevel.Info
+        )
+
+    def handle_layer_refresh_finished(self, layer_id: str, summary: str) -> None:
+        layer = qgis.core.QgsProject.instance().mapLayer(layer_id)
+        self.iface.messageBar().pushMessage(
+            "OACS", f"Refreshed {layer.name() if layer else layer_id!r}: {summary}",
+            level=qgis.core.Qgis.MessageLevel.Success
+        )
+
+    def handle_layer_refresh_failed(self, layer_id: str, error_message: str) -> None:
+        layer = qgis.core.QgsProject.instance().mapLayer(layer_id)
+        self.iface.messageBar().pushMessage(
+            "OACS", f"Could not refresh {layer.name() if layer else layer_id!r}: {error_message}",
+            level=qgis.core.Qgis.MessageLevel.Warning
+        )
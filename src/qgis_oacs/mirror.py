@@ -0,0 +1,235 @@
+"""Local SQLite mirror of the catalog of a connection.
+
+The mirror stores the raw JSON of each system, deployment, procedure,
+sampling feature and datastream, so that the catalog can be browsed when the
+server is slow or unreachable. It is filled by `tasks.CatalogSyncTask`.
+
+OGC API - Connected Systems has no standard way of asking for the items that
+changed since a given time (`datetime` filters on their valid time), so each
+sync downloads the whole catalog. Only the items that were added, changed or
+deleted are written to the mirror and passed on to the catalog index.
+"""
+
+import contextlib
+import dataclasses
+import datetime as dt
+import json
+import sqlite3
+import typing
+import uuid
+from pathlib import Path
+
+import qgis.core
+from qgis.PyQt import (
+    QtCore,
+    QtNetwork,
+)
+
+from . import models
+from .client import build_request_url
+from .settings import DataSourceConnectionSettings
+from .utils import (
+    log_message,
+    parse_json,
+)
+
+_PAGE_SIZE = 500
+# sqlite builds older than 3.32 accept at most 999 parameters per query
+_MAX_QUERY_PARAMETERS = 900
+
+
+@dataclasses.dataclass(frozen=True)
+class MirroredResource:
+    name: str
+    path: str
+    list_type: typing.Type[models.OacsFeatureList | models.OacsItemList]
+    # name of the member of the response that holds the list of items
+    response_items_key: str
+    media_type: str
+    f_parameter_value: str
+
+
+@dataclasses.dataclass(frozen=True)
+class MirrorChanges:
+    """What a sync changed in the mirror of a resource."""
+
+    # raw items that were added or whose content changed
+    changed_items: list[dict]
+    deleted_ids: list[str]
+
+
+MIRRORED_RESOURCES: tuple[MirroredResource, ...] = (
+    MirroredResource(
+        "systems", "/systems", models.SystemList, "features", "application/geo+json", "geojson"),
+    MirroredResource(
+        "deployments", "/deployments", models.DeploymentList, "features",
+        "application/geo+json", "geojson"),
+    MirroredResource(
+        "procedures", "/procedures", models.ProcedureList, "features",
+        "application/geo+json", "geojson"),
+    MirroredResource(
+        "samplingFeatures", "/samplingFeatures", models.SamplingFeatureList, "features",
+        "application/geo+json", "geojson"),
+    MirroredResource(
+        "datastreams", "/datastreams", models.DataStreamList, "items", "application/json", "json"),
+)
+
+
+def get_mirror_path(connection_id: uuid.UUID) -> Path:
+    return (
+        Path(qgis.core.QgsApplication.qgisSettingsDirPath())
+        / "qgis_oacs"
+        / "mirrors"
+        / f"{connection_id}.sqlite"
+    )
+
+
+def delete_mirror(connection_id: uuid.UUID) -> None:
+    get_mirror_path(connection_id).unlink(missing_ok=True)
+
+
+class CatalogMirror:
+    """Access to the mirror database of a connection.
+
+    sqlite connections must not be shared between threads, so each thread
+    that needs the mirror creates its own instance.
+    """
+
+    path: Path
+
+    def __init__(self, connection_id: uuid.UUID):
+        self.path = get_mirror_path(connection_id)
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path)
+        try:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "resource TEXT NOT NULL, "
+                "id TEXT NOT NULL, "
+                "payload TEXT NOT NULL, "
+                "synced_at TEXT NOT NULL, "
+                "PRIMARY KEY (resource, id))"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                "resource TEXT PRIMARY KEY, "
+                "synced_at TEXT NOT NULL)"
+            )
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def exists(self) -> bool:
+        return self.path.is_file()
+
+    def store(
+            self,
+            resource: MirroredResource,
+            raw_items: typing.Sequence[dict],
+            synced_at: dt.datetime,
+    ) -> MirrorChanges:
+        """Make the mirrored items of the resource match `raw_items`.
+
+        Items are compared with their stored JSON, only those that differ are
+        written and mirrored items that are not in `raw_items` are deleted.
+        """
+        serialized_sync_time = synced_at.isoformat()
+        with self._connect() as db:
+            stored_payloads = dict(
+                db.execute("SELECT id, payload FROM items WHERE resource = ?", (resource.name,)))
+            changed = []
+            for raw in raw_items:
+                if "id" not in raw:
+                    continue
+                id_ = str(raw["id"])
+                payload = json.dumps(raw)
+                if stored_payloads.pop(id_, None) != payload:
+                    changed.append((raw, id_, payload))
+            deleted_ids = list(stored_payloads)
+            db.executemany(
+                "DELETE FROM items WHERE resource = ? AND id = ?",
+                ((resource.name, id_) for id_ in deleted_ids)
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO items (resource, id, payload, synced_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (resource.name, id_, payload, serialized_sync_time)
+                    for _, id_, payload in changed
+                )
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO sync_state (resource, synced_at) VALUES (?, ?)",
+                (resource.name, serialized_sync_time)
+            )
+        return MirrorChanges(changed_items=[raw for raw, _, _ in changed], deleted_ids=deleted_ids)
+
+    def load_items(self, resource: MirroredResource) -> list[models.OacsItem]:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT payload FROM items WHERE resource = ?", (resource.name,)
+            ).fetchall()
+        result = resource.list_type.from_api_response(
+            {resource.response_items_key: [parse_json(row[0]) for row in rows]})
+        return result.items
+
+    def load_items_by_ids(
+            self,
+            resource: MirroredResource,
+            ids: typing.Sequence[str],
+    ) -> list[models.OacsItem]:
+        """Load the mirrored items of the resource with these ids, in no particular order."""
+        rows = []
+        with self._connect() as db:
+            for start in range(0, len(ids), _MAX_QUERY_PARAMETERS):
+                chunk = ids[start:start + _MAX_QUERY_PARAMETERS]
+                rows.extend(
+                    db.execute(
+                        f"SELECT payload FROM items WHERE resource = ? "
+                        f"AND id IN ({', '.join('?' * len(chunk))})",
+                        (resource.name, *chunk)
+                    )
+                )
+        result = resource.list_type.from_api_response(
+            {resource.response_items_key: [parse_json(row[0]) for row in rows]})
+        return result.items
+
+
+def fetch_raw_items(
+        resource: MirroredResource,
+        connection: DataSourceConnectionSettings,
+        feedback: qgis.core.QgsFeedback | None = None,
+) -> list[dict]:
+    """Fetch all items of a resource from the server, following `next` links.
+
+    This is a blocking function, meant to be run in a background task.
+    """
+    query = {"limit": str(_PAGE_SIZE)}
+    if connection.use_f_query_param:
+        query["f"] = resource.f_parameter_value
+    next_url = build_request_url(
+        models.ClientSearchParams(resource.path, query=query), connection)
+    raw_items = []
+    while next_url is not None and not (feedback and feedback.isCanceled()):
+        request = qgis.core.QgsBlockingNetworkRequest()
+        if connection.auth_config:
+            request.setAuthCfg(connection.auth_config)
+        network_request = QtNetwork.QNetworkRequest(next_url)
+        network_request.setRawHeader(b"Accept", resource.media_type.encode())
+        error = request.get(network_request, feedback=feedback)
+        if error != qgis.core.QgsBlockingNetworkRequest.ErrorCode.NoError:
+            raise RuntimeError(f"Could not fetch {next_url.toString()}: {request.errorMessage()}")
+        payload = parse_json(request.reply().content())
+        raw_items.extend(payload.get(resource.response_items_key, []))
+        current_url, next_url = next_url, None
+        for raw_link in payload.get("links", []):
+            if raw_link.get("rel") == "next" and raw_link.get("href"):
+                # `next` links may be relative to the current page
+                next_url = current_url.resolved(QtCore.QUrl(raw_link["href"]))
+                break
+    log_message(f"Fetched {len(raw_items)} {resource.name} for the local mirror")
+    return raw_items
@@ -2,18 +2,22 @@ import abc
 import datetime as dt
 import dataclasses
 import enum
-import json
+import functools
+import operator
+import sys
 import typing
 from urllib.parse import urlparse
 
 import qgis.core
 
+from . import geometries
 from .constants import (
     IconPath,
     LinkRelation,
     OgcLinkRelation,
 )
 from .utils import (
+    log_debug,
     log_message,
     parse_raw_rfc3339_datetime,
 )
@@ -28,18 +32,10 @@ class SystemType(enum.Enum):
 
     @classmethod
     def from_api_response(cls, value: str) -> "SystemType":
-        return {
-            "http://www.w3.org/ns/sosa/Sensor": SystemType.SENSOR,
-            "http://www.w3.org/ns/sosa/Actuator": SystemType.ACTUATOR,
-            "http://www.w3.org/ns/sosa/Platform": SystemType.PLATFORM,
-            "http://www.w3.org/ns/sosa/Sampler": SystemType.SAMPLER,
-            "http://www.w3.org/ns/sosa/System": SystemType.SYSTEM,
-            "sosa:Sensor": SystemType.SENSOR,
-            "sosa:Actuator": SystemType.ACTUATOR,
-            "sosa:Platform": SystemType.PLATFORM,
-            "sosa:Sampler": SystemType.SAMPLER,
-            "sosa:System": SystemType.SYSTEM,
-        }[value]
+        try:
+            return _SYSTEM_TYPES_BY_API_VALUE[value]
+        except KeyError:
+            raise ValueError(f"Unknown system type: {value!r}") from None
 
     def get_icon_path(self) -> str:
         return {
@@ -51,6 +47,21 @@ class SystemType(enum.Enum):
         }.get(self, IconPath.system_type_system)
 
 
+# lookup table for `SystemType.from_api_response`, built once
+_SYSTEM_TYPES_BY_API_VALUE: dict[str, SystemType] = {
+    "http://www.w3.org/ns/sosa/Sensor": SystemType.SENSOR,
+    "http://www.w3.org/ns/sosa/Actuator": SystemType.ACTUATOR,
+    "http://www.w3.org/ns/sosa/Platform": SystemType.PLATFORM,
+    "http://www.w3.org/ns/sosa/Sampler": SystemType.SAMPLER,
+    "http://www.w3.org/ns/sosa/System": SystemType.SYSTEM,
+    "sosa:Sensor": SystemType.SENSOR,
+    "sosa:Actuator": SystemType.ACTUATOR,
+    "sosa:Platform": SystemType.PLATFORM,
+    "sosa:Sampler": SystemType.SAMPLER,
+    "sosa:System": SystemType.SYSTEM,
+}
+
+
 class AssetType(enum.Enum):
     EQUIPMENT = "equipment"
     HUMAN = "human"
@@ -62,15 +73,10 @@ class AssetType(enum.Enum):
 
     @classmethod
     def from_api_response(cls, value: str) -> "AssetType":
-        return {
-            "Equipment": AssetType.EQUIPMENT,
-            "Human": AssetType.HUMAN,
-            "LivingThing": AssetType.LIVING_THING,
-            "Simulation": AssetType.SIMULATION,
-            "Process": AssetType.PROCESS,
-            "Group": AssetType.GROUP,
-            "Other": AssetType.OTHER,
-        }[value]
+        try:
+            return _ASSET_TYPES_BY_API_VALUE[value]
+        except KeyError:
+            raise ValueError(f"Unknown asset type: {value!r}") from None
 
     def get_icon_path(self) -> str:
         return {
@@ -84,6 +90,18 @@ class AssetType(enum.Enum):
         }.get(self, IconPath.system_asset_type_other)
 
 
+# lookup table for `AssetType.from_api_response`, built once
+_ASSET_TYPES_BY_API_VALUE: dict[str, AssetType] = {
+    "Equipment": AssetType.EQUIPMENT,
+    "Human": AssetType.HUMAN,
+    "LivingThing": AssetType.LIVING_THING,
+    "Simulation": AssetType.SIMULATION,
+    "Process": AssetType.PROCESS,
+    "Group": AssetType.GROUP,
+    "Other": AssetType.OTHER,
+}
+
+
 class ProcedureType(enum.Enum):
     PROCEDURE = "procedure"
     OBSERVING_PROCEDURE = "observing_procedure"
@@ -97,26 +115,10 @@ class ProcedureType(enum.Enum):
 
     @classmethod
     def from_api_response(cls, value: str) -> "ProcedureType":
-        return {
-            "http://www.w3.org/ns/sosa/Procedure": ProcedureType.PROCEDURE,
-            "http://www.w3.org/ns/sosa/ObservingProcedure": ProcedureType.OBSERVING_PROCEDURE,
-            "http://www.w3.org/ns/sosa/SamplingProcedure": ProcedureType.SAMPLING_PROCEDURE,
-            "http://www.w3.org/ns/sosa/ActuatingProcedure": ProcedureType.ACTUATING_PROCEDURE,
-            "http://www.w3.org/ns/sosa/System": ProcedureType.SYSTEM,
-            "http://www.w3.org/ns/sosa/Sensor": ProcedureType.SENSOR,
-            "http://www.w3.org/ns/sosa/Actuator": ProcedureType.ACTUATOR,
-            "http://www.w3.org/ns/sosa/Sampler": ProcedureType.SAMPLER,
-            "http://www.w3.org/ns/sosa/Platform": ProcedureType.PLATFORM,
-            "sosa:Procedure": ProcedureType.PROCEDURE,
-            "sosa:ObservingProcedure": ProcedureType.OBSERVING_PROCEDURE,
-            "sosa:SamplingProcedure": ProcedureType.SAMPLING_PROCEDURE,
-            "sosa:ActuatingProcedure": ProcedureType.ACTUATING_PROCEDURE,
-            "sosa:System": ProcedureType.SYSTEM,
-            "sosa:Sensor": ProcedureType.SENSOR,
-            "sosa:Actuator": ProcedureType.ACTUATOR,
-            "sosa:Sampler": ProcedureType.SAMPLER,
-            "sosa:Platform": ProcedureType.PLATFORM,
-        }[value]
+        try:
+            return _PROCEDURE_TYPES_BY_API_VALUE[value]
+        except KeyError:
+            raise ValueError(f"Unknown procedure type: {value!r}") from None
 
     def get_icon_path(self) -> str:
         return {
@@ -131,7 +133,30 @@ class ProcedureType(enum.Enum):
         }.get(self, IconPath.procedure_type_procedure)
 
 
-@dataclasses.dataclass(frozen=True)
+# lookup table for `ProcedureType.from_api_response`, built once
+_PROCEDURE_TYPES_BY_API_VALUE: dict[str, ProcedureType] = {
+    "http://www.w3.org/ns/sosa/Procedure": ProcedureType.PROCEDURE,
+    "http://www.w3.org/ns/sosa/ObservingProcedure": ProcedureType.OBSERVING_PROCEDURE,
+    "http://www.w3.org/ns/sosa/SamplingProcedure": ProcedureType.SAMPLING_PROCEDURE,
+    "http://www.w3.org/ns/sosa/ActuatingProcedure": ProcedureType.ACTUATING_PROCEDURE,
+    "http://www.w3.org/ns/sosa/System": ProcedureType.SYSTEM,
+    "http://www.w3.org/ns/sosa/Sensor": ProcedureType.SENSOR,
+    "http://www.w3.org/ns/sosa/Actuator": ProcedureType.ACTUATOR,
+    "http://www.w3.org/ns/sosa/Sampler": ProcedureType.SAMPLER,
+    "http://www.w3.org/ns/sosa/Platform": ProcedureType.PLATFORM,
+    "sosa:Procedure": ProcedureType.PROCEDURE,
+    "sosa:ObservingProcedure": ProcedureType.OBSERVING_PROCEDURE,
+    "sosa:SamplingProcedure": ProcedureType.SAMPLING_PROCEDURE,
+    "sosa:ActuatingProcedure": ProcedureType.ACTUATING_PROCEDURE,
+    "sosa:System": ProcedureType.SYSTEM,
+    "sosa:Sensor": ProcedureType.SENSOR,
+    "sosa:Actuator": ProcedureType.ACTUATOR,
+    "sosa:Sampler": ProcedureType.SAMPLER,
+    "sosa:Platform": ProcedureType.PLATFORM,
+}
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class TimePeriod:
     start: typing.Literal["now"] | dt.datetime
     end: typing.Literal["now"] | dt.datetime
@@ -155,12 +180,33 @@ class TimePeriod:
 
 @dataclasses.dataclass(frozen=True)
 class SystemSearchFilterSet:
-    system_types: list[str]
-    asset_types: list[str]
+    """Values of the `SystemType` and `AssetType` that systems must have.
 
+    An empty list does not restrict the corresponding type.
+    """
 
+    system_types: list[str]
+    asset_types: list[str]
 
-@dataclasses.dataclass(frozen=True)
+    def is_empty(self) -> bool:
+        return len(self.system_types) == 0 and len(self.asset_types) == 0
+
+    def matches(self, item: "OacsItem") -> bool:
+        if len(self.system_types) > 0:
+            system_type = getattr(item, "feature_type", None)
+            if (
+                    not isinstance(system_type, SystemType)
+                    or system_type.value not in self.system_types
+            ):
+                return False
+        if len(self.asset_types) > 0:
+            asset_type = getattr(item, "asset_type", None)
+            if not isinstance(asset_type, AssetType) or asset_type.value not in self.asset_types:
+                return False
+        return True
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class Link:
     href: str
     rel: str | None = None
@@ -169,13 +215,30 @@ class Link:
 
     @classmethod
     def from_api_response(cls, response_content: dict) -> "Link":
-        log_message(f"Processing link: {response_content=}")
-        return cls(
-            href=response_content["href"],
-            rel=response_content.get("rel"),
-            type=response_content.get("type"),
-            title=response_content.get("title"),
-        )
+        log_debug("Processing link: %r", response_content)
+        href = response_content["href"]
+        rel = response_content.get("rel")
+        type_ = response_content.get("type")
+        title = response_content.get("title")
+        try:
+            return _get_shared_link(href, rel, type_, title)
+        except TypeError:  # unhashable members, this link cannot be shared
+            return cls(href=href, rel=rel, type=type_, title=title)
+
+
+def _intern(value: typing.Any) -> typing.Any:
+    """Intern strings, which are often repeated across thousands of items."""
+    return sys.intern(value) if type(value) is str else value
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_shared_link(href: str, rel: str | None, type_: str | None, title: str | None) -> Link:
+    """Return a link with these members, reusing an existing one when possible.
+
+    Links are immutable, so items whose links are the same (e.g. those of the
+    datastreams of a system, which all point to it) can share the objects.
+    """
+    return Link(href=href, rel=_intern(rel), type=_intern(type_), title=title)
 
 
 @dataclasses.dataclass(frozen=True)
@@ -251,7 +314,7 @@ class ConformanceItem:
     def _parse_conformance_url(self) -> tuple[str, str, str] | None:
         parsed = urlparse(self.conformance_url)
         components = parsed.path.split("/")
-        log_message(f"{components=}")
+        log_debug("Conformance URL components: %r", components)
         try:
             standard_name, version, _, conformance_class = components[2:]
             return standard_name, version, conformance_class
@@ -295,15 +358,231 @@ class OacsFeatureProtocol(typing.Protocol):
     def get_relevant_links(self) -> list[Link]: ...
 
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+FieldParser = typing.Callable[[dict], typing.Any]
+
+
+@dataclasses.dataclass(frozen=True)
+class FieldSpec:
+    """Declares how a model field is read from the raw API response.
+
+    The value is the `key` member of the response - or of its `properties`
+    member, for GeoJSON features - passed through `convert`. Missing optional
+    members get the default, as do empty ones when there is a converter.
+    Fields that do not map to a single member use `parse` instead, which gets
+    the whole response.
+
+    Lazy fields are only parsed when first read on items that were built with
+    `lazy_from_api_response`, the others are what a list of search results
+    needs to show an item.
+    """
+
+    name: str
+    key: str | None = None
+    in_properties: bool = False
+    required: bool = False
+    convert: typing.Callable[[typing.Any], typing.Any] | None = None
+    default: typing.Any = None
+    default_factory: typing.Callable[[], typing.Any] | None = None
+    parse: FieldParser | None = None
+    lazy: bool = False
+
+
+def _extend_field_specs(
+        base_specs: typing.Sequence[FieldSpec],
+        *specs: FieldSpec
+) -> tuple[FieldSpec, ...]:
+    """Add specs to those of a base class, replacing the ones with the same name."""
+    overridden = {spec.name for spec in specs}
+    return (*(spec for spec in base_specs if spec.name not in overridden), *specs)
+
+
+def _compile_field_parser(spec: FieldSpec) -> FieldParser:
+    """Build the function that reads a field, specialized for its spec.
+
+    All decisions are taken here, once, so that parsing a value is a single
+    lookup plus the conversion.
+    """
+    if spec.parse is not None:
+        return spec.parse
+    key = sys.intern(spec.key)
+    convert = spec.convert
+    default = spec.default
+    get_default = spec.default_factory or (lambda: default)
+    if spec.required:
+        if spec.in_properties:
+            if convert is None:
+                return lambda response_content: response_content["properties"][key]
+            return lambda response_content: convert(response_content["properties"][key])
+        if convert is None:
+            return operator.itemgetter(key)
+        return lambda response_content: convert(response_content[key])
+    if spec.in_properties:
+        if convert is None:
+            return lambda response_content: response_content["properties"].get(key, default)
+        return lambda response_content: (
+            convert(value) if (value := response_content["properties"].get(key)) else get_default()
+        )
+    if convert is None:
+        return lambda response_content: response_content.get(key, default)
+    return lambda response_content: (
+        convert(value) if (value := response_content.get(key)) else get_default()
+    )
+
+
+class _LazyField:
+    """Parse a model field from the raw API response the first time it is read.
+
+    Items have slots rather than a `__dict__`, so this wraps the member
+    descriptor of the field's slot: values are read from and stored in the
+    slot, and an empty slot means the field has not been parsed yet. Items
+    built by `from_api_response` have all their slots filled from the start.
+
+    Parsing errors are logged and the field's default is used instead, as
+    there is no sensible way to report them to whoever reads the attribute.
+    The raw response is kept for as long as the item lives, as items are
+    shared between the GUI and background tasks: two threads parsing the same
+    field store the same value, whereas dropping the response while another
+    thread is about to read it would lose the field.
+    """
+
+    name: str
+    slot: typing.Any
+    parse: FieldParser
+    get_default: typing.Callable[[], typing.Any]
+
+    def __init__(
+            self,
+            name: str,
+            slot: typing.Any,
+            parse: FieldParser,
+            get_default: typing.Callable[[], typing.Any]
+    ):
+        self.name = name
+        self.slot = slot
+        self.parse = parse
+        self.get_default = get_default
+
+    def __get__(self, instance: typing.Any, owner: type | None = None) -> typing.Any:
+        if instance is None:
+            return self
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            pass
+        try:
+            value = self.parse(instance._raw_response)
+        except (AttributeError, KeyError, IndexError, TypeError, ValueError) as err:
+            log_message(
+                f"Could not parse {self.name!r} of {instance.id_!r}: {err!r}",
+                level=qgis.core.Qgis.MessageLevel.Warning
+            )
+            value = self.get_default()
+        self.slot.__set__(instance, value)
+        return value
+
+    def __set__(self, instance: typing.Any, value: typing.Any) -> None:
+        self.slot.__set__(instance, value)
+
+
+def _get_default_factory(field: dataclasses.Field) -> typing.Callable[[], typing.Any]:
+    if field.default_factory is not dataclasses.MISSING:
+        return field.default_factory
+    default = None if field.default is dataclasses.MISSING else field.default
+    return lambda: default
+
+
+def _compile_field_specs(cls: type) -> type:
+    """Compile the class' field specs into parsers and install its lazy fields.
+
+    This must be applied after the dataclass decorator, which creates the
+    slots that the lazy fields wrap. Each compiled parser is paired with the
+    setter of its slot, and fields without a spec get their default.
+    """
+    fields = {field.name: field for field in dataclasses.fields(cls)}
+    specified = {spec.name for spec in cls._field_specs}
+    if unspecified := [
+        name for name, field in fields.items()
+        if name not in specified and field.default is dataclasses.MISSING
+    ]:
+        raise TypeError(f"{cls.__name__} fields without a spec nor default: {unspecified}")
+    eager_parsers = []
+    lazy_parsers = []
+    for spec in cls._field_specs:
+        if spec.lazy and spec.required:
+            # a missing member must make the item fail to parse, not turn
+            # into a None that only blows up when the field is first read
+            raise TypeError(f"{cls.__name__}.{spec.name} cannot be both required and lazy")
+        parser = _compile_field_parser(spec)
+        if spec.lazy:
+            descriptor = _LazyField(
+                spec.name, getattr(cls, spec.name), parser, _get_default_factory(fields[spec.name]))
+            setattr(cls, spec.name, descriptor)
+            lazy_parsers.append((descriptor.__set__, parser))
+        else:
+            eager_parsers.append((getattr(cls, spec.name).__set__, parser))
+    cls._eager_field_parsers = tuple(eager_parsers)
+    cls._field_parsers = tuple(eager_parsers + lazy_parsers)
+    cls._field_defaults = tuple(
+        (getattr(cls, name).__set__, _get_default_factory(field))
+        for name, field in fields.items() if name not in specified
+    )
+    return cls
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class OacsItem(abc.ABC):
     id_: str
     name: str
     description: str | None = None
 
+    # the raw response of items built with `lazy_from_api_response`
+    _raw_response: dict | None = dataclasses.field(
+        default=None, init=False, repr=False, compare=False)
+
+    _field_specs: typing.ClassVar[tuple[FieldSpec, ...]] = ()
+    # compiled from the field specs by `_compile_field_specs`, as pairs of slot
+    # setter and parser, or of slot setter and default factory
+    _eager_field_parsers: typing.ClassVar[tuple[tuple[typing.Callable, FieldParser], ...]] = ()
+    _field_parsers: typing.ClassVar[tuple[tuple[typing.Callable, FieldParser], ...]] = ()
+    _field_defaults: typing.ClassVar[tuple[tuple[typing.Callable, typing.Callable], ...]] = ()
+
+    @classmethod
+    def from_api_response(cls, response_content: dict) -> "OacsItem":
+        # the compiled parsers fill the slots directly, which is equivalent to
+        # calling the dataclass constructor, without building its kwargs
+        item = cls.__new__(cls)
+        for set_value, get_default in cls._field_defaults:
+            set_value(item, get_default())
+        for set_value, parse in cls._field_parsers:
+            set_value(item, parse(response_content))
+        return item
+
     @classmethod
+    def lazy_from_api_response(cls, response_content: dict) -> "OacsItem":
+        """Build an item that keeps the raw response and parses most fields on first access.
+
+        Only the eager fields are parsed right away, errors in those are raised
+        just like with `from_api_response`.
+        """
+        item = cls.__new__(cls)
+        for set_value, get_default in cls._field_defaults:
+            set_value(item, get_default())
+        for set_value, parse in cls._eager_field_parsers:
+            set_value(item, parse(response_content))
+        object.__setattr__(item, "_raw_response", response_content)
+        return item
+
+    @property
     @abc.abstractmethod
-    def from_api_response(cls, response_content: dict) -> "OacsItem": ...
+    def icon_path(self) -> str: ...
+
+    @property
+    @abc.abstractmethod
+    def icon_tooltip(self) -> str: ...
+
+    @property
+    def summary(self) -> str:
+        return self.description or ""
 
     def get_renderable_properties(self) -> dict[str, str]:
         return {
@@ -313,15 +592,23 @@ class OacsItem(abc.ABC):
     def get_relevant_links(self) -> list[Link]:
         return []
 
+    def get_searchable_texts(self) -> list[str]:
+        """Return the texts that a local search should find this item by."""
+        return [self.name, self.description or ""]
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class OacsFeature(OacsItem, abc.ABC):
     uid: str
     feature_type: str | None = None
     geometry: qgis.core.QgsReferencedGeometry | None = None
     bbox: qgis.core.QgsReferencedRectangle | None = None
     links: list[Link] = dataclasses.field(default_factory=list)
-    additional_properties: dict[str, str] | None = None
+    additional_properties: dict[str, str] = dataclasses.field(default_factory=dict)
+
+    @property
+    def summary(self) -> str:
+        return self.uid
 
     def get_renderable_properties(self) -> dict[str, str]:
         return {
@@ -330,79 +617,114 @@ class OacsFeature(OacsItem, abc.ABC):
             **{k.capitalize(): str(v) for k, v in self.additional_properties.items()}
         }
 
-    @staticmethod
-    def _parse_api_response(
-            response_content: dict,
-            disregard_properties: typing.Sequence[str] | None = None
-    ) -> dict:
-        properties = dict(response_content["properties"])
+    def get_searchable_texts(self) -> list[str]:
+        """Return the texts that a local search should find this feature by.
+
+        Lazy items take the property values from their raw response, as
+        parsing `additional_properties` of every indexed item would defeat
+        their laziness.
+        """
+        if self._raw_response is not None:
+            values = (
+                str(value) for value in (self._raw_response.get("properties") or {}).values()
+                if isinstance(value, (str, int, float))
+            )
+        else:
+            values = self.additional_properties.values()
+        return [self.name, self.uid, self.description or "", *values]
+
+
+def _parse_links(raw_links: typing.Iterable[dict]) -> list[Link]:
+    return [Link.from_api_response(raw_link) for raw_link in raw_links]
+
+
+def _parse_additional_properties(disregard_properties: typing.Sequence[str] = ()) -> FieldParser:
+    """Return a parser for the properties that are not modeled as fields."""
+    excluded = frozenset(("uid", "name", "featureType", "description", *disregard_properties))
+
+    def parser(response_content: dict) -> dict[str, str]:
         return {
-            "id_": response_content["id"],
-            "uid": properties.pop("uid"),
-            "name": properties.pop("name"),
-            "feature_type": properties.pop("featureType", None),
-            "description": properties.pop("description", None),
-            "geometry": qgis.core.QgsReferencedGeometry(
-                geometry=qgis.core.QgsJsonUtils.geometryFromGeoJson(json.dumps(raw_geometry)),
-                crs=qgis.core.QgsCoordinateReferenceSystem("EPSG:4326"),
-            ) if (raw_geometry := response_content.get("geometry")) else None,
-            "bbox": qgis.core.QgsReferencedGeometry(
-                geometry=qgis.core.QgsJsonUtils.geometryFromGeoJson(json.dumps(raw_bbox)),
-                crs=qgis.core.QgsCoordinateReferenceSystem("EPSG:4326"),
-            ) if (raw_bbox := response_content.get("bbox")) else None,
-            "links": [
-                Link.from_api_response(raw_link)
-                for raw_link in response_content.get("links", [])
-            ],
-            "additional_properties": {
-                k: str(v) for k, v in properties.items()
-                if k not in (disregard_properties or [])
-            }
+            _intern(k): str(v) for k, v in response_content["properties"].items()
+            if k not in excluded
         }
+    return parser
+
+
+def _parse_deployed_systems_link(response_content: dict) -> list[Link] | None:
+    try:
+        return _parse_links(response_content["properties"].get("deployedSystems@link", []))
+    except (TypeError, KeyError) as err:
+        log_message(
+            f"Could not parse deployed systems links: {str(err)}",
+            level=qgis.core.Qgis.MessageLevel.Warning
+        )
+        return None
 
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+_FEATURE_FIELD_SPECS = (
+    FieldSpec("id_", "id", required=True),
+    FieldSpec("uid", "uid", in_properties=True, required=True),
+    FieldSpec("name", "name", in_properties=True, required=True),
+    FieldSpec("feature_type", "featureType", in_properties=True, convert=_intern),
+    FieldSpec("description", "description", in_properties=True),
+    FieldSpec("geometry", "geometry", convert=geometries.build_referenced_geometry, lazy=True),
+    FieldSpec("bbox", "bbox", convert=geometries.build_referenced_rectangle, lazy=True),
+    FieldSpec("links", "links", convert=_parse_links, default_factory=list, lazy=True),
+)
+
+
+@_compile_field_specs
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class System(OacsFeature):
     feature_type: SystemType | None
     asset_type: AssetType | None
     valid_time: TimePeriod
     system_kind_link: Link
 
-    @classmethod
-    def from_api_response(cls, response_content: dict) -> "System":
-        common = cls._parse_api_response(
-            response_content,
-            disregard_properties=("assetType", "validTime", "systemKind@link")
+    _field_specs = _extend_field_specs(
+        _FEATURE_FIELD_SPECS,
+        FieldSpec(
+            "feature_type", "featureType", in_properties=True,
+            convert=SystemType.from_api_response, default=SystemType.SYSTEM
+        ),
+        FieldSpec(
+            "additional_properties",
+            parse=_parse_additional_properties(("assetType", "validTime", "systemKind@link")),
+            lazy=True
+        ),
+        FieldSpec(
+            "asset_type", "assetType", in_properties=True,
+            convert=AssetType.from_api_response
+        ),
+        FieldSpec(
+            "valid_time", "validTime", in_properties=True,
+            convert=TimePeriod.from_api_response, lazy=True
+        ),
+        FieldSpec(
+            "system_kind_link", "systemKind@link", in_properties=True,
+            convert=Link.from_api_response, lazy=True
+        ),
+    )
+
+    @property
+    def icon_path(self) -> str:
+        return (
+            self.feature_type.get_icon_path()
+            if self.feature_type
+            else IconPath.system_type_system
         )
-        return cls(
-            **{
-                **common,
-                "feature_type": (
-                    SystemType.from_api_response(raw_type)
-                    if (raw_type := response_content["properties"].get("featureType", None))
-                    else SystemType.SYSTEM
-                ),
-                "asset_type": (
-                    AssetType.from_api_response(raw_asset_type)
-                    if (raw_asset_type := response_content["properties"].get("assetType", None))
-                    else None
-                ),
-                "valid_time": (
-                    TimePeriod.from_api_response(raw_valid_time)
-                    if (raw_valid_time := response_content["properties"].get("validTime", None))
-                    else None
-                ),
-                "system_kind_link": (
-                    Link.from_api_response(raw_system_kind)
-                    if (raw_system_kind := response_content["properties"].get("systemKind@link", None))
-                    else None
-                ),
-            },
+
+    @property
+    def icon_tooltip(self) -> str:
+        return (
+            self.feature_type.value.upper()
+            if self.feature_type
+            else SystemType.SYSTEM.value.upper()
         )
 
     def get_renderable_properties(self) -> dict[str, str]:
         return {
-            **super().get_renderable_properties(),
+            **super(System, self).get_renderable_properties(),
             "Feature Type": self.feature_type.name.upper(),
             "Asset Type": self.asset_type.name.upper() if self.asset_type else "Unknown",
             "Valid Time": self.valid_time.as_renderable_property() if self.valid_time else "Unknown",
@@ -431,47 +753,47 @@ class System(OacsFeature):
         return [link for link in self.links if link.rel in relevant_link_rels]
 
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+@_compile_field_specs
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class Deployment(OacsFeature):
     valid_time: TimePeriod
     platform_link: Link | None = None
     deployed_systems_link: list[Link] | None = None
 
-    @classmethod
-    def from_api_response(cls, response_content: dict) -> "Deployment":
-        common = cls._parse_api_response(
-            response_content,
-            disregard_properties=("validTime", "platform@link", "deployedSystems@link")
-        )
-        try:
-            deployed_systems_link = [
-                Link.from_api_response(raw_system_link)
-                for raw_system_link in response_content["properties"].get("deployedSystems@link", [])
-            ]
-        except (TypeError, KeyError) as err:
-            deployed_systems_link = None
-            log_message(
-                f"Could not parse deployed systems links: {str(err)}",
-                level=qgis.core.Qgis.MessageLevel.Warning
-            )
-        return cls(
-            **common,
-            valid_time=(
-                TimePeriod.from_api_response(raw_valid_time)
-                if (raw_valid_time := response_content["properties"].get("validTime", None))
-                else None
-            ),
-            platform_link=(
-                Link.from_api_response(raw_system_kind)
-                if (raw_system_kind := response_content["properties"].get("platform@link", None))
-                else None
-            ),
-            deployed_systems_link=deployed_systems_link
+    _field_specs = _extend_field_specs(
+        _FEATURE_FIELD_SPECS,
+        FieldSpec(
+            "additional_properties",
+            parse=_parse_additional_properties(
+                ("validTime", "platform@link", "deployedSystems@link")),
+            lazy=True
+        ),
+        FieldSpec(
+            "valid_time", "validTime", in_properties=True,
+            convert=TimePeriod.from_api_response, lazy=True
+        ),
+        FieldSpec(
+            "platform_link", "platform@link", in_properties=True,
+            convert=Link.from_api_response, lazy=True
+        ),
+        FieldSpec("deployed_systems_link", parse=_parse_deployed_systems_link, lazy=True),
+    )
+
+    @property
+    def icon_path(self) -> str:
+        return IconPath.deployment
+
+    @property
+    def icon_tooltip(self) -> str:
+        return (
+            self.feature_type.upper()
+            if self.feature_type
+            else "DEPLOYMENT"
         )
 
     def get_renderable_properties(self) -> dict[str, str]:
         return {
-            **super().get_renderable_properties(),
+            **super(Deployment, self).get_renderable_properties(),
             "Feature Type": (self.feature_type or "deployment").upper(),
             "Valid Time": self.valid_time.as_renderable_property() if self.valid_time else "Unknown",
         }
@@ -500,34 +822,44 @@ class Deployment(OacsFeature):
         return [link for link in self.links if link.rel in relevant_link_rels]
 
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+@_compile_field_specs
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class SamplingFeature(OacsFeature):
     valid_time: TimePeriod
     sampled_feature_link: Link
 
-    @classmethod
-    def from_api_response(cls, response_content: dict) -> "SamplingFeature":
-        common = cls._parse_api_response(
-            response_content,
-            disregard_properties=("validTime", "sampledFeature@link")
-        )
-        return cls(
-            **common,
-            valid_time=(
-                TimePeriod.from_api_response(raw_valid_time)
-                if (raw_valid_time := response_content["properties"].get("validTime", None))
-                else None
-            ),
-            sampled_feature_link=(
-                Link.from_api_response(raw_system_kind)
-                if (raw_system_kind := response_content["properties"].pop("sampledFeature@link", None))
-                else None
-            )
+    _field_specs = _extend_field_specs(
+        _FEATURE_FIELD_SPECS,
+        FieldSpec(
+            "additional_properties",
+            parse=_parse_additional_properties(("validTime", "sampledFeature@link")),
+            lazy=True
+        ),
+        FieldSpec(
+            "valid_time", "validTime", in_properties=True,
+            convert=TimePeriod.from_api_response, lazy=True
+        ),
+        FieldSpec(
+            "sampled_feature_link", "sampledFeature@link", in_properties=True,
+            convert=Link.from_api_response, lazy=True
+        ),
+    )
+
+    @property
+    def icon_path(self) -> str:
+        return IconPath.sampling_feature
+
+    @property
+    def icon_tooltip(self) -> str:
+        return (
+            self.feature_type.upper()
+            if self.feature_type
+            else "SAMPLING_FEATURE"
         )
 
     def get_renderable_properties(self) -> dict[str, str]:
         return {
-            **super().get_renderable_properties(),
+            **super(SamplingFeature, self).get_renderable_properties(),
             "Feature Type": (self.feature_type or "sampling_feature").upper(),
             "Valid Time": self.valid_time.as_renderable_property() if self.valid_time else "Unknown",
         }
@@ -552,40 +884,44 @@ class SamplingFeature(OacsFeature):
         return [link for link in self.links if link.rel in relevant_link_rels]
 
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+@_compile_field_specs
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class Procedure(OacsFeature):
     geometry: None
     feature_type: ProcedureType
     valid_time: TimePeriod
 
-    @classmethod
-    def from_api_response(cls, response_content: dict) -> "Procedure":
-        common = cls._parse_api_response(
-            response_content,
-            disregard_properties=("featureType", "validTime")
-        )
-        return cls(
-            **{
-                **common,
-                "feature_type": (
-                    ProcedureType.from_api_response(raw_type)
-                    if (raw_type := response_content["properties"].get("featureType", None))
-                    else ProcedureType.PROCEDURE
-                ),
-                "valid_time": (
-                    TimePeriod.from_api_response(raw_valid_time)
-                    if (raw_valid_time := response_content["properties"].get("validTime", None))
-                    else None
-                ),
-                "geometry": None
-            }
-        )
+    _field_specs = _extend_field_specs(
+        _FEATURE_FIELD_SPECS,
+        FieldSpec(
+            "feature_type", "featureType", in_properties=True,
+            convert=ProcedureType.from_api_response, default=ProcedureType.PROCEDURE
+        ),
+        FieldSpec("geometry", parse=lambda response_content: None),
+        FieldSpec(
+            "additional_properties",
+            parse=_parse_additional_properties(("featureType", "validTime")),
+            lazy=True
+        ),
+        FieldSpec(
+            "valid_time", "validTime", in_properties=True,
+            convert=TimePeriod.from_api_response, lazy=True
+        ),
+    )
+
+    @property
+    def icon_path(self) -> str:
+        return IconPath.procedure_type_procedure
+
+    @property
+    def icon_tooltip(self) -> str:
+        return self.feature_type.value.upper()
 
     def get_renderable_properties(self) -> dict[str, str]:
         return {
-            **super().get_renderable_properties(),
+            **super(Procedure, self).get_renderable_properties(),
             "Feature Type": self.feature_type.name.upper(),
-            "Valid Time": self.valid_time.as_renderable_property(),
+            "Valid Time": self.valid_time.as_renderable_property() if self.valid_time else "Unknown",
         }
 
     def get_relevant_links(self) -> list[Link]:
@@ -597,6 +933,13 @@ class DataStreamType(enum.Enum):
     STATUS = "status"
     OBSERVATION = "observation"
 
+    @classmethod
+    def from_api_response(cls, value: str) -> "DataStreamType":
+        try:
+            return _DATASTREAM_TYPES_BY_API_VALUE[value]
+        except KeyError:
+            raise ValueError(f"Unknown datastream type: {value!r}") from None
+
     def get_icon_path(self) -> str:
         return {
             self.STATUS: IconPath.datastream_type_status,
@@ -604,6 +947,12 @@ class DataStreamType(enum.Enum):
         }.get(self, IconPath.datastream)
 
 
+# lookup table for `DataStreamType.from_api_response`, built once
+_DATASTREAM_TYPES_BY_API_VALUE: dict[str, DataStreamType] = {
+    member.value: member for member in DataStreamType
+}
+
+
 class DataStreamResultType(enum.Enum):
     MEASURE = "measure"
     VECTOR = "vector"
@@ -611,6 +960,13 @@ class DataStreamResultType(enum.Enum):
     COVERAGE = "coverage"
     COMPLEX = "complex"
 
+    @classmethod
+    def from_api_response(cls, value: str) -> "DataStreamResultType":
+        try:
+            return _DATASTREAM_RESULT_TYPES_BY_API_VALUE[value]
+        except KeyError:
+            raise ValueError(f"Unknown datastream result type: {value!r}") from None
+
     def get_icon_path(self) -> str:
         return {
             self.MEASURE: IconPath.system_type_sensor,
@@ -621,7 +977,13 @@ class DataStreamResultType(enum.Enum):
         }.get(self, IconPath.system_type_sensor)
 
 
-@dataclasses.dataclass(frozen=True)
+# lookup table for `DataStreamResultType.from_api_response`, built once
+_DATASTREAM_RESULT_TYPES_BY_API_VALUE: dict[str, DataStreamResultType] = {
+    member.value: member for member in DataStreamResultType
+}
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class ObservationSchemaJson:
     parameters_schema: dict  # not modeling this, for now
     result_schema: dict  # not modeling this, for now
@@ -630,7 +992,7 @@ class ObservationSchemaJson:
     result_link_media_type: str | None = None
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class DataStreamObservedProperty:
     definition: str | None = None
     label: str | None = None
@@ -641,7 +1003,8 @@ class DataStreamObservedProperty:
         return cls(**response_content)
 
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+@_compile_field_specs
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class DataStream(OacsItem):
     formats: list[str]
     system_link: Link
@@ -661,49 +1024,55 @@ class DataStream(OacsItem):
     sampling_feature_link: Link | None = None
     schema: ObservationSchemaJson | None = None
 
-    @classmethod
-    def from_api_response(cls, response_content: dict) -> "DataStream":
-        return cls(
-            id_=response_content["id"],
-            name=response_content["name"],
-            formats=response_content["formats"],
-            system_link=Link.from_api_response(response_content["system@link"]),
-            observed_properties=[
-                DataStreamObservedProperty.from_api_response(prop)
-                for prop in raw_observed_props
-            ] if (raw_observed_props := response_content.get("observedProperties")) else None,
-            phenomenon_time=(
-                TimePeriod.from_api_response(phen_time)
-                if (phen_time:=response_content.get("phenomenonTime")) else None
-            ),
-            result_time=(
-                TimePeriod.from_api_response(result_time)
-                if (result_time:=response_content.get("resultTime")) else None
-            ),
-            result_type=DataStreamResultType(response_content["resultType"]),
-            live=response_content.get("live", False),
-            description=response_content.get("description"),
-            datastream_type=DataStreamType(ds_type) if (ds_type :=response_content.get("type")) else None,
-            phenomenon_interval=response_content.get("phenomenonInterval"),
-            result_time_interval=response_content.get("resultTimeInterval"),
-            output_name=response_content.get("outputName"),
-            procedure_link=(
-                Link.from_api_response(procedure_raw_link)
-                if (procedure_raw_link := response_content.get("procedure@link")) else None
-            ),
-            deployment_link=(
-                Link.from_api_response(deployment_raw_link)
-                if (deployment_raw_link := response_content.get("deployment@link")) else None
-            ),
-            feature_of_interest_link=(
-                Link.from_api_response(foi_raw_link)
-                if (foi_raw_link := response_content.get("featureOfInterest@link")) else None
-            ),
-            sampling_feature_link=(
-                Link.from_api_response(sampling_feat_raw_link)
-                if (sampling_feat_raw_link := response_content.get("samplingFeature@link")) else None
-            ),
-            schema=None,
+    _field_specs = (
+        FieldSpec("id_", "id", required=True),
+        FieldSpec("name", "name", required=True),
+        FieldSpec("description", "description"),
+        FieldSpec(
+            "result_type", "resultType", required=True,
+            convert=DataStreamResultType.from_api_response
+        ),
+        FieldSpec("datastream_type", "type", convert=DataStreamType.from_api_response),
+        FieldSpec("formats", "formats", required=True),
+        FieldSpec("system_link", "system@link", required=True, convert=Link.from_api_response),
+        FieldSpec(
+            "observed_properties", "observedProperties",
+            convert=lambda raw_props: [
+                DataStreamObservedProperty.from_api_response(prop) for prop in raw_props],
+            lazy=True
+        ),
+        FieldSpec("phenomenon_time", "phenomenonTime", convert=TimePeriod.from_api_response, lazy=True),
+        FieldSpec("result_time", "resultTime", convert=TimePeriod.from_api_response, lazy=True),
+        FieldSpec("live", "live", default=False, lazy=True),
+        FieldSpec("phenomenon_interval", "phenomenonInterval", lazy=True),
+        FieldSpec("result_time_interval", "resultTimeInterval", lazy=True),
+        FieldSpec("output_name", "outputName", lazy=True),
+        FieldSpec("procedure_link", "procedure@link", convert=Link.from_api_response, lazy=True),
+        FieldSpec("deployment_link", "deployment@link", convert=Link.from_api_response, lazy=True),
+        FieldSpec(
+            "feature_of_interest_link", "featureOfInterest@link",
+            convert=Link.from_api_response, lazy=True
+        ),
+        FieldSpec(
+            "sampling_feature_link", "samplingFeature@link",
+            convert=Link.from_api_response, lazy=True
+        ),
+    )
+
+    @property
+    def icon_path(self) -> str:
+        return (
+            self.datastream_type.get_icon_path()
+            if self.datastream_type
+            else IconPath.datastream
+        )
+
+    @property
+    def icon_tooltip(self) -> str:
+        return (
+            self.datastream_type.value.upper()
+            if self.datastream_type
+            else "DATASTREAM"
         )
 
     def get_renderable_properties(self) -> dict[str, str]:
@@ -719,22 +1088,41 @@ class DataStream(OacsItem):
 ItemType = typing.TypeVar("ItemType", bound=OacsItem)
 
 
+def log_item_parse_failure(raw_item: typing.Any, err: KeyError | ValueError) -> None:
+    """Warn about an item of a list response that could not be parsed.
+
+    Only the item's id goes in the warning, the whole item can be very long
+    and is only logged when debug logging is turned on. A `KeyError` means
+    that a required member is missing.
+    """
+    item_id = raw_item.get("id") if isinstance(raw_item, dict) else None
+    reason = f"missing member {err}" if isinstance(err, KeyError) else str(err)
+    log_message(
+        "Could not parse item %r - %s", item_id, reason,
+        level=qgis.core.Qgis.MessageLevel.Warning
+    )
+    log_debug("Unparsable item: %r", raw_item)
+
+
 @dataclasses.dataclass(frozen=True)
 class OacsFeatureList(typing.Generic[ItemType]):
     item_type: typing.ClassVar[typing.Type[OacsFeature]] = typing.Type[ItemType]
     items: list[ItemType]
 
     @classmethod
-    def from_api_response(cls, response_content: dict) -> "OacsFeatureList[ItemType]":
+    def from_api_response(cls, response_content: dict, lazy: bool = True) -> "OacsFeatureList[ItemType]":
+        """Parse a list response.
+
+        By default items are created with `lazy_from_api_response`, as most of
+        them are only ever shown in a list of search results.
+        """
+        parse = cls.item_type.lazy_from_api_response if lazy else cls.item_type.from_api_response
         items = []
         for raw_feature in response_content.get("features", []):
             try:
-                items.append(cls.item_type.from_api_response(raw_feature))
-            except ValueError as err:
-                log_message(
-                    f"Could not parse {raw_feature!r} - {str(err)}",
-                    level=qgis.core.Qgis.MessageLevel.Warning
-                )
+                items.append(parse(raw_feature))
+            except (KeyError, ValueError) as err:
+                log_item_parse_failure(raw_feature, err)
         return cls(items=items)
 
 
@@ -764,16 +1152,19 @@ class OacsItemList(typing.Generic[ItemType]):
     items: list[ItemType]
 
     @classmethod
-    def from_api_response(cls, response_content: dict) -> "OacsItemList[ItemType]":
+    def from_api_response(cls, response_content: dict, lazy: bool = True) -> "OacsItemList[ItemType]":
+        """Parse a list response.
+
+        By default items are created with `lazy_from_api_response`, as most of
+        them are only ever shown in a list of search results.
+        """
+        parse = cls.item_type.lazy_from_api_response if lazy else cls.item_type.from_api_response
         items = []
         for raw_item in response_content.get("items", []):
             try:
-                items.append(cls.item_type.from_api_response(raw_item))
-            except ValueError as err:
-                log_message(
-                    f"Could not parse {raw_item!r} - {str(err)}",
-                    level=qgis.core.Qgis.MessageLevel.Warning
-                )
+                items.append(parse(raw_item))
+            except (KeyError, ValueError) as err:
+                log_item_parse_failure(raw_item, err)
         return cls(items=items)
 
 
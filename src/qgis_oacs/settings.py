@@ -1,5 +1,6 @@
 import contextlib
 import dataclasses
+import enum
 import json
 import typing
 import uuid
@@ -11,6 +12,8 @@ _BASE_KEY = "/PythonPlugins/qgis_oacs"
 _DATA_SOURCE_CONNECTIONS_GROUP = f"data_source_connections"
 _CURRENT_DATA_SOURCE_CONNECTION_KEY = f"current_data_source"
 _NETWORK_TIMEOUT_SETTINGS_KEY = f"network_timeout"
+_LIVE_SEARCH_KEY = "live_search"
+_DEBUG_LOGGING_KEY = "debug_logging"
 
 
 @contextlib.contextmanager
@@ -30,6 +33,12 @@ def _get_default_network_requests_timeout() -> int:
         return raw_network_settings.value("network_requests_timeout", type=int, defaultValue=5000)
 
 
+class LayerStorageFormat(enum.Enum):
+    MEMORY = "memory"
+    GEOPACKAGE = "gpkg"
+    FLATGEOBUF = "fgb"
+
+
 @dataclasses.dataclass
 class DataSourceConnectionSettings:
     id: uuid.UUID
@@ -38,6 +47,9 @@ class DataSourceConnectionSettings:
     network_requests_timeout: int = dataclasses.field(default_factory=_get_default_network_requests_timeout)
     auth_config: str | None = None
     use_f_query_param: bool = False
+    layer_storage_format: LayerStorageFormat = LayerStorageFormat.MEMORY
+    layer_storage_dir: str | None = None
+    use_offline_mirror: bool = False
 
     @classmethod
     def from_qgs_settings(cls, connection_identifier: uuid.UUID):
@@ -57,6 +69,18 @@ class DataSourceConnectionSettings:
                     defaultValue=False,
                     type=bool
                 ),
+                layer_storage_format=LayerStorageFormat(
+                    raw_connection_settings.value(
+                        "layer_storage_format",
+                        defaultValue=LayerStorageFormat.MEMORY.value
+                    )
+                ),
+                layer_storage_dir=raw_connection_settings.value("layer_storage_dir") or None,
+                use_offline_mirror=raw_connection_settings.value(
+                    "use_offline_mirror",
+                    defaultValue=False,
+                    type=bool
+                ),
             )
 
     def to_json(self):
@@ -68,42 +92,80 @@ class DataSourceConnectionSettings:
             raw_connection_settings.setValue("base_url", self.base_url)
             raw_connection_settings.setValue("network_requests_timeout", self.network_requests_timeout)
             raw_connection_settings.setValue("use_f_query_param", self.use_f_query_param)
+            raw_connection_settings.setValue("layer_storage_format", self.layer_storage_format.value)
+            raw_connection_settings.setValue("layer_storage_dir", self.layer_storage_dir or "")
+            raw_connection_settings.setValue("use_offline_mirror", self.use_offline_mirror)
             if self.auth_config:
                 raw_connection_settings.setValue("auth_config", self.auth_config)
 
 
 class OacsPluginSettingsManager(QtCore.QObject):
+    """Access to the plugin settings.
+
+    Connection settings are read from QgsSettings once and then served from
+    memory. The cache is invalidated whenever this manager changes the stored
+    connections, as announced by its own signals - code that modifies the
+    plugin's QgsSettings by other means must call `invalidate_cache()`.
+    """
+
     current_data_source_connection_changed = QtCore.pyqtSignal(str)
     data_source_connection_created = QtCore.pyqtSignal(str)
     data_source_connection_deleted = QtCore.pyqtSignal(str)
 
-    @staticmethod
-    def list_data_source_connection_ids() -> list[uuid.UUID]:
-        with qgis_settings(_DATA_SOURCE_CONNECTIONS_GROUP) as raw_connections_settings:
-            return [uuid.UUID(i) for i in raw_connections_settings.childGroups()]
-
-    @classmethod
-    def list_data_source_connections(cls) -> list[DataSourceConnectionSettings]:
-        result = []
-        for connection_id in cls.list_data_source_connection_ids():
-            result.append(DataSourceConnectionSettings.from_qgs_settings(connection_id))
+    _connections_cache: dict[uuid.UUID, DataSourceConnectionSettings] | None
+    _current_connection_id_cache: uuid.UUID | None
+    _current_connection_id_cached: bool
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self.invalidate_cache()
+        # connected before anyone else, so that other handlers of these
+        # signals already get fresh values
+        self.current_data_source_connection_changed.connect(self.invalidate_cache)
+        self.data_source_connection_created.connect(self.invalidate_cache)
+        self.data_source_connection_deleted.connect(self.invalidate_cache)
+
+    def invalidate_cache(self) -> None:
+        self._connections_cache = None
+        self._current_connection_id_cache = None
+        self._current_connection_id_cached = False
+
+    def _get_cached_connections(self) -> dict[uuid.UUID, DataSourceConnectionSettings]:
+        if self._connections_cache is None:
+            with qgis_settings(_DATA_SOURCE_CONNECTIONS_GROUP) as raw_connections_settings:
+                connection_ids = [uuid.UUID(i) for i in raw_connections_settings.childGroups()]
+            self._connections_cache = {
+                connection_id: DataSourceConnectionSettings.from_qgs_settings(connection_id)
+                for connection_id in connection_ids
+            }
+        return self._connections_cache
+
+    def list_data_source_connection_ids(self) -> list[uuid.UUID]:
+        return list(self._get_cached_connections().keys())
+
+    def list_data_source_connections(self) -> list[DataSourceConnectionSettings]:
+        # callers get copies, so that they cannot modify the cached instances
+        result = [dataclasses.replace(c) for c in self._get_cached_connections().values()]
         result.sort(key=lambda obj: obj.name)
         return result
 
-    @staticmethod
-    def get_data_source_connection(data_source_connection_id: uuid.UUID) -> DataSourceConnectionSettings:
+    def get_data_source_connection(
+            self,
+            data_source_connection_id: uuid.UUID
+    ) -> DataSourceConnectionSettings:
+        if (cached := self._get_cached_connections().get(data_source_connection_id)) is not None:
+            return dataclasses.replace(cached)
         return DataSourceConnectionSettings.from_qgs_settings(data_source_connection_id)
 
-    @staticmethod
-    def get_current_data_source_connection() -> DataSourceConnectionSettings | None:
-        with qgis_settings() as raw_settings:
-            current_data_source_connection_id = raw_settings.value(_CURRENT_DATA_SOURCE_CONNECTION_KEY)
-        return (
-            DataSourceConnectionSettings.from_qgs_settings(
-                uuid.UUID(current_data_source_connection_id)
-            )
-            if current_data_source_connection_id else None
-        )
+    def get_current_data_source_connection(self) -> DataSourceConnectionSettings | None:
+        if not self._current_connection_id_cached:
+            with qgis_settings() as raw_settings:
+                serialized_id = raw_settings.value(_CURRENT_DATA_SOURCE_CONNECTION_KEY)
+            self._current_connection_id_cache = uuid.UUID(serialized_id) if serialized_id else None
+            self._current_connection_id_cached = True
+        if self._current_connection_id_cache is None:
+            return None
+        return self.get_data_source_connection(self._current_connection_id_cache)
 
     def set_current_data_source_connection(
             self,
@@ -128,6 +190,26 @@ class OacsPluginSettingsManager(QtCore.QObject):
         data_source_connection.to_qgis_settings()
         self.data_source_connection_created.emit(str(data_source_connection.id))
 
+    @staticmethod
+    def is_live_search_enabled() -> bool:
+        with qgis_settings() as raw_settings:
+            return raw_settings.value(_LIVE_SEARCH_KEY, defaultValue=False, type=bool)
+
+    @staticmethod
+    def set_live_search_enabled(enabled: bool) -> None:
+        with qgis_settings() as raw_settings:
+            raw_settings.setValue(_LIVE_SEARCH_KEY, enabled)
+
+    @staticmethod
+    def is_debug_logging_enabled() -> bool:
+        with qgis_settings() as raw_settings:
+            return raw_settings.value(_DEBUG_LOGGING_KEY, defaultValue=False, type=bool)
+
+    @staticmethod
+    def set_debug_logging_enabled(enabled: bool) -> None:
+        with qgis_settings() as raw_settings:
+            raw_settings.setValue(_DEBUG_LOGGING_KEY, enabled)
+
     def delete_data_source_connection(self, data_source_connection_id: uuid.UUID) -> None:
         serialized_id = str(data_source_connection_id)
         with qgis_settings() as raw_settings:
@@ -1,5 +1,7 @@
 import dataclasses
+import datetime as dt
 import typing
+import uuid
 
 import qgis.core
 from qgis.PyQt import (
@@ -7,7 +9,13 @@ from qgis.PyQt import (
     QtNetwork,
 )
 
-from . import models
+from . import (
+    catalog,
+    mirror,
+    models,
+)
+from .settings import DataSourceConnectionSettings
+from .utils import log_message
 
 
 # - do we need to get the landing page at all?
@@ -39,3 +47,415 @@ class CollectionListNetworkRequestTask(qgis.core.QgsTask):
 
     def run(self) -> bool:
         raise NotImplementedError
+
+
+class OacsLayerLoaderTask(qgis.core.QgsTask):
+    """Build vector layers in a background thread and add them to the project.
+
+    The `layer_builder` callable runs in a worker thread and must not touch the
+    current QGIS project. It receives a `QgsFeedback`, as its `feedback`
+    keyword argument, which reports progress to the QGIS task manager and
+    which is canceled when the task is canceled.
+    The built layers are added to the project in `finished()`, which QGIS
+    always calls on the main thread.
+    """
+
+    layer_builder: typing.Callable[..., list[qgis.core.QgsVectorLayer]]
+    layers: list[qgis.core.QgsVectorLayer]
+    feedback: qgis.core.QgsFeedback
+    error_message: str | None
+
+    def __init__(
+            self,
+            layer_builder: typing.Callable[..., list[qgis.core.QgsVectorLayer]],
+            description: str = "oacs-plugin-layer-loader-task",
+    ):
+        super().__init__(description, qgis.core.QgsTask.Flag.CanCancel)
+        self.layer_builder = layer_builder
+        self.layers = []
+        self.error_message = None
+        self.feedback = qgis.core.QgsFeedback()
+        self.feedback.progressChanged.connect(
+            self.setProgress, QtCore.Qt.ConnectionType.DirectConnection)
+
+    def cancel(self) -> None:
+        self.feedback.cancel()
+        super().cancel()
+
+    def run(self) -> bool:
+        try:
+            # by keyword, as builders are partials with their other arguments bound
+            self.layers = self.layer_builder(feedback=self.feedback)
+        except Exception as err:
+            self.error_message = str(err)
+            return False
+        if self.isCanceled():
+            return False
+        # layers have been created in this worker thread, they must be moved
+        # to the main thread before they can be added to the project
+        main_thread = QtCore.QCoreApplication.instance().thread()
+        for layer in self.layers:
+            layer.moveToThread(main_thread)
+        return True
+
+    def finished(self, result: bool) -> None:
+        _active_tasks.discard(self)
+        if result:
+            qgis.core.QgsProject.instance().addMapLayers(self.layers)
+        elif self.isCanceled():
+            log_message(f"{self.description()!r} was canceled")
+        else:
+            log_message(
+                f"{self.description()!r} failed: {self.error_message}",
+                level=qgis.core.Qgis.MessageLevel.Warning
+            )
+
+
+class LayerDiffTask(qgis.core.QgsTask):
+    """Compute the changes that bring a layer up to date, in a background thread.
+
+    The `compute_diff` callable runs in a worker thread, so it must read the
+    layer through a feature source made on the main thread. It receives a
+    `QgsFeedback` as its `feedback` keyword argument. `finished()`, which
+    QGIS calls on the main thread, hands the diff to `on_computed`, which
+    applies it to the layer, or the error message to `on_failed`.
+    """
+
+    compute_diff: typing.Callable[..., typing.Any]
+    on_computed: typing.Callable[[typing.Any], None]
+    on_failed: typing.Callable[[str], None]
+    diff: typing.Any
+    feedback: qgis.core.QgsFeedback
+    error_message: str | None
+
+    def __init__(
+            self,
+            compute_diff: typing.Callable[..., typing.Any],
+            on_computed: typing.Callable[[typing.Any], None],
+            on_failed: typing.Callable[[str], None],
+            description: str = "oacs-plugin-layer-diff-task",
+    ):
+        super().__init__(description, qgis.core.QgsTask.Flag.CanCancel)
+        self.compute_diff = compute_diff
+        self.on_computed = on_computed
+        self.on_failed = on_failed
+        self.diff = None
+        self.error_message = None
+        self.feedback = qgis.core.QgsFeedback()
+        self.feedback.progressChanged.connect(
+            self.setProgress, QtCore.Qt.ConnectionType.DirectConnection)
+
+    def cancel(self) -> None:
+        self.feedback.cancel()
+        super().cancel()
+
+    def run(self) -> bool:
+        try:
+            self.diff = self.compute_diff(feedback=self.feedback)
+        except Exception as err:
+            self.error_message = str(err)
+            return False
+        return not self.isCanceled()
+
+    def finished(self, result: bool) -> None:
+        _active_tasks.discard(self)
+        if result:
+            self.on_computed(self.diff)
+        elif self.isCanceled():
+            self.on_failed("the refresh was canceled")
+        else:
+            self.on_failed(self.error_message or "unknown error")
+
+
+class CatalogSyncTask(qgis.core.QgsTask):
+    """Download the catalog of a connection into its local mirror.
+
+    The whole catalog is fetched, as servers have no standard way of
+    returning only what changed (see `mirror`), but only added, changed and
+    deleted items are written to the mirror. Changed items are parsed and
+    indexed here, in the worker thread, and `finished()` only merges them
+    into the catalog index.
+    """
+
+    connection: DataSourceConnectionSettings
+    feedback: qgis.core.QgsFeedback
+    num_fetched: int
+    changes_index: catalog.CatalogIndex
+    deleted_keys: list[tuple[typing.Type[models.OacsItem], str]]
+    error_message: str | None
+
+    def __init__(
+            self,
+            connection: DataSourceConnectionSettings,
+            description: str = "oacs-plugin-catalog-sync-task",
+    ):
+        super().__init__(description, qgis.core.QgsTask.Flag.CanCancel)
+        self.connection = connection
+        self.num_fetched = 0
+        self.changes_index = catalog.CatalogIndex()
+        self.deleted_keys = []
+        self.error_message = None
+        self.feedback = qgis.core.QgsFeedback()
+
+    def cancel(self) -> None:
+        self.feedback.cancel()
+        super().cancel()
+
+    def run(self) -> bool:
+        catalog_mirror = mirror.CatalogMirror(self.connection.id)
+        num_resources = len(mirror.MIRRORED_RESOURCES)
+        try:
+            for index, resource in enumerate(mirror.MIRRORED_RESOURCES):
+                if self.isCanceled():
+                    return False
+                synced_at = dt.datetime.now(dt.timezone.utc)
+                raw_items = mirror.fetch_raw_items(resource, self.connection, feedback=self.feedback)
+                if self.isCanceled():
+                    return False
+                changes = catalog_mirror.store(resource, raw_items, synced_at)
+                self.num_fetched += len(raw_items)
+                self.changes_index.add_items(
+                    resource.list_type.from_api_response(
+                        {resource.response_items_key: changes.changed_items}).items
+                )
+                item_type = resource.list_type.item_type
+                self.deleted_keys.extend((item_type, id_) for id_ in changes.deleted_ids)
+                self.setProgress(100 * (index + 1) / num_resources)
+        except Exception as err:
+            self.error_message = str(err)
+            return False
+        return True
+
+    def finished(self, result: bool) -> None:
+        _active_tasks.discard(self)
+        if result:
+            log_message(
+                f"Synced {self.num_fetched} items into the local mirror of "
+                f"{self.connection.name!r}: {len(self.changes_index)} added or changed, "
+                f"{len(self.deleted_keys)} deleted"
+            )
+            catalog.catalog_index_manager.apply_mirror_changes(
+                self.connection.id, self.changes_index, self.deleted_keys)
+        elif self.isCanceled():
+            log_message(f"{self.description()!r} was canceled")
+        else:
+            log_message(
+                f"{self.description()!r} failed: {self.error_message}",
+                level=qgis.core.Qgis.MessageLevel.Warning
+            )
+
+
+class MirrorLoaderTask(qgis.core.QgsTask):
+    """Build the catalog index of a connection from its local mirror.
+
+    Reading and parsing the whole mirror takes a while on large catalogs, so
+    the index is built here in a worker thread and only installed in
+    `finished()`.
+    """
+
+    connection_id: uuid.UUID
+    index: catalog.CatalogIndex
+    error_message: str | None
+
+    def __init__(
+            self,
+            connection_id: uuid.UUID,
+            description: str = "oacs-plugin-mirror-loader-task",
+    ):
+        super().__init__(description, qgis.core.QgsTask.Flag.CanCancel)
+        self.connection_id = connection_id
+        self.index = catalog.CatalogIndex()
+        self.error_message = None
+
+    def run(self) -> bool:
+        catalog_mirror = mirror.CatalogMirror(self.connection_id)
+        try:
+            if catalog_mirror.exists():
+                for resource in mirror.MIRRORED_RESOURCES:
+                    if self.isCanceled():
+                        return False
+                    self.index.add_items(catalog_mirror.load_items(resource))
+        except Exception as err:
+            self.error_message = str(err)
+            return False
+        return True
+
+    def finished(self, result: bool) -> None:
+        _active_tasks.discard(self)
+        if result:
+            catalog.catalog_index_manager.install_mirror_index(self.connection_id, self.index)
+        elif not self.isCanceled():
+            log_message(
+                f"{self.description()!r} failed: {self.error_message}",
+                level=qgis.core.Qgis.MessageLevel.Warning
+            )
+
+
+class CatalogIndexingTask(qgis.core.QgsTask):
+    """Index items fetched from a connection, for `catalog.CatalogIndexManager`.
+
+    The searchable texts and trigrams of the items are computed here, in a
+    worker thread, into an index of their own that `finished()` merges into
+    the connection's.
+    """
+
+    connection_id: uuid.UUID
+    items: list[models.OacsItem]
+    index: catalog.CatalogIndex
+    error_message: str | None
+
+    def __init__(
+            self,
+            connection_id: uuid.UUID,
+            items: list[models.OacsItem],
+            description: str = "oacs-plugin-catalog-indexing-task",
+    ):
+        # indexing runs after every search, it is not worth showing in the task manager
+        super().__init__(description, qgis.core.QgsTask.Flag.Hidden)
+        self.connection_id = connection_id
+        self.items = items
+        self.index = catalog.CatalogIndex()
+        self.error_message = None
+
+    def run(self) -> bool:
+        try:
+            self.index.add_items(self.items)
+        except Exception as err:
+            self.error_message = str(err)
+            return False
+        return True
+
+    def finished(self, result: bool) -> None:
+        _active_tasks.discard(self)
+        if not result:
+            log_message(
+                f"{self.description()!r} failed: {self.error_message}",
+                level=qgis.core.Qgis.MessageLevel.Warning
+            )
+        catalog.catalog_index_manager.install_response_index(
+            self.connection_id, self.index if result else None)
+
+
+class MirrorItemsLoaderTask(qgis.core.QgsTask):
+    """Read items back from the local mirror of a connection.
+
+    The catalog index only keeps entries of mirrored items, the items that a
+    search found are read and parsed here, in a worker thread, and handed to
+    `on_loaded` in `finished()`, in the order of their keys.
+    """
+
+    connection_id: uuid.UUID
+    keys: list[tuple[typing.Type[models.OacsItem], str]]
+    on_loaded: typing.Callable[[list[models.OacsItem]], None]
+    items: list[models.OacsItem]
+    error_message: str | None
+
+    def __init__(
+            self,
+            connection_id: uuid.UUID,
+            keys: list[tuple[typing.Type[models.OacsItem], str]],
+            on_loaded: typing.Callable[[list[models.OacsItem]], None],
+            description: str = "oacs-plugin-mirror-items-loader-task",
+    ):
+        super().__init__(description, qgis.core.QgsTask.Flag.CanCancel)
+        self.connection_id = connection_id
+        self.keys = keys
+        self.on_loaded = on_loaded
+        self.items = []
+        self.error_message = None
+
+    def run(self) -> bool:
+        catalog_mirror = mirror.CatalogMirror(self.connection_id)
+        items_by_key = {}
+        try:
+            for resource in mirror.MIRRORED_RESOURCES:
+                if self.isCanceled():
+                    return False
+                item_type = resource.list_type.item_type
+                ids = [id_ for type_, id_ in self.keys if type_ is item_type]
+                if len(ids) > 0:
+                    for item in catalog_mirror.load_items_by_ids(resource, ids):
+                        items_by_key[(item_type, item.id_)] = item
+        except Exception as err:
+            self.error_message = str(err)
+            return False
+        self.items = [item for key in self.keys if (item := items_by_key.get(key)) is not None]
+        return True
+
+    def finished(self, result: bool) -> None:
+        _active_tasks.discard(self)
+        if result:
+            self.on_loaded(self.items)
+        elif not self.isCanceled():
+            log_message(
+                f"{self.description()!r} failed: {self.error_message}",
+                level=qgis.core.Qgis.MessageLevel.Warning
+            )
+
+
+# The task manager takes ownership of the C++ side of each task, but the
+# Python wrapper (and its `run()` override) would be garbage collected as soon
+# as the caller drops its reference, so we hold on to them until they finish
+_active_tasks: set[qgis.core.QgsTask] = set()
+
+
+def schedule_layer_loading(
+        layer_builder: typing.Callable[..., list[qgis.core.QgsVectorLayer]],
+        description: str = "oacs-plugin-layer-loader-task",
+) -> OacsLayerLoaderTask:
+    task = OacsLayerLoaderTask(layer_builder, description=description)
+    _active_tasks.add(task)
+    qgis.core.QgsApplication.taskManager().addTask(task)
+    return task
+
+
+def schedule_layer_diff(
+        compute_diff: typing.Callable[..., typing.Any],
+        on_computed: typing.Callable[[typing.Any], None],
+        on_failed: typing.Callable[[str], None],
+        description: str = "oacs-plugin-layer-diff-task",
+) -> LayerDiffTask:
+    task = LayerDiffTask(compute_diff, on_computed, on_failed, description=description)
+    _active_tasks.add(task)
+    qgis.core.QgsApplication.taskManager().addTask(task)
+    return task
+
+
+def schedule_catalog_sync(connection: DataSourceConnectionSettings) -> CatalogSyncTask:
+    task = CatalogSyncTask(connection, description=f"Sync OACS catalog of {connection.name!r}")
+    _active_tasks.add(task)
+    qgis.core.QgsApplication.taskManager().addTask(task)
+    return task
+
+
+def schedule_mirror_loading(connection_id: uuid.UUID) -> MirrorLoaderTask:
+    """Start loading the connection's mirror, unless it is already being loaded."""
+    for task in _active_tasks:
+        if isinstance(task, MirrorLoaderTask) and task.connection_id == connection_id:
+            return task
+    task = MirrorLoaderTask(connection_id, description="Load OACS local mirror")
+    _active_tasks.add(task)
+    qgis.core.QgsApplication.taskManager().addTask(task)
+    return task
+
+
+def schedule_catalog_indexing(
+        connection_id: uuid.UUID,
+        items: list[models.OacsItem],
+) -> CatalogIndexingTask:
+    task = CatalogIndexingTask(connection_id, items, description="Index OACS search results")
+    _active_tasks.add(task)
+    qgis.core.QgsApplication.taskManager().addTask(task)
+    return task
+
+
+def schedule_mirror_items_loading(
+        connection_id: uuid.UUID,
+        keys: list[tuple[typing.Type[models.OacsItem], str]],
+        on_loaded: typing.Callable[[list[models.OacsItem]], None],
+) -> MirrorItemsLoaderTask:
+    task = MirrorItemsLoaderTask(
+        connection_id, keys, on_loaded, description="Read OACS items from the local mirror")
+    _active_tasks.add(task)
+    qgis.core.QgsApplication.taskManager().addTask(task)
+    return task
@@ -1,7 +1,14 @@
+import collections
+import dataclasses
 import datetime as dt
+import functools
+import importlib
+import json
 import re
 import sys
+import time
 import typing
+from pathlib import Path
 
 import qgis.core
 from qgis.PyQt import (
@@ -10,19 +17,129 @@ from qgis.PyQt import (
     QtSvg,
     QtWidgets,
 )
+from qgis.PyQt.uic import loadUiType
 
-if typing.TYPE_CHECKING:
-    from . import models
+# orjson is not shipped with QGIS - when it has been installed it is used for
+# parsing responses, as it is several times faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# name of the package holding the python modules generated from our .ui files
+# by the plugin build - it does not exist when running from the source tree
+COMPILED_UI_PACKAGE_NAME = "ui_compiled"
+
+# how many of the most recently logged messages are kept in memory, so that
+# they can be copied for a bug report without digging through the message log
+LOG_BUFFER_SIZE = 500
+
+_LOG_LEVEL_NAMES = {
+    qgis.core.Qgis.MessageLevel.Info: "INFO",
+    qgis.core.Qgis.MessageLevel.Warning: "WARNING",
+    qgis.core.Qgis.MessageLevel.Critical: "CRITICAL",
+    qgis.core.Qgis.MessageLevel.Success: "SUCCESS",
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class LogRecord:
+    created: float
+    level: qgis.core.Qgis.MessageLevel
+    message: str
+
+    def format(self) -> str:
+        timestamp = dt.datetime.fromtimestamp(self.created).isoformat(timespec="milliseconds")
+        return f"{timestamp} {_LOG_LEVEL_NAMES.get(self.level, str(self.level))} {self.message}"
+
+
+_recent_log_records: collections.deque[LogRecord] = collections.deque(maxlen=LOG_BUFFER_SIZE)
+_debug_logging_enabled = False
+
+
+def load_ui_form(ui_name: str) -> type:
+    """Return the form class for one of the plugin's Qt Designer files.
+
+    The class generated at build time is used when it exists, otherwise the
+    .ui file is parsed with `loadUiType`.
+    """
+    try:
+        compiled_module = importlib.import_module(
+            f"{__package__}.{COMPILED_UI_PACKAGE_NAME}.{ui_name}")
+    except ModuleNotFoundError:
+        form_class, _ = loadUiType(Path(__file__).parent / "ui" / f"{ui_name}.ui")
+        return form_class
+    return next(
+        value for name, value in vars(compiled_module).items()
+        if name.startswith("Ui_") and isinstance(value, type)
+    )
 
 
 def log_message(
         message: str,
+        *args: typing.Any,
         level: qgis.core.Qgis.MessageLevel = qgis.core.Qgis.MessageLevel.Info
 ) -> None:
+    """Send a message to the plugin's tab of the QGIS message log.
+
+    When `args` are given they are %-formatted into the message, like with
+    the `logging` module. The message is also kept in the buffer of recent
+    records returned by `get_recent_log_records`.
+    """
+    if args:
+        message = message % args
+    _recent_log_records.append(LogRecord(time.time(), level, message))
     qgis.core.QgsMessageLog.logMessage(
         message, "qgis-oacs-plugin", level=level)
 
 
+def log_debug(message: str, *args: typing.Any) -> None:
+    """Log a message from a hot path, e.g. one that runs for each parsed item.
+
+    These are dropped unless debug logging has been turned on in the plugin
+    settings. The message is only formatted once it is known to be logged, so
+    values should be passed as `args` instead of being put in an f-string.
+    """
+    if _debug_logging_enabled:
+        log_message(message, *args)
+
+
+def is_debug_logging_enabled() -> bool:
+    return _debug_logging_enabled
+
+
+def set_debug_logging_enabled(enabled: bool) -> None:
+    global _debug_logging_enabled
+    _debug_logging_enabled = enabled
+
+
+def get_recent_log_records() -> list[LogRecord]:
+    """Return the most recently logged messages, oldest first."""
+    return list(_recent_log_records)
+
+
+def parse_json(data: bytes | bytearray | memoryview | str | QtCore.QByteArray) -> typing.Any:
+    """Parse a JSON document, preferably straight from the bytes of a response.
+
+    With orjson, a QByteArray is parsed through a memoryview of its buffer,
+    without any copy. The json module needs it copied to bytes once, which is
+    still cheaper than decoding it to a QString and converting that to a
+    python str. Errors are raised as `json.JSONDecodeError` by both.
+    """
+    if isinstance(data, QtCore.QByteArray):
+        data = memoryview(data) if orjson is not None else bytes(data)
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the json module, e.g. it rejects NaN
+            # literals and lone surrogates, let the latter have the final say
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
 def show_message(
         message_bar: qgis.gui.QgsMessageBar,
         message: str,
@@ -54,13 +171,22 @@ def toggle_widgets_enabled(
             widget.setEnabled(not currently_enabled)
 
 
+@functools.lru_cache(maxsize=4096)
 def parse_raw_rfc3339_datetime(value: str) -> dt.datetime:
     """Parse a string containing an RFC3339 datetime. This code is
     lightly adapted from:
 
     https://github.com/kurtraschke/pyRFC3339/blob/main/pyrfc3339/parser.py
 
+    Results are memoized, as the same timestamps keep coming up, e.g. as
+    the validTime bounds of many features of a response. Datetimes are
+    immutable, so handing out the same instance is safe.
     """
+    # fast path for UTC timestamps, by far the most common ones, which python
+    # parses as they are since 3.11
+    if value.endswith("Z") and sys.version_info >= (3, 11):
+        return dt.datetime.fromisoformat(value)
+
     # Python does not recognize "Z" as an alias for "+00:00", so we perform the
     # substitution here.
     value = re.sub("Z$", "+00:00", value, flags=re.IGNORECASE)
@@ -82,9 +208,32 @@ def parse_raw_rfc3339_datetime(value: str) -> dt.datetime:
     return dt_out
 
 
-def create_pixmap_from_svg(svg_path: str, target_size: int) -> QtGui.QPixmap:
+# rendered pixmaps, keyed by (svg path, target size, device pixel ratio) - the
+# plugin only uses a handful of icons so this never grows large
+_pixmap_cache: dict[tuple[str, int, float], QtGui.QPixmap] = {}
+
+
+def create_pixmap_from_svg(
+        svg_path: str,
+        target_size: int,
+        device_pixel_ratio: float | None = None
+) -> QtGui.QPixmap:
+    """Return a pixmap of the SVG, rendering it only the first time it is requested."""
+    if device_pixel_ratio is None:
+        app = QtGui.QGuiApplication.instance()
+        device_pixel_ratio = app.devicePixelRatio() if app is not None else 1.0
+    cache_key = (svg_path, target_size, device_pixel_ratio)
+    if (cached := _pixmap_cache.get(cache_key)) is not None:
+        return cached
+    pixmap = _render_svg(svg_path, target_size, device_pixel_ratio)
+    _pixmap_cache[cache_key] = pixmap
+    return pixmap
+
+
+def _render_svg(svg_path: str, target_size: int, device_pixel_ratio: float) -> QtGui.QPixmap:
     scale_factor = 3
-    render_size = target_size * scale_factor
+    physical_size = round(target_size * device_pixel_ratio)
+    render_size = physical_size * scale_factor
 
     renderer = QtSvg.QSvgRenderer(svg_path)
     pixmap = QtGui.QPixmap(render_size, render_size)
@@ -92,11 +241,28 @@ def create_pixmap_from_svg(svg_path: str, target_size: int) -> QtGui.QPixmap:
     painter = QtGui.QPainter(pixmap)
     renderer.render(painter)
     painter.end()
-    return pixmap.scaled(
-        target_size, target_size,
+    scaled = pixmap.scaled(
+        physical_size, physical_size,
         QtCore.Qt.AspectRatioMode.KeepAspectRatio,
         QtCore.Qt.TransformationMode.SmoothTransformation
     )
+    scaled.setDevicePixelRatio(device_pixel_ratio)
+    return scaled
+
+
+def warm_up_pixmap_cache(
+        svg_paths: typing.Iterable[str],
+        target_sizes: typing.Iterable[int] = (16, 30)
+) -> None:
+    """Render the given icons up front, so that showing search results does not have to."""
+    sizes = tuple(target_sizes)
+    for svg_path in set(svg_paths):
+        for size in sizes:
+            create_pixmap_from_svg(svg_path, size)
+
+
+def clear_pixmap_cache() -> None:
+    _pixmap_cache.clear()
 
 
 def create_icon_from_svg(svg_path: str, target_size: int = 16) -> QtGui.QIcon:
@@ -115,103 +281,3 @@ def set_up_icon(
     label_widget.setToolTip(tooltip)
     label_widget.setFixedSize(target_size, target_size)
 
-
-def clear_search_results(layout_displayer: QtWidgets.QLayout) -> None:
-    while layout_displayer.count():
-        item = layout_displayer.takeAt(0)
-        if widget := item.widget():
-            widget.deleteLater()
-        elif layout := item.layout():
-            clear_search_results(layout)
-
-
-def load_oacs_feature_as_layer(oacs_feat: "models.OacsFeature") -> None:
-    if oacs_feat.geometry:
-        geom_type = qgis.core.QgsWkbTypes.displayString(
-            oacs_feat.geometry.wkbType())
-        crs = oacs_feat.geometry.crs()
-    else:
-        geom_type = "None"
-        crs = qgis.core.QgsCoordinateReferenceSystem("EPSG:4326")
-    vector_layer = qgis.core.QgsVectorLayer(
-        f"{geom_type}?crs={crs.authid()}", oacs_feat.name, "memory")
-    provider = vector_layer.dataProvider()
-    properties = oacs_feat.get_renderable_properties()
-    provider.addAttributes(
-        [
-            qgis.core.QgsField(k, QtCore.QVariant.Type.String)
-            for k in properties
-        ]
-    )
-    vector_layer.updateFields()
-    qgis_feature = qgis.core.QgsFeature(vector_layer.fields())
-    if oacs_feat.geometry:
-        qgis_feature.setGeometry(oacs_feat.geometry)
-    qgis_feature.setAttributes(list(properties.values()))
-    provider.addFeatures([qgis_feature])
-    vector_layer.updateExtents()
-    qgis.core.QgsProject.instance().addMapLayer(vector_layer)
-
-
-def load_oacs_feature_list_as_layers(
-        oacs_feature_list: "models.OacsFeatureList",
-        name_prefix: str = ""
-) -> None:
-    # - some features may have geometry, others not
-    # - features that have geometry may have different geometry types
-    feats_to_render = {
-        qgis.core.Qgis.WkbType.Point: [],
-        qgis.core.Qgis.WkbType.MultiPoint: [],
-        qgis.core.Qgis.WkbType.LineString: [],
-        qgis.core.Qgis.WkbType.MultiLineString: [],
-        qgis.core.Qgis.WkbType.Polygon: [],
-        qgis.core.Qgis.WkbType.MultiPolygon: [],
-        None: [],
-    }
-    for oacs_feat in oacs_feature_list.items:
-        container = feats_to_render[geom.wkbType() if (geom := oacs_feat.geometry) else None]
-        container.append(oacs_feat)
-    qgis_layers = []
-    for wkb_type, oacs_features in feats_to_render.items():
-        if len(oacs_features) == 0:
-            continue
-        if wkb_type is None:
-            geom_type = "None"
-            crs = qgis.core.QgsCoordinateReferenceSystem("EPSG:4326")
-            layer_name = "-".join((name_prefix, "no_geometry"))
-        else:
-            geom_type = qgis.core.QgsWkbTypes.displayString(wkb_type)
-            layer_name = "-".join((name_prefix, geom_type.lower()))
-            # assumes all feats have the same CRS
-            crs = qgis.core.QgsCoordinateReferenceSystem(oacs_features[0].geometry.crs())
-        vector_layer = qgis.core.QgsVectorLayer(
-            f"{geom_type}?crs={crs.authid()}", layer_name, "memory")
-        provider = vector_layer.dataProvider()
-        _names = set()
-        for oacs_feat in oacs_features:
-            for property_name in oacs_feat.get_renderable_properties().keys():
-                _names.add(property_name)
-        property_names = list(_names)
-        provider.addAttributes(
-            [
-                qgis.core.QgsField(k, QtCore.QVariant.Type.String)
-                for k in property_names
-            ]
-        )
-        vector_layer.updateFields()
-        qgis_features = [
-        ]
-        for oacs_feat in oacs_features:
-            qgis_feature = qgis.core.QgsFeature(vector_layer.fields())
-            if oacs_feat.geometry:
-                qgis_feature.setGeometry(oacs_feat.geometry)
-            feat_attributes = []
-            rendered_properties = oacs_feat.get_renderable_properties()
-            for idx, name in enumerate(property_names):
-                feat_attributes.append(rendered_properties.get(name, ""))
-            qgis_feature.setAttributes(feat_attributes)
-            qgis_features.append(qgis_feature)
-        provider.addFeatures(qgis_features)
-        vector_layer.updateExtents()
-        qgis_layers.append(vector_layer)
-    qgis.core.QgsProject.instance().addMapLayers(qgis_layers)
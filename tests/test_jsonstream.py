@@ -0,0 +1,33 @@
+import json
+import unittest
+
+from qgis_oacs import jsonstream
+
+
+def _parse_in_chunks(data: bytes, chunk_size: int) -> list:
+    parser = jsonstream.ListResponseStreamParser("features")
+    items = []
+    for start in range(0, len(data), chunk_size):
+        items.extend(parser.feed(data[start:start + chunk_size]))
+    items.extend(parser.close())
+    return items
+
+
+class ListResponseStreamParserTestCase(unittest.TestCase):
+
+    def test_items_are_the_same_whatever_the_chunk_size(self):
+        data = b'{"type": "FeatureCollection", "features": [1, {"a": [2, 3]}, "b", 456], "n": 4}'
+        for chunk_size in (1, 2, 3, 7, len(data)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(_parse_in_chunks(data, chunk_size), [1, {"a": [2, 3]}, "b", 456])
+
+    def test_trailing_comma_is_rejected(self):
+        data = b'{"features": [1, 2, ]}'
+        for chunk_size in (1, 4, len(data)):
+            with self.subTest(chunk_size=chunk_size):
+                with self.assertRaises(json.JSONDecodeError):
+                    _parse_in_chunks(data, chunk_size)
+
+
+if __name__ == "__main__":
+    unittest.main()